@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.security import get_current_active_user
+from app.db.session import get_db
+from app.models.user import User
+from app.models.deployment import Deployment
+from app.models.security_scan import SecurityScan
+from app.models.cost_estimate import CostEstimate
+from app.schemas.analyze import AnalyzeRequest, AnalyzeResponse
+from app.schemas.security import SecurityScanResponse
+from app.schemas.cost import CostEstimateResponse
+from app.services.terraform_workspace import parse_terraform_code, terraform_workspace
+from app.services.security_service import get_security_scanner
+from app.services.cost_service import get_cost_estimator, resource_fingerprints
+from app.services.security_issues import save_scan_issues
+from app.services.cost_rollups import record_cost_estimate
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.post("/analyze", response_model=AnalyzeResponse, status_code=status.HTTP_201_CREATED)
+async def analyze_terraform_code(
+    request: AnalyzeRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Run Checkov security scan and Infracost estimate concurrently on the same code"""
+    try:
+        # Verify deployment ownership if deployment_id provided
+        if request.deployment_id:
+            deployment = db.query(Deployment).filter(
+                Deployment.id == request.deployment_id
+            ).first()
+            
+            if not deployment:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Deployment not found"
+                )
+            
+            if deployment.user_id != current_user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to access this deployment"
+                )
+        
+        logger.info(f"Starting combined analysis for user {current_user.email}")
+        
+        # Parse terraform code once for both tools
+        terraform_code = parse_terraform_code(request.terraform_code)
+        
+        security_scanner = get_security_scanner()
+        cost_estimator = get_cost_estimator()
+        
+        # Materialize the workspace once and run both tools against it concurrently
+        with terraform_workspace(terraform_code) as temp_dir:
+            scan_result, cost_result = await asyncio.gather(
+                security_scanner.scan_directory(temp_dir),
+                cost_estimator.estimate_directory(temp_dir, terraform_code)
+            )
+        
+        security_scan = SecurityScan(
+            deployment_id=request.deployment_id,
+            security_score=scan_result["security_score"],
+            passed_checks=scan_result["passed_checks"],
+            failed_checks=scan_result["failed_checks"],
+            critical_issues=scan_result["critical_issues"],
+            high_issues=scan_result["high_issues"],
+            medium_issues=scan_result["medium_issues"],
+            low_issues=scan_result["low_issues"],
+            issues=scan_result["issues"]
+        )
+        cost_estimate = CostEstimate(
+            deployment_id=request.deployment_id,
+            monthly_cost=cost_result["monthly_cost"],
+            annual_cost=cost_result["annual_cost"],
+            breakdown=cost_result["breakdown"],
+            resource_fingerprints=resource_fingerprints(terraform_code),
+            recommendations=cost_result["recommendations"]
+        )
+        
+        # Persist both results in a single transaction
+        db.add_all([security_scan, cost_estimate])
+        save_scan_issues(db, security_scan)
+        record_cost_estimate(db, cost_estimate)
+        db.commit()
+        db.refresh(security_scan)
+        db.refresh(cost_estimate)
+        
+        logger.info(
+            f"Analysis completed: scan {security_scan.id} (score: {security_scan.security_score}), "
+            f"estimate {cost_estimate.id} (${cost_estimate.monthly_cost:.2f}/month)"
+        )
+        
+        return AnalyzeResponse(
+            deployment_id=request.deployment_id,
+            security=SecurityScanResponse(
+                id=security_scan.id,
+                deployment_id=security_scan.deployment_id,
+                security_score=security_scan.security_score,
+                passed_checks=security_scan.passed_checks,
+                failed_checks=security_scan.failed_checks,
+                critical_issues=security_scan.critical_issues,
+                high_issues=security_scan.high_issues,
+                medium_issues=security_scan.medium_issues,
+                low_issues=security_scan.low_issues,
+                issues=security_scan.issues,
+                created_at=security_scan.created_at
+            ),
+            cost=CostEstimateResponse(
+                id=cost_estimate.id,
+                deployment_id=cost_estimate.deployment_id,
+                monthly_cost=cost_estimate.monthly_cost,
+                annual_cost=cost_estimate.annual_cost,
+                breakdown=cost_estimate.breakdown,
+                resource_costs=cost_result.get("resource_costs", []),
+                recommendations=cost_estimate.recommendations,
+                created_at=cost_estimate.created_at,
+                warning=cost_result.get("warning"),
+                cached=cost_result.get("cached", False)
+            )
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Analysis failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to analyze Terraform code: {str(e)}"
+        )
@@ -13,6 +13,7 @@ from app.models.deployment import Deployment
 from app.schemas.code import CodeGenerationRequest, CodeGenerationResponse, CodeUpdateRequest
 from app.schemas.deployment import DeploymentResponse
 from app.services.code_service import get_terraform_generator
+from app.services.cost_rollups import set_deployment_status
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -160,7 +161,7 @@ async def update_deployment_code(
         
         # Update code
         deployment.terraform_code = update_data.terraform_code
-        deployment.status = DeploymentStatus.GENERATED
+        set_deployment_status(db, deployment, DeploymentStatus.GENERATED)
         
         db.commit()
         db.refresh(deployment)
@@ -1,5 +1,5 @@
-import json
 import logging
+from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
@@ -9,8 +9,21 @@ from app.db.session import get_db
 from app.models.user import User
 from app.models.deployment import Deployment
 from app.models.cost_estimate import CostEstimate
-from app.schemas.cost import CostEstimateRequest, CostEstimateResponse, ResourceCost
-from app.services.cost_service import get_cost_estimator
+from app.schemas.cost import (
+    CostEstimateRequest,
+    CostEstimateResponse,
+    ResourceCost,
+    CostDiffRequest,
+    CostDiffResponse,
+    CostSweepRequest,
+    CostSweepResponse,
+    CostMemoStats
+)
+from app.services.terraform_workspace import parse_terraform_code
+from app.services.cost_service import get_cost_estimator, resource_fingerprints
+from app.services.cost_memo import get_cost_memo
+from app.services.cost_sweep import SweepError, sweep_costs
+from app.services.cost_rollups import record_cost_estimate
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -45,15 +58,7 @@ async def estimate_terraform_cost(
         logger.info(f"Starting cost estimation for user {current_user.email}")
         
         # Parse terraform code
-        try:
-            terraform_code = json.loads(request.terraform_code)
-        except json.JSONDecodeError:
-            # If not JSON, assume it's just main.tf
-            terraform_code = {
-                "main_tf": request.terraform_code,
-                "variables_tf": "",
-                "outputs_tf": ""
-            }
+        terraform_code = parse_terraform_code(request.terraform_code)
         
         # Run cost estimation
         cost_estimator = get_cost_estimator()
@@ -65,10 +70,12 @@ async def estimate_terraform_cost(
             monthly_cost=cost_result["monthly_cost"],
             annual_cost=cost_result["annual_cost"],
             breakdown=cost_result["breakdown"],
+            resource_fingerprints=resource_fingerprints(terraform_code),
             recommendations=cost_result["recommendations"]
         )
         
         db.add(cost_estimate)
+        record_cost_estimate(db, cost_estimate)
         db.commit()
         db.refresh(cost_estimate)
         
@@ -83,7 +90,8 @@ async def estimate_terraform_cost(
             resource_costs=cost_result.get("resource_costs", []),
             recommendations=cost_estimate.recommendations,
             created_at=cost_estimate.created_at,
-            warning=cost_result.get("warning")
+            warning=cost_result.get("warning"),
+            cached=cost_result.get("cached", False)
         )
         
     except HTTPException:
@@ -96,6 +104,22 @@ async def estimate_terraform_cost(
         )
 
 
+@router.get("/memo/stats", response_model=CostMemoStats)
+async def get_cost_memo_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get hit-rate metrics of the per-resource cost memo (this API process)"""
+    try:
+        return get_cost_memo().stats()
+        
+    except Exception as e:
+        logger.error(f"Failed to get cost memo stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve cost memo statistics"
+        )
+
+
 @router.get("/{deployment_id}/cost", response_model=CostEstimateResponse)
 async def get_deployment_cost(
     deployment_id: UUID,
@@ -119,10 +143,10 @@ async def get_deployment_cost(
                 detail="Not authorized to access this deployment"
             )
         
-        # Get latest cost estimate
-        cost_estimate = db.query(CostEstimate).filter(
-            CostEstimate.deployment_id == deployment_id
-        ).order_by(CostEstimate.created_at.desc()).first()
+        # Latest cost estimate, via the deployment's rollup pointer
+        cost_estimate = None
+        if deployment.latest_cost_estimate_id:
+            cost_estimate = db.get(CostEstimate, deployment.latest_cost_estimate_id)
         
         if not cost_estimate:
             raise HTTPException(
@@ -161,3 +185,167 @@ async def get_deployment_cost(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve cost estimate"
         )
+
+
+@router.post("/{deployment_id}/diff", response_model=CostDiffResponse, status_code=status.HTTP_201_CREATED)
+async def diff_deployment_cost(
+    deployment_id: UUID,
+    request: Optional[CostDiffRequest] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Estimate how much a code change costs
+    
+    Compares the deployment's current code (or the code in the request)
+    with its latest cost estimate. Only added or changed resources are
+    priced; the rest reuse the stored breakdown. The merged result is
+    stored as the deployment's new cost estimate.
+    """
+    try:
+        # Verify deployment ownership
+        deployment = db.query(Deployment).filter(Deployment.id == deployment_id).first()
+        
+        if not deployment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Deployment not found"
+            )
+        
+        if deployment.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this deployment"
+            )
+        
+        raw_code = (request.terraform_code if request else None) or deployment.terraform_code
+        if not raw_code:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Deployment has no Terraform code"
+            )
+        
+        # Latest estimate is the baseline, if any
+        base_estimate = None
+        if deployment.latest_cost_estimate_id:
+            base_estimate = db.get(CostEstimate, deployment.latest_cost_estimate_id)
+        
+        terraform_code = parse_terraform_code(raw_code)
+        
+        cost_estimator = get_cost_estimator()
+        diff = await cost_estimator.estimate_diff(
+            terraform_code,
+            base_estimate.breakdown if base_estimate else {},
+            base_estimate.resource_fingerprints if base_estimate else {}
+        )
+        
+        cost_estimate = CostEstimate(
+            deployment_id=deployment_id,
+            monthly_cost=diff["monthly_cost"],
+            annual_cost=diff["annual_cost"],
+            breakdown=diff["breakdown"],
+            resource_fingerprints=diff["resource_fingerprints"],
+            recommendations=diff["recommendations"]
+        )
+        
+        db.add(cost_estimate)
+        record_cost_estimate(db, cost_estimate)
+        db.commit()
+        db.refresh(cost_estimate)
+        
+        logger.info(
+            f"Cost diff completed for deployment {deployment_id}: "
+            f"{diff['monthly_delta']:+.2f}/month ({diff['repriced_resources']} repriced, "
+            f"{diff['reused_resources']} reused)"
+        )
+        
+        return CostDiffResponse(
+            id=cost_estimate.id,
+            deployment_id=deployment_id,
+            base_estimate_id=base_estimate.id if base_estimate else None,
+            previous_monthly_cost=diff["previous_monthly_cost"],
+            monthly_cost=cost_estimate.monthly_cost,
+            annual_cost=cost_estimate.annual_cost,
+            monthly_delta=diff["monthly_delta"],
+            changes=diff["changes"],
+            resource_costs=diff["resource_costs"],
+            repriced_resources=diff["repriced_resources"],
+            reused_resources=diff["reused_resources"],
+            created_at=cost_estimate.created_at,
+            warning=diff["warning"]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Cost diff failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to diff costs: {str(e)}"
+        )
+
+
+@router.post("/{deployment_id}/sweep", response_model=CostSweepResponse)
+async def sweep_deployment_cost(
+    deployment_id: UUID,
+    request: CostSweepRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Compare monthly costs across regions, instance types and counts
+    
+    Every combination of the requested axes is priced from the offline
+    pricing catalog in one pass and ranked from cheapest. Nothing is stored.
+    """
+    try:
+        # Verify deployment ownership
+        deployment = db.query(Deployment).filter(Deployment.id == deployment_id).first()
+        
+        if not deployment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Deployment not found"
+            )
+        
+        if deployment.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this deployment"
+            )
+        
+        raw_code = request.terraform_code or deployment.terraform_code
+        if not raw_code:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Deployment has no Terraform code"
+            )
+        
+        sweep = sweep_costs(
+            parse_terraform_code(raw_code),
+            regions=request.regions,
+            instance_types=request.instance_types,
+            counts=request.counts,
+            limit=request.limit
+        )
+        
+        logger.info(
+            f"Cost sweep completed for deployment {deployment_id}: "
+            f"{sweep['total_variants']} variants in {sweep['duration_ms']:.1f}ms"
+        )
+        
+        return CostSweepResponse(deployment_id=deployment_id, **sweep)
+        
+    except HTTPException:
+        raise
+    except SweepError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Cost sweep failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to sweep costs: {str(e)}"
+        )
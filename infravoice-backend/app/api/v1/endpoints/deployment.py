@@ -11,6 +11,7 @@ from app.db.session import get_db
 from app.models.user import User
 from app.models.deployment import Deployment
 from app.schemas.deployment import DeploymentResponse, DeploymentStats
+from app.services.cost_rollups import set_deployment_status
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -78,15 +79,16 @@ async def get_deployment_stats(
         # Success rate
         success_rate = ((total - failed) / total * 100) if total > 0 else 0.0
         
-        # Total cost (sum of latest cost estimates)
-        # TODO: Implement proper cost calculation from cost_estimates table
-        total_cost = 0.0
+        # Total cost (sum of latest cost estimates, maintained on the user row)
+        total_cost = db.query(User.total_monthly_cost).filter(
+            User.id == current_user.id
+        ).scalar() or 0.0
         
         return DeploymentStats(
             total_deployments=total,
             active_deployments=active,
             failed_deployments=failed,
-            total_cost=total_cost,
+            total_cost=round(total_cost, 2),
             success_rate=round(success_rate, 1)
         )
         
@@ -160,7 +162,7 @@ async def deploy_infrastructure(
             )
         
         # Update status to deploying
-        deployment.status = DeploymentStatus.DEPLOYING
+        set_deployment_status(db, deployment, DeploymentStatus.DEPLOYING)
         db.commit()
         
         # TODO: Implement actual Terraform deployment
@@ -213,8 +215,8 @@ async def destroy_deployment(
                 detail="Not authorized to destroy this deployment"
             )
         
-        # Update status
-        deployment.status = DeploymentStatus.DESTROYING
+        # Update status, releasing the deployment's cost from the user total
+        set_deployment_status(db, deployment, DeploymentStatus.DESTROYING)
         db.commit()
         
         # TODO: Implement terraform destroy
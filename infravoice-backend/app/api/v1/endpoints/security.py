@@ -1,16 +1,42 @@
-import json
+import asyncio
 import logging
+import tempfile
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.security import get_current_active_user
+from app.db.base import SessionLocal
 from app.db.session import get_db
 from app.models.user import User
 from app.models.deployment import Deployment
 from app.models.security_scan import SecurityScan
-from app.schemas.security import SecurityScanRequest, SecurityScanResponse
-from app.services.security_service import get_security_scanner
+from app.schemas.security import (
+    SecurityScanRequest,
+    SecurityScanResponse,
+    ModuleScanResult,
+    ArchiveScanSummary,
+    CheckFailureSummary,
+    FailingDeployment
+)
+from app.services.terraform_workspace import parse_terraform_code
+from app.services.security_service import get_security_scanner, compute_security_scores
+from app.services.terraform_archive import (
+    ArchiveError,
+    extract_terraform_archive,
+    find_terraform_modules,
+    module_terraform_files,
+    remove_tree
+)
+from app.services.policy_engine import get_policy_engine
+from app.services.security_issues import (
+    save_scan_issues,
+    get_top_failing_checks,
+    get_deployments_failing_check
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -45,15 +71,7 @@ async def scan_terraform_code(
         logger.info(f"Starting security scan for user {current_user.email}")
         
         # Parse terraform code
-        try:
-            terraform_code = json.loads(request.terraform_code)
-        except json.JSONDecodeError:
-            # If not JSON, assume it's just main.tf
-            terraform_code = {
-                "main_tf": request.terraform_code,
-                "variables_tf": "",
-                "outputs_tf": ""
-            }
+        terraform_code = parse_terraform_code(request.terraform_code)
         
         # Run security scan
         security_scanner = get_security_scanner()
@@ -73,6 +91,7 @@ async def scan_terraform_code(
         )
         
         db.add(security_scan)
+        save_scan_issues(db, security_scan)
         db.commit()
         db.refresh(security_scan)
         
@@ -102,6 +121,319 @@ async def scan_terraform_code(
         )
 
 
+@router.post("/scan/preliminary", response_model=SecurityScanResponse, status_code=status.HTTP_202_ACCEPTED)
+async def preliminary_scan_terraform_code(
+    request: SecurityScanRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Return a preliminary security score immediately
+
+    The fast-path policy engine scores the code in-process; the full Checkov
+    scan runs in the background and replaces the stored result when it
+    completes. Poll GET /security/{scan_id} until is_preliminary is false;
+    if the full scan failed, full_scan_error is set and the preliminary
+    result is final.
+    """
+    try:
+        # Verify deployment ownership if deployment_id provided
+        if request.deployment_id:
+            deployment = db.query(Deployment).filter(
+                Deployment.id == request.deployment_id
+            ).first()
+            
+            if not deployment:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Deployment not found"
+                )
+            
+            if deployment.user_id != current_user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to access this deployment"
+                )
+        
+        # Parse terraform code
+        terraform_code = parse_terraform_code(request.terraform_code)
+        
+        # Evaluate fast-path policies
+        scan_result = get_policy_engine().evaluate(terraform_code)
+        
+        # Issue rows are stored once the full scan replaces this result
+        security_scan = SecurityScan(
+            deployment_id=request.deployment_id,
+            security_score=scan_result["security_score"],
+            passed_checks=scan_result["passed_checks"],
+            failed_checks=scan_result["failed_checks"],
+            critical_issues=scan_result["critical_issues"],
+            high_issues=scan_result["high_issues"],
+            medium_issues=scan_result["medium_issues"],
+            low_issues=scan_result["low_issues"],
+            issues=scan_result["issues"],
+            is_preliminary=True
+        )
+        
+        db.add(security_scan)
+        db.commit()
+        db.refresh(security_scan)
+        
+        background_tasks.add_task(_complete_security_scan, security_scan.id, terraform_code)
+        
+        logger.info(f"Preliminary security scan stored: {security_scan.id} (score: {security_scan.security_score})")
+        
+        return SecurityScanResponse(
+            id=security_scan.id,
+            deployment_id=security_scan.deployment_id,
+            security_score=security_scan.security_score,
+            passed_checks=security_scan.passed_checks,
+            failed_checks=security_scan.failed_checks,
+            critical_issues=security_scan.critical_issues,
+            high_issues=security_scan.high_issues,
+            medium_issues=security_scan.medium_issues,
+            low_issues=security_scan.low_issues,
+            issues=security_scan.issues,
+            created_at=security_scan.created_at,
+            is_preliminary=True,
+            message="Preliminary result, full scan in progress"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Preliminary security scan failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to scan Terraform code: {str(e)}"
+        )
+
+
+async def _complete_security_scan(scan_id: UUID, terraform_code: dict):
+    """Run the full Checkov scan and replace a preliminary result"""
+    db = SessionLocal()
+    try:
+        scan_result = await get_security_scanner().scan_terraform(terraform_code)
+        
+        security_scan = db.query(SecurityScan).filter(SecurityScan.id == scan_id).first()
+        if not security_scan:
+            logger.warning(f"Preliminary scan {scan_id} no longer exists, dropping full result")
+            return
+        
+        security_scan.security_score = scan_result["security_score"]
+        security_scan.passed_checks = scan_result["passed_checks"]
+        security_scan.failed_checks = scan_result["failed_checks"]
+        security_scan.critical_issues = scan_result["critical_issues"]
+        security_scan.high_issues = scan_result["high_issues"]
+        security_scan.medium_issues = scan_result["medium_issues"]
+        security_scan.low_issues = scan_result["low_issues"]
+        security_scan.issues = scan_result["issues"]
+        security_scan.is_preliminary = False
+        
+        save_scan_issues(db, security_scan)
+        db.commit()
+        
+        logger.info(f"Full security scan replaced preliminary result: {scan_id} (score: {security_scan.security_score})")
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Full security scan for {scan_id} failed, keeping preliminary result: {str(e)}")
+        _fail_security_scan(db, scan_id, str(e) or type(e).__name__)
+    finally:
+        db.close()
+
+
+def _fail_security_scan(db: Session, scan_id: UUID, error: str):
+    """Mark a preliminary result as final after its full scan failed, so polling ends"""
+    try:
+        security_scan = db.query(SecurityScan).filter(SecurityScan.id == scan_id).first()
+        if security_scan:
+            security_scan.is_preliminary = False
+            security_scan.full_scan_error = error[:500]
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to record full scan failure for {scan_id}: {str(e)}")
+
+
+@router.post("/scan/archive")
+async def scan_terraform_archive(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Scan every module of an uploaded Terraform tree (tar, tar.gz or zip)
+
+    Each directory containing .tf files is scanned as one module, with at
+    most SECURITY_SCAN_WORKERS Checkov processes at a time. The response is
+    newline-delimited JSON: one ModuleScanResult line per module as it
+    completes, followed by an ArchiveScanSummary line.
+    """
+    # Multipart uploads are spooled to disk, so the size is known up front
+    if file.size is not None and file.size > settings.MAX_ARCHIVE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Archive exceeds maximum allowed size of {settings.MAX_ARCHIVE_SIZE // 1024 // 1024}MB"
+        )
+    
+    root = tempfile.mkdtemp(prefix="infravoice-archive-")
+    try:
+        # Extraction is blocking file I/O, keep it off the event loop
+        extracted = await asyncio.to_thread(
+            extract_terraform_archive, file.file, root, settings.MAX_ARCHIVE_EXTRACTED_SIZE
+        )
+        modules = {
+            module: module_terraform_files(root, module)
+            for module in find_terraform_modules(root)
+        }
+    except ArchiveError as e:
+        remove_tree(root)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        remove_tree(root)
+        logger.error(f"Failed to extract Terraform archive: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to extract Terraform archive"
+        )
+    
+    if not modules:
+        remove_tree(root)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Archive does not contain any Terraform files"
+        )
+    
+    logger.info(
+        f"Starting archive security scan for user {current_user.email}: "
+        f"{len(modules)} modules, {extracted['files']} files"
+    )
+    
+    return StreamingResponse(
+        _stream_module_scans(root, modules),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _stream_module_scans(root: str, modules: dict) -> AsyncIterator[str]:
+    """Yield one NDJSON line per scanned module, then the aggregate summary"""
+    totals = {
+        "passed_checks": 0,
+        "failed_checks": 0,
+        "critical_issues": 0,
+        "high_issues": 0,
+        "medium_issues": 0,
+        "low_issues": 0
+    }
+    failed_modules = []
+    completed = 0
+    
+    try:
+        security_scanner = get_security_scanner()
+        async for module, result, error in security_scanner.scan_modules(
+            root, modules, settings.SECURITY_SCAN_WORKERS
+        ):
+            completed += 1
+            
+            if error:
+                failed_modules.append(module)
+                line = ModuleScanResult(
+                    module=module,
+                    status="failed",
+                    completed=completed,
+                    total=len(modules),
+                    error=error
+                )
+            else:
+                for key in totals:
+                    totals[key] += result[key]
+                line = ModuleScanResult(
+                    module=module,
+                    status="completed",
+                    completed=completed,
+                    total=len(modules),
+                    **result
+                )
+            
+            yield line.model_dump_json() + "\n"
+        
+        summary = ArchiveScanSummary(
+            total_modules=len(modules),
+            scanned_modules=len(modules) - len(failed_modules),
+            failed_modules=sorted(failed_modules),
+            security_score=float(compute_security_scores(
+                totals["passed_checks"],
+                totals["critical_issues"],
+                totals["high_issues"],
+                totals["medium_issues"],
+                totals["low_issues"]
+            )),
+            **totals
+        )
+        
+        logger.info(
+            f"Archive security scan completed: {summary.scanned_modules}/{summary.total_modules} modules "
+            f"(score: {summary.security_score})"
+        )
+        yield summary.model_dump_json() + "\n"
+        
+    finally:
+        remove_tree(root)
+
+
+@router.get("/issues/top-checks", response_model=List[CheckFailureSummary])
+async def get_top_failing_checks_endpoint(
+    severity: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the checks that fail most often across the user's deployments"""
+    try:
+        return get_top_failing_checks(
+            db,
+            current_user.id,
+            severity=severity.lower() if severity else None,
+            limit=limit
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to aggregate security issues: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve security issue statistics"
+        )
+
+
+@router.get("/issues/checks/{check_id}/deployments", response_model=List[FailingDeployment])
+async def get_deployments_failing_check_endpoint(
+    check_id: str,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the user's deployments that fail a given check"""
+    try:
+        return get_deployments_failing_check(db, current_user.id, check_id, limit=limit)
+        
+    except Exception as e:
+        logger.error(f"Failed to query deployments for check {check_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve deployments for check"
+        )
+
+
+def _scan_message(security_scan: SecurityScan) -> str:
+    """Status message of a stored scan"""
+    if security_scan.is_preliminary:
+        return "Preliminary result, full scan in progress"
+    if security_scan.full_scan_error:
+        return "Full scan failed, showing the preliminary result"
+    return "Security scan completed"
+
+
 @router.get("/{scan_id}", response_model=SecurityScanResponse)
 async def get_security_scan(
     scan_id: UUID,
@@ -141,7 +473,10 @@ async def get_security_scan(
             medium_issues=security_scan.medium_issues,
             low_issues=security_scan.low_issues,
             issues=security_scan.issues,
-            created_at=security_scan.created_at
+            created_at=security_scan.created_at,
+            is_preliminary=security_scan.is_preliminary,
+            full_scan_error=security_scan.full_scan_error,
+            message=_scan_message(security_scan)
         )
         
     except HTTPException:
@@ -1,22 +1,84 @@
+import asyncio
+import json
 import logging
 import os
-import tempfile
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from typing import BinaryIO, List, Optional
+from fastapi import (
+    APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Header, Request, Response,
+    WebSocket, WebSocketDisconnect,
+)
 from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
 
-from app.core.security import get_current_active_user
-from app.core.constants import SUPPORTED_AUDIO_FORMATS, SUPPORTED_AUDIO_EXTENSIONS
+from app.core.security import get_current_active_user, get_user_from_token
+from app.core.constants import SUPPORTED_AUDIO_FORMATS, SUPPORTED_AUDIO_EXTENSIONS, STREAM_SAMPLE_RATE
 from app.core.config import settings
+from app.db.base import SessionLocal
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.voice import VoiceTranscriptResponse
-from app.services.voice_service import get_whisper_service
+from app.schemas.voice import (
+    TranscriptionHistoryPage,
+    UploadCreate,
+    UploadStatus,
+    VoiceTranscriptResponse,
+    VoiceQueueStats,
+)
+from app.services.audio_decoder import AudioDecodeError
+from app.services.transcription_store import (
+    audio_fingerprint,
+    find_transcription,
+    list_transcriptions,
+    save_transcription,
+)
+from app.services.upload_spool import (
+    SpoolFull,
+    UploadBusy,
+    UploadError,
+    UploadNotFound,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    get_upload_spool,
+)
+from app.services.voice_service import TranscriptionOverloaded, TranscriptionWarming, get_whisper_service
+from app.services.voice_stream import TranscriptionStream
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+async def _transcribe_file(audio_file: BinaryIO, filename: str, user: User, db: Session) -> VoiceTranscriptResponse:
+    """
+    Transcribe an uploaded file with the user's tier model and store the result
+    
+    Repeat uploads of the same audio for the same tier model are answered
+    from history without inference. Errors of
+    LocalWhisperService.transcribe_audio propagate.
+    """
+    whisper_service = get_whisper_service()
+    model_size = whisper_service.model_for_tier(user.subscription_tier)
+    
+    audio_hash = await asyncio.to_thread(audio_fingerprint, audio_file)
+    previous = find_transcription(db, user.id, audio_hash, model_size)
+    if previous is not None:
+        logger.info(f"Transcription for user {user.email} served from history ({previous.id})")
+        return VoiceTranscriptResponse(
+            transcript=previous.transcript,
+            confidence=previous.confidence,
+            duration=previous.duration,
+            language=previous.language,
+            cached=True,
+            model_size=previous.result_model_size or previous.model_size
+        )
+    
+    # Transcribe with the user's tier model, decoding straight from the file
+    result = await whisper_service.transcribe_audio(audio_file, model_size)
+    save_transcription(db, user.id, audio_hash, model_size, filename, result)
+    
+    logger.info(f"Transcription completed for user {user.email}: {len(result['transcript'])} chars")
+    
+    return VoiceTranscriptResponse(**result)
+
+
 @router.post("/transcribe", response_model=VoiceTranscriptResponse)
 async def transcribe_audio(
     file: UploadFile = File(...),
@@ -33,60 +95,323 @@ async def transcribe_audio(
                 detail=f"Unsupported file format. Supported formats: {', '.join(SUPPORTED_AUDIO_EXTENSIONS)}"
             )
         
-        # Read file content
-        audio_bytes = await file.read()
-        
-        # Validate file size
-        if len(audio_bytes) > settings.MAX_FILE_SIZE:
+        # Validate file size without reading the upload into memory
+        file_size = file.size
+        if file_size is None:
+            file_size = file.file.seek(0, os.SEEK_END)
+            file.file.seek(0)
+        if file_size > settings.MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                 detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE // 1024 // 1024}MB"
             )
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            temp_file.write(audio_bytes)
-            temp_path = temp_file.name
+        return await _transcribe_file(file.file, file.filename, current_user, db)
+        
+    except HTTPException:
+        raise
+    except AudioDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except TranscriptionWarming as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Voice transcription is warming up, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except TranscriptionOverloaded as e:
+        logger.warning(f"Transcription rejected for user {current_user.email}: queue full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Transcription service is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        logger.error(f"Transcription failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to transcribe audio: {str(e)}"
+        )
+
+
+@router.post("/uploads", response_model=UploadStatus, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    upload: UploadCreate,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Open a resumable chunked audio upload
+    
+    Declare the filename and total size; format and size limits are checked
+    here, before any audio is sent. Then send the file with
+    `PUT /uploads/{upload_id}` chunks.
+    """
+    try:
+        # Takes the spool lock and scans the spool: blocking, keep it off the event loop
+        return await asyncio.to_thread(get_upload_spool().create, current_user.id, upload.filename, upload.size)
+        
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except SpoolFull as e:
+        raise HTTPException(status_code=status.HTTP_507_INSUFFICIENT_STORAGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to open upload: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to open upload"
+        )
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatus)
+async def get_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the offset of an upload, to resume it after a dropped connection"""
+    try:
+        return await asyncio.to_thread(get_upload_spool().status, upload_id, current_user.id)
         
+    except UploadNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadStatus)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Append a chunk to an upload and transcribe it once complete
+    
+    The request body is the raw bytes starting at `Upload-Offset`, which must
+    equal the upload's offset (409 with the current `Upload-Offset`
+    otherwise). The chunk is written to disk as it arrives; if the
+    connection drops, resume from the offset of `GET /uploads/{upload_id}`.
+    The chunk completing the upload is answered with its transcription;
+    other chunks for the upload get 409 meanwhile. If transcription is
+    unavailable (503), the upload is kept: retry with an empty chunk at the
+    final offset.
+    """
+    spool = get_upload_spool()
+    try:
+        # Early rejection only: the spool counts the bytes actually received
+        content_length = request.headers.get("content-length")
         try:
-            # Get Whisper service
-            whisper_service = get_whisper_service()
-            
-            # Transcribe
-            result = await whisper_service.transcribe_audio(temp_path)
-            
-            logger.info(f"Transcription completed for user {current_user.email}: {len(result['transcript'])} chars")
-            
-            return VoiceTranscriptResponse(**result)
+            declared_length = int(content_length) if content_length is not None else None
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Length header")
+        if declared_length is not None and declared_length > settings.UPLOAD_CHUNK_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Chunk exceeds maximum size of {settings.UPLOAD_CHUNK_MAX_BYTES // 1024 // 1024}MB"
+            )
+        
+        async with spool.append(upload_id, current_user.id, upload_offset, request.stream()) as upload:
+            if not upload["complete"]:
+                return upload
             
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+            # Final chunk: transcribe straight from the spooled file, still
+            # holding the upload so a concurrent final chunk gets 409
+            with open(spool.path(upload["upload_id"]), "rb") as audio_file:
+                upload["transcription"] = await _transcribe_file(audio_file, upload["filename"], current_user, db)
+            await asyncio.to_thread(spool.finish, upload["upload_id"])
+            return upload
         
     except HTTPException:
         raise
+    except UploadNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.offset)}
+        )
+    except UploadBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ClientDisconnect:
+        logger.info(f"Upload {upload_id} chunk interrupted by client disconnect")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chunk interrupted")
+    except AudioDecodeError as e:
+        await asyncio.to_thread(spool.cancel, upload_id, current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except TranscriptionWarming as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Voice transcription is warming up, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except TranscriptionOverloaded as e:
+        logger.warning(f"Transcription rejected for user {current_user.email}: queue full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Transcription service is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
-        logger.error(f"Transcription failed: {str(e)}")
+        logger.error(f"Upload chunk failed: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to transcribe audio: {str(e)}"
+            detail=f"Failed to process upload chunk: {str(e)}"
         )
 
 
-@router.get("/history")
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Abandon an upload and free its storage; 409 while a chunk or its transcription is in progress"""
+    try:
+        await asyncio.to_thread(get_upload_spool().cancel, upload_id, current_user.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        
+    except UploadNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except UploadBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.websocket("/stream")
+async def stream_transcription(
+    websocket: WebSocket,
+    token: str = Query(...)
+):
+    """
+    Transcribe live audio while the user speaks
+    
+    Authenticate with `?token=<access token>`. Send audio as binary messages
+    of 16 kHz mono 16-bit little-endian PCM, then `{"type": "stop"}`. Speech
+    segments are detected by voice activity and transcribed as soon as they
+    end; the server sends `partial` and `final` transcripts per segment and
+    a `done` message with the full transcript after the stop.
+    """
+    # Short-lived session: the connection may stay open for minutes
+    with SessionLocal() as db:
+        user = get_user_from_token(token, db)
+    
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    
+    whisper_service = get_whisper_service()
+    try:
+        whisper_service.ensure_ready()
+    except TranscriptionWarming as e:
+        await websocket.send_json({
+            "type": "error",
+            "detail": "Voice transcription is warming up",
+            "retry_after": e.retry_after
+        })
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    except RuntimeError:
+        await websocket.send_json({"type": "error", "detail": "Voice transcription is disabled"})
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+    
+    model_size = whisper_service.model_for_tier(user.subscription_tier)
+    stream = TranscriptionStream(whisper_service, websocket.send_json, model_size)
+    received = 0
+    
+    try:
+        await websocket.send_json({"type": "ready", "sample_rate": STREAM_SAMPLE_RATE})
+        
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+            
+            if message.get("bytes"):
+                received += len(message["bytes"])
+                if received > settings.MAX_FILE_SIZE:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": f"Stream exceeds maximum size of {settings.MAX_FILE_SIZE // 1024 // 1024}MB"
+                    })
+                    break
+                await stream.feed(message["bytes"])
+            
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    control = {}
+                if isinstance(control, dict) and control.get("type") == "stop":
+                    break
+        
+        result = await stream.finish()
+        await websocket.close()
+        
+        logger.info(
+            f"Streaming transcription completed for user {user.email}: "
+            f"{len(result['transcript'])} chars from {result['duration']:.1f}s of audio"
+        )
+        
+    except WebSocketDisconnect:
+        stream.close()
+        logger.info(f"Streaming transcription disconnected for user {user.email}")
+    except Exception as e:
+        stream.close()
+        logger.error(f"Streaming transcription failed: {str(e)}")
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            pass
+
+
+@router.get("/queue", response_model=VoiceQueueStats)
+async def get_transcription_queue(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get transcription queue depth and wait times (this API process)"""
+    try:
+        return get_whisper_service().queue_stats()
+        
+    except Exception as e:
+        logger.error(f"Failed to get transcription queue stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve transcription queue statistics"
+        )
+
+
+@router.get("/history", response_model=TranscriptionHistoryPage)
 async def get_transcription_history(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's transcription history with pagination"""
-    # TODO: Implement transcription history storage
-    # For now, return empty list
-    return {
-        "items": [],
-        "total": 0,
-        "skip": skip,
-        "limit": limit
-    }
+    """Get user's transcription history, newest first, with keyset pagination"""
+    try:
+        items, next_cursor = list_transcriptions(db, current_user.id, limit, cursor)
+        return TranscriptionHistoryPage(items=items, next_cursor=next_cursor)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to get transcription history: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve transcription history"
+        )
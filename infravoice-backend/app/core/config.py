@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str
     
+    # Cost estimate cache
+    COST_CACHE_TTL_SECONDS: int = 6 * 60 * 60  # Infracost prices are refreshed upstream
+    COST_CACHE_LRU_SIZE: int = 256
+    
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
@@ -33,13 +37,38 @@ class Settings(BaseSettings):
     TERRAFORM_PATH: str = "/usr/local/bin/terraform"
     CHECKOV_PATH: str = "checkov"
     INFRACOST_PATH: str = "infracost"
+    PRICING_CATALOG_PATH: Optional[str] = None  # SQLite catalog, bundled seed prices if unset
     
     # API Configuration
     DEFAULT_API_QUOTA: int = 100
     MAX_FILE_SIZE: int = 25 * 1024 * 1024  # 25MB
+    MAX_ARCHIVE_SIZE: int = 50 * 1024 * 1024  # 50MB uploaded
+    MAX_ARCHIVE_EXTRACTED_SIZE: int = 200 * 1024 * 1024  # 200MB of Terraform files
+    SECURITY_SCAN_WORKERS: int = 4  # Concurrent Checkov processes per archive scan
+    UPLOAD_SPOOL_DIR: Optional[str] = None  # Resumable audio uploads, <tmp>/infravoice-uploads if unset
+    UPLOAD_SPOOL_MAX_BYTES: int = 512 * 1024 * 1024  # Declared size of all open uploads
+    UPLOAD_CHUNK_MAX_BYTES: int = 5 * 1024 * 1024  # Per chunk request
+    UPLOAD_MAX_PER_USER: int = 3  # Open uploads per user
+    UPLOAD_EXPIRY_SECONDS: int = 60 * 60  # Uploads without a chunk this long are removed
     
     # Whisper Model
-    WHISPER_MODEL_SIZE: str = "base"  # tiny, base, small, medium, large
+    WHISPER_MODEL_SIZE: str = "base"  # tiny, base, small, medium, large; used when WHISPER_TIER_MODELS is off
+    WHISPER_INFERENCE_MODE: str = "fp32"  # fp32, or int8 (dynamically quantized linear layers, CPU only)
+    WHISPER_CPU_THREADS: int = 0  # Intra-op threads for CPU inference, 0 = PyTorch default
+    WHISPER_SHARED_WEIGHTS: bool = True  # Memory-map fp32 CPU weights so all worker processes share one copy
+    WHISPER_WEIGHTS_DIR: Optional[str] = None  # Model files, Whisper's download cache (~/.cache/whisper) if unset
+    WHISPER_TIER_MODELS: bool = True  # Model size per subscription tier (TIER_WHISPER_MODELS), else WHISPER_MODEL_SIZE for all
+    WHISPER_MODEL_MEMORY_MB: int = 4096  # Hard budget for loaded models; least recently used are unloaded beyond it
+    WHISPER_MODEL_IDLE_SECONDS: int = 900  # Unload models unused this long (except the default model)
+    WHISPER_WARM_TIER_MODELS: bool = False  # Also load the other tier/cascade models at startup (still unloaded when idle)
+    WHISPER_CASCADE_MODEL: str = ""  # Fast model tried first, uncertain results re-run with the tier model; empty = off
+    WHISPER_TRIM_SILENCE: bool = True  # Cut long non-speech stretches before inference
+    WHISPER_CHUNK_WORKERS: int = 2  # Processes transcribing long recordings in parallel chunks, 0 = off
+    WHISPER_CHUNK_MIN_SECONDS: int = 120  # Recordings longer than this are chunked
+    WHISPER_WARMUP: str = "background"  # background, blocking (before serving) or lazy (first voice request)
+    WHISPER_QUEUE_SIZE: int = 8  # Transcriptions waiting for the model before 503
+    WHISPER_MAX_BATCH_SIZE: int = 8  # Recordings decoded together in one forward pass
+    WHISPER_BATCH_WINDOW_MS: int = 50  # Wait for more recordings when the model is idle
     
     class Config:
         env_file = ".env"
@@ -39,6 +39,14 @@ class SecuritySeverity(str, Enum):
     INFO = "info"
 
 
+class ModelStatus(str, Enum):
+    """Whisper model loading states"""
+    NOT_LOADED = "not_loaded"
+    WARMING = "warming"
+    READY = "ready"
+    UNAVAILABLE = "unavailable"
+
+
 # API Quotas by subscription tier
 API_QUOTAS = {
     SubscriptionTier.FREE: 100,
@@ -57,10 +65,111 @@ TERRAFORM_FILES = {
     "outputs": "outputs.tf",
 }
 
+# Archive uploads (batch module scanning)
+ARCHIVE_TERRAFORM_EXTENSIONS = (".tf", ".tf.json")
+MAX_ARCHIVE_MEMBERS = 5000  # Terraform files per archive
+
+# Security score formula
+# Bump SECURITY_SCORE_VERSION whenever the weights below change so stored
+# scans can be recomputed with `python -m app.jobs.rescore_security_scans`.
+SECURITY_SCORE_VERSION = 1
+SECURITY_SEVERITY_WEIGHTS = {
+    SecuritySeverity.CRITICAL: 2.0,
+    SecuritySeverity.HIGH: 1.0,
+    SecuritySeverity.MEDIUM: 0.5,
+    SecuritySeverity.LOW: 0.2,
+}
+SECURITY_PENALTY_FACTOR = 0.5
+SECURITY_SCORE_NO_CHECKS = 7.0  # Default score if no checks ran
+
 # Security score thresholds
 SECURITY_SCORE_EXCELLENT = 8.0
 SECURITY_SCORE_GOOD = 6.0
 SECURITY_SCORE_POOR = 4.0
 
+# Offline pricing catalog (fallback cost estimates)
+HOURS_PER_MONTH = 730
+PRICING_DEFAULT_REGIONS = {
+    "aws": "us-east-1",
+    "google": "us-central1",
+    "azurerm": "eastus",
+}
+# Attribute holding the priced SKU, dotted paths descend into nested blocks
+PRICING_SKU_ATTRIBUTES = {
+    "aws_instance": "instance_type",
+    "aws_db_instance": "instance_class",
+    "aws_rds_cluster_instance": "instance_class",
+    "aws_elasticache_cluster": "node_type",
+    "google_compute_instance": "machine_type",
+    "google_sql_database_instance": "settings.tier",
+    "azurerm_linux_virtual_machine": "size",
+    "azurerm_windows_virtual_machine": "size",
+    "azurerm_virtual_machine": "vm_size",
+    "azurerm_mssql_database": "sku_name",
+}
+# Storage priced per GB-month: (storage type attribute, size attribute, default type)
+PRICING_STORAGE_ATTRIBUTES = {
+    "aws_db_instance": ("storage_type", "allocated_storage", "gp2"),
+    "aws_ebs_volume": ("type", "size", "gp2"),
+}
+# Attribute multiplying the unit price (in addition to `count`)
+PRICING_QUANTITY_ATTRIBUTES = {
+    "aws_elasticache_cluster": "num_cache_nodes",
+}
+
 # Cost warning threshold (monthly)
 COST_WARNING_THRESHOLD = 1000.0  # $1000/month
+
+# Deployments in these states no longer count toward their owner's total cost
+COST_RELEASED_STATUSES = (DeploymentStatus.DESTROYING, DeploymentStatus.DESTROYED)
+
+# Cost sweeps
+# Virtual machine resources whose size the instance type axis replaces
+SWEEP_INSTANCE_RESOURCES = (
+    "aws_instance",
+    "google_compute_instance",
+    "azurerm_linux_virtual_machine",
+    "azurerm_windows_virtual_machine",
+    "azurerm_virtual_machine",
+)
+MAX_SWEEP_VARIANTS = 10000  # Combinations evaluated per sweep
+
+# Whisper inference modes: full precision, or int8 dynamically quantized
+# linear layers (CPU only)
+WHISPER_INFERENCE_MODES = ("fp32", "int8")
+
+# Whisper model size per subscription tier (with WHISPER_TIER_MODELS)
+TIER_WHISPER_MODELS = {
+    SubscriptionTier.FREE: "tiny",
+    SubscriptionTier.PRO: "small",
+    SubscriptionTier.ENTERPRISE: "medium",
+}
+
+# Parameters (millions) per Whisper model size, for the model memory budget
+WHISPER_MODEL_PARAMS = {
+    "tiny": 39,
+    "base": 74,
+    "small": 244,
+    "medium": 769,
+    "large": 1550,
+}
+
+# Streaming transcription (16 kHz mono PCM over WebSocket)
+STREAM_SAMPLE_RATE = 16000
+STREAM_FRAME_MS = 30  # Voice activity is decided per frame
+STREAM_PREROLL_MS = 300  # Audio kept before detected speech onset
+STREAM_SILENCE_MS = 600  # Trailing silence that ends a segment
+STREAM_MIN_SPEECH_MS = 250  # Shorter voiced bursts are dropped as noise
+STREAM_MAX_SEGMENT_SECONDS = 30  # One Whisper window
+STREAM_PARTIAL_INTERVAL_MS = 1000  # New speech between partial transcripts
+
+# Silence trimming before inference
+TRIM_FRAME_MS = 30  # Voice activity is decided per frame
+TRIM_PADDING_MS = 300  # Audio kept on both sides of speech
+TRIM_MIN_SILENCE_MS = 1000  # Shorter pauses are left intact
+
+# Parallel chunked transcription of long recordings
+CHUNK_MAX_SECONDS = 30  # One Whisper window per chunk
+CHUNK_SEARCH_SECONDS = 5  # Window before the chunk limit searched for a pause
+CHUNK_OVERLAP_SECONDS = 1.0  # Overlap when no pause is found
+CHUNK_WORKER_MAX_MODELS = 2  # Models a chunk worker keeps loaded, least recently used unloaded beyond
@@ -63,6 +63,22 @@ def decode_token(token: str) -> Dict[str, Any]:
         )
 
 
+def get_user_from_token(token: str, db: Session) -> Optional[User]:
+    """Resolve an access token to an active user, or None (for WebSocket handshakes)"""
+    try:
+        payload = decode_token(token)
+    except HTTPException:
+        return None
+    
+    if payload.get("type") != "access" or payload.get("sub") is None:
+        return None
+    
+    user = db.query(User).filter(User.id == payload["sub"]).first()
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
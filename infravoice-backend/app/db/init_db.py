@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 def init_db(db: Session = None) -> None:
     """Initialize database with tables and seed data"""
     # Import all models here to ensure they are registered with Base
-    from app.models import user, deployment, security_scan, cost_estimate
+    from app.models import user, deployment, security_scan, security_scan_issue, cost_estimate, resource_cost_memo, transcription
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
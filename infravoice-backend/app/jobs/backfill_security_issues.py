@@ -0,0 +1,69 @@
+import argparse
+import logging
+import time
+
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.base import engine
+from app.models.security_scan import SecurityScan
+from app.models.security_scan_issue import SecurityScanIssue
+from app.services.security_issues import build_issue_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def backfill_security_issues(batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Copy issues stored in SecurityScan.issues into the security_issues table
+    
+    Scans that already have issue rows are skipped, and conflicting rows are
+    ignored, so the job can be re-run safely. Scans are streamed from a
+    server-side cursor and their issues inserted in one multi-row INSERT per
+    batch on a second connection.
+    
+    Returns:
+        Number of issue rows inserted
+    """
+    scans = SecurityScan.__table__
+    issue_rows = SecurityScanIssue.__table__
+    
+    query = select(scans.c.id, scans.c.deployment_id, scans.c.issues, scans.c.created_at).where(
+        ~exists().where(issue_rows.c.scan_id == scans.c.id)
+    )
+    
+    inserted = 0
+    scanned = 0
+    started = time.monotonic()
+    
+    with engine.connect() as reader, engine.connect() as writer:
+        result = reader.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        
+        for rows in result.partitions():
+            batch = []
+            for scan_id, deployment_id, issues, created_at in rows:
+                batch.extend(build_issue_rows(scan_id, deployment_id, issues, created_at=created_at))
+            
+            if batch:
+                writer.execute(insert(issue_rows).values(batch).on_conflict_do_nothing())
+                writer.commit()
+            
+            scanned += len(rows)
+            inserted += len(batch)
+            elapsed = time.monotonic() - started
+            logger.info(f"Backfilled {scanned} scans, {inserted} issue rows ({scanned / elapsed:.0f} scans/s)")
+    
+    logger.info(f"Backfill completed: {inserted} issue rows from {scanned} scans")
+    return inserted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the security_issues table from stored scans")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Scans per batch")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    count = backfill_security_issues(batch_size=args.batch_size)
+    print(f"Inserted {count} security issue rows")
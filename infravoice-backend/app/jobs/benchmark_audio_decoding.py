@@ -0,0 +1,132 @@
+import argparse
+import io
+import logging
+import os
+import resource
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from app.core.constants import STREAM_SAMPLE_RATE
+from app.services.audio_decoder import decode_audio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPEATS = 10
+
+
+def _decode_with_temp_file(data: bytes, suffix: str):
+    """Previous upload path: spill to a temporary file, decode with an ffmpeg subprocess"""
+    import whisper
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        temp_file.write(data)
+        temp_path = temp_file.name
+    try:
+        return whisper.load_audio(temp_path)
+    finally:
+        os.unlink(temp_path)
+
+
+def _decode_in_memory(data: bytes, suffix: str):
+    """Current upload path: decode from the buffer in-process"""
+    return decode_audio(io.BytesIO(data))
+
+
+def _process_memory_kb(field: str) -> int:
+    """VmRSS / VmHWM of this process from /proc (Linux)"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak_memory() -> None:
+    """Reset VmHWM to the current RSS so the next peak is per run"""
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def _measure(decode: Callable, data: bytes, suffix: str, repeats: int) -> Dict[str, float]:
+    """Median wall time and worst peak RSS growth of one decode path"""
+    decode(data, suffix)  # warm up imports and codec initialisation
+
+    times = []
+    peak_kb = 0
+    for _ in range(repeats):
+        _reset_peak_memory()
+        baseline_kb = _process_memory_kb("VmRSS")
+        started = time.perf_counter()
+        audio = decode(data, suffix)
+        times.append(time.perf_counter() - started)
+        peak_kb = max(peak_kb, _process_memory_kb("VmHWM") - baseline_kb)
+        del audio
+
+    return {
+        "ms": statistics.median(times) * 1000,
+        "peak_mb": peak_kb / 1024
+    }
+
+
+def benchmark_audio_decoding(audio_paths: List[str], repeats: int) -> List[Dict]:
+    """
+    Compare temp-file + ffmpeg subprocess decoding with in-process decoding
+
+    Each recording is read into memory once, as an upload would be, and
+    decoded `repeats` times by both paths. Peak memory is the growth of
+    this process' RSS high-water mark during a decode; the ffmpeg
+    subprocess' own memory is reported separately as the largest child
+    RSS seen.
+
+    Returns:
+        One row per recording
+    """
+    rows = []
+    for path in audio_paths:
+        with open(path, "rb") as audio_file:
+            data = audio_file.read()
+        suffix = os.path.splitext(path)[1].lower()
+
+        subprocess_result = _measure(_decode_with_temp_file, data, suffix, repeats)
+        in_memory_result = _measure(_decode_in_memory, data, suffix, repeats)
+        child_peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+        row = {
+            "file": os.path.basename(path),
+            "format": suffix.lstrip("."),
+            "size_kb": len(data) / 1024,
+            "audio_seconds": len(_decode_in_memory(data, suffix)) / STREAM_SAMPLE_RATE,
+            "subprocess_ms": subprocess_result["ms"],
+            "subprocess_peak_mb": subprocess_result["peak_mb"],
+            "ffmpeg_child_peak_mb": child_peak_mb,
+            "in_memory_ms": in_memory_result["ms"],
+            "in_memory_peak_mb": in_memory_result["peak_mb"]
+        }
+        rows.append(row)
+        logger.info(
+            f"{row['file']}: subprocess {row['subprocess_ms']:.1f}ms, in-memory {row['in_memory_ms']:.1f}ms"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark audio decoding overhead and peak memory by format")
+    parser.add_argument("--audio", required=True, nargs="+", help="Recordings to decode (e.g. mp3, wav, webm, m4a)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Decodes per recording and path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_audio_decoding(args.audio, args.repeats)
+
+    print(
+        f"{'file':<24} {'fmt':>4} {'audio-s':>7} "
+        f"{'subproc ms':>10} {'peak MB':>8} {'ffmpeg MB':>9} {'in-mem ms':>9} {'peak MB':>8}"
+    )
+    for row in rows:
+        print(
+            f"{row['file']:<24} {row['format']:>4} {row['audio_seconds']:>7.1f} "
+            f"{row['subprocess_ms']:>10.1f} {row['subprocess_peak_mb']:>8.1f} {row['ffmpeg_child_peak_mb']:>9.1f} "
+            f"{row['in_memory_ms']:>9.1f} {row['in_memory_peak_mb']:>8.1f}"
+        )
@@ -0,0 +1,89 @@
+import argparse
+import logging
+import os
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.jobs.benchmark_inference_modes import REFERENCE_SUFFIX, load_corpus, word_errors
+from app.services.audio_decoder import decode_audio
+from app.services.voice_service import latency_percentiles, load_whisper_model, needs_escalation
+
+logger = logging.getLogger(__name__)
+
+
+def benchmark_cascade(corpus_dir: str, fast_model: str, model_size: str) -> Dict:
+    """
+    Compare the fast-model-first cascade with always using the full model
+
+    Every recording of the corpus (a directory of recordings with .txt
+    reference transcripts, as for benchmark_inference_modes) is transcribed
+    by the full model alone and by the cascade: the fast model, re-run
+    with the full model when needs_escalation() rejects its result. Both
+    models are loaded up front, so latencies are inference only.
+
+    Returns:
+        Escalation rate, latency percentiles and word error rate of both
+    """
+    corpus = [(os.path.basename(path), decode_audio(path), reference) for path, reference in load_corpus(corpus_dir)]
+    if not corpus:
+        raise ValueError(f"No audio with {REFERENCE_SUFFIX} references in {corpus_dir}")
+
+    fast, _ = load_whisper_model(fast_model, settings.WHISPER_INFERENCE_MODE, settings.WHISPER_CPU_THREADS)
+    full, _ = load_whisper_model(model_size, settings.WHISPER_INFERENCE_MODE, settings.WHISPER_CPU_THREADS)
+
+    def transcribe(model, audio) -> Dict:
+        return model.transcribe(audio, fp16=False, language="en", task="transcribe")
+
+    # One-time kernel and cache setup is not part of the measurement
+    transcribe(fast, corpus[0][1])
+    transcribe(full, corpus[0][1])
+
+    escalations = 0
+    full_latency, cascade_latency = [], []
+    full_errors = cascade_errors = words = 0
+    for name, audio, reference in corpus:
+        started = time.perf_counter()
+        full_text = transcribe(full, audio)["text"]
+        full_latency.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        result = transcribe(fast, audio)
+        escalated = needs_escalation(result)
+        if escalated:
+            result = transcribe(full, audio)
+            escalations += 1
+        cascade_latency.append(time.perf_counter() - started)
+
+        errors, file_words = word_errors(reference, full_text)
+        full_errors += errors
+        words += file_words
+        cascade_errors += word_errors(reference, result["text"])[0]
+        logger.info(f"{name}: {'escalated' if escalated else 'kept fast result'}")
+
+    return {
+        "files": len(corpus),
+        "escalation_rate": escalations / len(corpus),
+        "full": {"latency": latency_percentiles(full_latency), "wer": full_errors / words if words else 0.0},
+        "cascade": {"latency": latency_percentiles(cascade_latency), "wer": cascade_errors / words if words else 0.0}
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fast-model-first transcription cascade")
+    parser.add_argument("--corpus", required=True, help="Directory of recordings with .txt reference transcripts")
+    parser.add_argument("--fast-model", default=settings.WHISPER_CASCADE_MODEL or "tiny", help="Model tried first")
+    parser.add_argument("--model-size", default="small", help="Model escalated to, and the baseline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = benchmark_cascade(args.corpus, args.fast_model, args.model_size)
+
+    print(f"{report['files']} files, escalation rate {report['escalation_rate']:.1%}")
+    print(f"{'':<22} {'p50-s':>7} {'p90-s':>7} {'p99-s':>7} {'WER':>7}")
+    for label, key in ((f"{args.model_size} only", "full"), (f"{args.fast_model} -> {args.model_size}", "cascade")):
+        latency = report[key]["latency"]
+        print(
+            f"{label:<22} {latency['p50']:>7.2f} {latency['p90']:>7.2f} {latency['p99']:>7.2f} "
+            f"{report[key]['wer']:>7.1%}"
+        )
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.constants import STREAM_SAMPLE_RATE
+from app.services.audio_decoder import decode_audio
+from app.services.chunked_transcription import ChunkedTranscriber
+from app.services.voice_service import load_whisper_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LENGTHS = [60, 300, 600]
+
+
+def _fit(audio: np.ndarray, seconds: int) -> np.ndarray:
+    """Repeat or cut a recording to a given length"""
+    samples = seconds * STREAM_SAMPLE_RATE
+    return np.resize(audio, samples) if len(audio) < samples else audio[:samples]
+
+
+def benchmark_chunked_transcription(audio_path: str, lengths: List[int], workers: List[int]) -> List[Dict]:
+    """
+    Compare sequential and parallel chunked transcription wall time
+
+    The recording is repeated or cut to each length, then transcribed by
+    one in-process model (the sequential baseline) and by a chunk worker
+    pool of each size. Pools are started, and their models loaded, before
+    timing.
+
+    Returns:
+        One row per length and worker count (workers 0 = sequential)
+    """
+    audio = decode_audio(audio_path)
+    model, _ = load_whisper_model(settings.WHISPER_MODEL_SIZE, settings.WHISPER_INFERENCE_MODE, settings.WHISPER_CPU_THREADS)
+
+    rows = []
+    for seconds in lengths:
+        samples = _fit(audio, seconds)
+        started = time.monotonic()
+        model.transcribe(samples, fp16=False, language="en")
+        rows.append({"seconds": seconds, "workers": 0, "wall_seconds": time.monotonic() - started})
+        logger.info(f"{seconds}s sequential: {rows[-1]['wall_seconds']:.1f}s")
+
+    for count in workers:
+        transcriber = ChunkedTranscriber(
+            count, settings.WHISPER_MODEL_SIZE, settings.WHISPER_INFERENCE_MODE, settings.WHISPER_CPU_THREADS
+        )
+        transcriber.start()
+        transcriber.wait_until_started()
+        try:
+            for seconds in lengths:
+                started = time.monotonic()
+                asyncio.run(transcriber.transcribe(_fit(audio, seconds), settings.WHISPER_MODEL_SIZE))
+                rows.append({"seconds": seconds, "workers": count, "wall_seconds": time.monotonic() - started})
+                logger.info(f"{seconds}s on {count} workers: {rows[-1]['wall_seconds']:.1f}s")
+        finally:
+            transcriber.shutdown()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel chunked transcription against audio length and workers")
+    parser.add_argument("--audio", required=True, help="Recording, repeated or cut to each length")
+    parser.add_argument("--lengths", type=int, nargs="+", default=DEFAULT_LENGTHS, help="Audio lengths in seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, os.cpu_count() or 2], help="Pool sizes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_chunked_transcription(args.audio, args.lengths, args.workers)
+
+    sequential = {row["seconds"]: row["wall_seconds"] for row in rows if row["workers"] == 0}
+    print(f"{'audio-s':>7} {'workers':>7} {'wall-s':>7} {'speedup':>8}")
+    for row in sorted(rows, key=lambda row: (row["seconds"], row["workers"])):
+        speedup = sequential[row["seconds"]] / row["wall_seconds"]
+        workers_label = row["workers"] or "seq"
+        print(f"{row['seconds']:>7} {workers_label:>7} {row['wall_seconds']:>7.1f} {speedup:>7.2f}x")
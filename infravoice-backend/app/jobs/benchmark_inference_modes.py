@@ -0,0 +1,161 @@
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.constants import STREAM_SAMPLE_RATE, WHISPER_INFERENCE_MODES
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_SUFFIX = ".txt"
+
+
+def _normalize(text: str) -> List[str]:
+    """Lowercase words without punctuation, for word error rate"""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """
+    Word-level edit distance between a reference and a hypothesis
+
+    Returns:
+        Tuple of (substitutions + deletions + insertions, reference words)
+    """
+    ref, hyp = _normalize(reference), _normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_corpus(corpus_dir: str) -> List[Tuple[str, str]]:
+    """Audio files of the corpus that have a reference transcript next to them"""
+    corpus = []
+    for name in sorted(os.listdir(corpus_dir)):
+        stem, ext = os.path.splitext(name)
+        reference_path = os.path.join(corpus_dir, stem + REFERENCE_SUFFIX)
+        if ext == REFERENCE_SUFFIX or not os.path.exists(reference_path):
+            continue
+        with open(reference_path) as reference_file:
+            corpus.append((os.path.join(corpus_dir, name), reference_file.read()))
+    return corpus
+
+
+def _memory_mb(field: str) -> float:
+    """VmRSS / VmHWM of this process from /proc (Linux)"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _run_mode(model_size: str, inference_mode: str, cpu_threads: int, corpus_dir: str) -> Dict:
+    """Load one inference mode and transcribe the corpus (in a fresh process)"""
+    from app.services.audio_decoder import decode_audio
+    from app.services.voice_service import _import_whisper, load_whisper_model
+
+    _import_whisper()
+    corpus = [(decode_audio(path), reference) for path, reference in load_corpus(corpus_dir)]
+    if not corpus:
+        raise ValueError(f"No audio with {REFERENCE_SUFFIX} references in {corpus_dir}")
+
+    gc.collect()
+    baseline_mb = _memory_mb("VmRSS")
+    started = time.monotonic()
+    model, device = load_whisper_model(model_size, inference_mode, cpu_threads)
+    load_seconds = time.monotonic() - started
+    gc.collect()
+    model_mb = _memory_mb("VmRSS") - baseline_mb
+
+    def transcribe(audio) -> str:
+        return model.transcribe(audio, fp16=False, language="en", task="transcribe")["text"]
+
+    # One-time kernel and cache setup is not part of the measurement
+    transcribe(corpus[0][0])
+
+    errors = words = 0
+    inference_seconds = audio_seconds = 0.0
+    for audio, reference in corpus:
+        started = time.monotonic()
+        hypothesis = transcribe(audio)
+        inference_seconds += time.monotonic() - started
+        audio_seconds += len(audio) / STREAM_SAMPLE_RATE
+
+        file_errors, file_words = word_errors(reference, hypothesis)
+        errors += file_errors
+        words += file_words
+
+    return {
+        "mode": inference_mode,
+        "device": device,
+        "files": len(corpus),
+        "audio_seconds": audio_seconds,
+        "load_seconds": load_seconds,
+        "real_time_factor": inference_seconds / audio_seconds,
+        "model_mb": model_mb,
+        "peak_mb": _memory_mb("VmHWM"),
+        "wer": errors / words if words else 0.0
+    }
+
+
+def benchmark_inference_modes(
+    corpus_dir: str,
+    modes: List[str],
+    model_size: str,
+    cpu_threads: int
+) -> List[Dict]:
+    """
+    Compare Whisper inference modes on a fixed local corpus
+
+    The corpus is a directory of recordings, each with a reference
+    transcript in a .txt file of the same name. Every mode runs in its own
+    spawned process, so memory figures are not skewed by a previously
+    loaded model. Real-time factor is inference time per second of audio
+    (below 1 is faster than real time); model memory is the RSS growth
+    from loading the model; word error rate is over normalized words.
+
+    Returns:
+        One row per mode
+    """
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for mode in modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            row = pool.submit(_run_mode, model_size, mode, cpu_threads, corpus_dir).result()
+        rows.append(row)
+        logger.info(f"{mode}: RTF {row['real_time_factor']:.3f}, {row['model_mb']:.0f}MB, WER {row['wer']:.1%}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Whisper inference modes: speed, memory and accuracy")
+    parser.add_argument("--corpus", required=True, help="Directory of recordings with .txt reference transcripts")
+    parser.add_argument("--modes", nargs="+", default=list(WHISPER_INFERENCE_MODES), help="Inference modes to compare")
+    parser.add_argument("--model-size", default=settings.WHISPER_MODEL_SIZE, help="Whisper model size")
+    parser.add_argument("--threads", type=int, default=settings.WHISPER_CPU_THREADS, help="CPU threads (0 = default)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_inference_modes(args.corpus, args.modes, args.model_size, args.threads)
+
+    print(f"{'mode':>6} {'device':>6} {'audio-s':>8} {'RTF':>6} {'model MB':>9} {'peak MB':>8} {'WER':>7}")
+    for row in rows:
+        print(
+            f"{row['mode']:>6} {row['device']:>6} {row['audio_seconds']:>8.1f} {row['real_time_factor']:>6.3f} "
+            f"{row['model_mb']:>9.0f} {row['peak_mb']:>8.0f} {row['wer']:>7.1%}"
+        )
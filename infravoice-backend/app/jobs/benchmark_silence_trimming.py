@@ -0,0 +1,93 @@
+import argparse
+import logging
+import math
+import os
+import time
+from typing import Dict, List
+
+from app.core.config import settings
+from app.core.constants import STREAM_SAMPLE_RATE
+from app.jobs.benchmark_inference_modes import word_errors
+from app.services.audio_decoder import decode_audio
+from app.services.speech_trim import trim_silence
+
+logger = logging.getLogger(__name__)
+
+# Samples per Whisper window (30 seconds)
+WINDOW_SAMPLES = 30 * STREAM_SAMPLE_RATE
+
+
+def benchmark_silence_trimming(audio_paths: List[str], transcribe: bool) -> List[Dict]:
+    """
+    Measure how much audio silence trimming removes before inference
+
+    Reports audio length and 30 second Whisper windows before and after
+    trimming, and the time the trimming pass takes. With transcribe, both
+    versions also go through the configured model: inference time of each
+    and the word difference between the two transcripts (trimming should
+    not change what is recognised).
+
+    Returns:
+        One row per recording
+    """
+    model = None
+    if transcribe:
+        from app.services.voice_service import load_whisper_model
+        model, _ = load_whisper_model(
+            settings.WHISPER_MODEL_SIZE,
+            settings.WHISPER_INFERENCE_MODE,
+            settings.WHISPER_CPU_THREADS
+        )
+
+    rows = []
+    for path in audio_paths:
+        audio = decode_audio(path)
+        started = time.perf_counter()
+        trimmed, _ = trim_silence(audio)
+        trim_ms = (time.perf_counter() - started) * 1000
+
+        row = {
+            "file": os.path.basename(path),
+            "seconds": len(audio) / STREAM_SAMPLE_RATE,
+            "trimmed_seconds": len(trimmed) / STREAM_SAMPLE_RATE,
+            "windows": math.ceil(len(audio) / WINDOW_SAMPLES),
+            "trimmed_windows": math.ceil(len(trimmed) / WINDOW_SAMPLES),
+            "trim_ms": trim_ms
+        }
+
+        if model is not None:
+            texts = []
+            for samples, key in ((audio, "inference_seconds"), (trimmed, "trimmed_inference_seconds")):
+                started = time.perf_counter()
+                text = model.transcribe(samples, fp16=False, language="en")["text"] if len(samples) else ""
+                row[key] = time.perf_counter() - started
+                texts.append(text)
+            errors, words = word_errors(*texts)
+            row["word_difference"] = errors / words if words else 0.0
+
+        rows.append(row)
+        logger.info(f"{row['file']}: {row['seconds']:.1f}s -> {row['trimmed_seconds']:.1f}s")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark silence trimming savings on recordings")
+    parser.add_argument("--audio", required=True, nargs="+", help="Recordings to trim")
+    parser.add_argument("--transcribe", action="store_true", help="Also time inference with and without trimming")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_silence_trimming(args.audio, args.transcribe)
+
+    print(f"{'file':<24} {'audio-s':>8} {'kept-s':>7} {'saved':>6} {'windows':>8} {'trim ms':>8}")
+    for row in rows:
+        saved = 1 - row["trimmed_seconds"] / row["seconds"] if row["seconds"] else 0.0
+        print(
+            f"{row['file']:<24} {row['seconds']:>8.1f} {row['trimmed_seconds']:>7.1f} {saved:>6.0%} "
+            f"{row['windows']:>3} -> {row['trimmed_windows']:<2} {row['trim_ms']:>8.1f}"
+        )
+        if "inference_seconds" in row:
+            print(
+                f"{'':<24} inference {row['inference_seconds']:.1f}s -> {row['trimmed_inference_seconds']:.1f}s, "
+                f"word difference {row['word_difference']:.1%}"
+            )
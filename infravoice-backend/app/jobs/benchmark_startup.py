@@ -0,0 +1,98 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODES = ["blocking", "background"]
+POLL_INTERVAL_SECONDS = 0.05
+
+
+def wait_for(url: str, deadline: float, ready=lambda response: response.ok) -> Optional[float]:
+    """Poll a URL until it answers as expected; monotonic time of success"""
+    while time.monotonic() < deadline:
+        try:
+            response = requests.get(url, timeout=1)
+            if ready(response):
+                return time.monotonic()
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(POLL_INTERVAL_SECONDS)
+    return None
+
+
+def whisper_settled(response: requests.Response) -> bool:
+    status = response.json()["subsystems"]["whisper"]["status"]
+    return status in ("ready", "unavailable")
+
+
+def _run(mode: str, port: int, timeout: float) -> Dict:
+    """Start the API with WHISPER_WARMUP=mode and time its first responses"""
+    env = {**os.environ, "WHISPER_WARMUP": mode}
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        base_url = f"http://127.0.0.1:{port}"
+        first_request = wait_for(f"{base_url}/health", deadline)
+        voice_ready = wait_for(f"{base_url}/ready", deadline, whisper_settled)
+    finally:
+        server.terminate()
+        server.wait()
+
+    def since_start(moment: Optional[float]) -> Optional[float]:
+        return moment - started if moment is not None else None
+
+    return {
+        "mode": mode,
+        "first_request_seconds": since_start(first_request),
+        "voice_ready_seconds": since_start(voice_ready)
+    }
+
+
+def benchmark_startup(modes: List[str], port: int, timeout: float) -> List[Dict]:
+    """
+    Measure time to first served request for each Whisper warm-up mode
+
+    Launches a uvicorn process per mode and records when /health first
+    answers and when /ready reports the Whisper model as settled. Run it
+    from the backend directory with the usual environment (.env).
+
+    Returns:
+        One row per mode
+    """
+    rows = []
+    for mode in modes:
+        row = _run(mode, port, timeout)
+        rows.append(row)
+        logger.info(f"{mode}: first request after {row['first_request_seconds']}s")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark time to first served request by Whisper warm-up mode")
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES, help="WHISPER_WARMUP values to compare")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the temporary server")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait per server")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_startup(args.modes, args.port, args.timeout)
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:.2f}" if value is not None else "timeout"
+
+    print(f"{'mode':>10} {'first request s':>15} {'voice ready s':>13}")
+    for row in rows:
+        print(f"{row['mode']:>10} {fmt(row['first_request_seconds']):>15} {fmt(row['voice_ready_seconds']):>13}")
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from app.core.config import settings
+from app.services.voice_service import get_whisper_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = [8, 16, 32]
+
+
+async def _run(audio_path: str, concurrency: int, max_batch_size: int) -> Dict[str, float]:
+    """Transcribe the same recording from `concurrency` callers at once"""
+    service = get_whisper_service()
+    service.max_batch_size = max_batch_size
+    service.queue_size = concurrency
+
+    started = time.monotonic()
+    results = await asyncio.gather(*[service.transcribe_audio(audio_path) for _ in range(concurrency)])
+    elapsed = time.monotonic() - started
+
+    audio_seconds = sum(result["duration"] for result in results)
+    return {
+        "wall_seconds": elapsed,
+        "audio_seconds": audio_seconds,
+        "throughput": audio_seconds / elapsed
+    }
+
+
+def benchmark_transcription(audio_path: str, concurrency: List[int], max_batch_size: int) -> List[Dict]:
+    """
+    Compare per-request and batched transcription throughput
+
+    Each concurrency level is run twice on the loaded model: with batches of
+    one (a separate forward pass per request) and with max_batch_size.
+    Throughput is audio seconds transcribed per wall-clock second.
+
+    Returns:
+        One row per concurrency level and batch size
+    """
+    # Load the model up front so it is not part of the first measurement
+    get_whisper_service().start_loading().result()
+
+    rows = []
+    for level in concurrency:
+        for batch_size in (1, max_batch_size):
+            # A fresh loop per run also restarts the batch scheduler
+            result = asyncio.run(_run(audio_path, level, batch_size))
+            rows.append({"concurrency": level, "max_batch_size": batch_size, **result})
+            logger.info(
+                f"concurrency {level}, batch {batch_size}: "
+                f"{result['throughput']:.1f} audio-s/s ({result['wall_seconds']:.1f}s wall)"
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched Whisper transcription throughput")
+    parser.add_argument("--audio", required=True, help="Recording to transcribe (ideally under 30s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY, help="Concurrent callers")
+    parser.add_argument("--batch-size", type=int, default=settings.WHISPER_MAX_BATCH_SIZE, help="Batch size to compare")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_transcription(args.audio, args.concurrency, args.batch_size)
+
+    print(f"{'concurrency':>11} {'batch':>5} {'audio-s/s':>10} {'speedup':>8}")
+    for unbatched, batched in zip(rows[::2], rows[1::2]):
+        for row in (unbatched, batched):
+            speedup = row["throughput"] / unbatched["throughput"]
+            print(f"{row['concurrency']:>11} {row['max_batch_size']:>5} {row['throughput']:>10.1f} {speedup:>7.2f}x")
@@ -0,0 +1,140 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from app.jobs.benchmark_startup import wait_for, whisper_settled
+
+logger = logging.getLogger(__name__)
+
+# Seconds between memory samples while workers finish loading
+SAMPLE_INTERVAL_SECONDS = 1.0
+# Samples in a row with total RSS within 1% before measuring
+STABLE_SAMPLES = 3
+
+
+def _workers(pid: int) -> List[int]:
+    """Worker processes spawned by a uvicorn supervisor, from /proc (Linux)"""
+    workers = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # Fields after the parenthesized command name: state, ppid, ...
+                parent = int(stat.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as cmdline:
+                # Skips multiprocessing's resource tracker, also a child
+                spawned = b"spawn_main" in cmdline.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid and spawned:
+            workers.append(int(entry))
+    return workers
+
+
+def _memory_mb(pid: int) -> Dict[str, float]:
+    """
+    RSS, PSS and USS of a process in MB
+
+    RSS counts shared pages in full in every process that maps them; PSS
+    divides them between those processes (the sum over workers is their
+    real footprint); USS is memory only this process holds.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "uss_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    }
+
+
+def _run(shared: bool, workers: int, port: int, timeout: float) -> Dict:
+    """Start the API with N workers, wait until their models are loaded and measure each worker"""
+    env = {
+        **os.environ,
+        "WHISPER_SHARED_WEIGHTS": str(shared).lower(),
+        "WHISPER_WARMUP": "blocking",
+        "WHISPER_CHUNK_WORKERS": "0"
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        if wait_for(f"http://127.0.0.1:{port}/ready", deadline, whisper_settled) is None:
+            raise TimeoutError(f"Server did not report Whisper ready within {timeout}s")
+
+        # Other workers may still be loading: wait for memory to settle
+        previous, stable = 0.0, 0
+        while stable < STABLE_SAMPLES and time.monotonic() < deadline:
+            time.sleep(SAMPLE_INTERVAL_SECONDS)
+            pids = _workers(server.pid)
+            total = sum(_memory_mb(pid)["rss_mb"] for pid in pids)
+            stable = stable + 1 if len(pids) == workers and abs(total - previous) <= 0.01 * total else 0
+            previous = total
+
+        per_worker = [{"pid": pid, **_memory_mb(pid)} for pid in _workers(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {"shared": shared, "workers": per_worker}
+
+
+def benchmark_worker_memory(workers: int, port: int, timeout: float) -> List[Dict]:
+    """
+    Compare per-worker memory with copied and with shared Whisper weights
+
+    Starts uvicorn with `workers` processes twice, with
+    WHISPER_SHARED_WEIGHTS off and on (chunk workers disabled, models
+    loaded before serving), and measures every worker once the models are
+    loaded. Run it from the backend directory with the usual environment
+    (.env) and WHISPER_INFERENCE_MODE=fp32.
+
+    Returns:
+        One row per run, with per-worker RSS, PSS and USS
+    """
+    rows = []
+    for shared in (False, True):
+        row = _run(shared, workers, port, timeout)
+        rows.append(row)
+        total_pss = sum(worker["pss_mb"] for worker in row["workers"])
+        logger.info(f"shared={shared}: {len(row['workers'])} workers, {total_pss:.0f}MB PSS in total")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-worker memory with copied vs shared Whisper weights")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the temporary server")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait per server")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = benchmark_worker_memory(args.workers, args.port, args.timeout)
+
+    print(f"{'weights':>8} {'pid':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}")
+    for row in rows:
+        label = "shared" if row["shared"] else "copied"
+        for worker in row["workers"]:
+            print(
+                f"{label:>8} {worker['pid']:>8} {worker['rss_mb']:>8.0f} "
+                f"{worker['pss_mb']:>8.0f} {worker['uss_mb']:>8.0f}"
+            )
+        total_pss = sum(worker["pss_mb"] for worker in row["workers"])
+        print(f"{label:>8} {'total':>8} {'':>8} {total_pss:>8.0f}")
@@ -0,0 +1,56 @@
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from datetime import date
+
+from app.services.pricing_catalog import build_catalog, read_pricing_dump
+
+logger = logging.getLogger(__name__)
+
+
+def build_pricing_catalog(source: str, output: str, version: str) -> int:
+    """
+    Build a SQLite pricing catalog from a CSV pricing dump
+
+    The dump has the columns resource_type, region, sku, unit, price_usd
+    (unit is hour, month or gb-month; region "*" applies to every region).
+    Rows are streamed into a temporary file which then atomically replaces
+    the output, so a running API never sees a half-built catalog.
+
+    Args:
+        source: Path of the CSV dump
+        output: Path of the catalog to write
+        version: Price data version stored in the catalog
+
+    Returns:
+        Number of price rows loaded
+    """
+    started = time.monotonic()
+    temp_path = f"{output}.tmp"
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        count = build_catalog(connection, read_pricing_dump(source), version)
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    os.replace(temp_path, output)
+    logger.info(f"Pricing catalog {version} built with {count} prices in {time.monotonic() - started:.1f}s")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the offline pricing catalog from a CSV pricing dump")
+    parser.add_argument("--source", required=True, help="CSV dump (resource_type,region,sku,unit,price_usd)")
+    parser.add_argument("--output", required=True, help="SQLite catalog to write (PRICING_CATALOG_PATH)")
+    parser.add_argument("--version", default=date.today().isoformat(), help="Price data version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    count = build_pricing_catalog(args.source, args.output, args.version)
+    print(f"Loaded {count} prices into {args.output}")
@@ -0,0 +1,72 @@
+import argparse
+import logging
+import time
+
+from sqlalchemy import func, select, update
+
+from app.core.constants import COST_RELEASED_STATUSES
+from app.db.base import SessionLocal
+from app.models.cost_estimate import CostEstimate
+from app.models.deployment import Deployment
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_cost_rollups() -> int:
+    """
+    Recompute latest cost pointers and per-user totals from cost_estimates
+
+    Backfills the rollups for estimates stored before they were maintained
+    and corrects any drift. Deployments and users are updated with one
+    UPDATE each, in a single transaction; updated_at is left untouched.
+
+    Returns:
+        Number of deployments with a latest cost estimate
+    """
+    started = time.monotonic()
+
+    latest = (
+        select(CostEstimate.deployment_id, CostEstimate.id, CostEstimate.monthly_cost)
+        .distinct(CostEstimate.deployment_id)
+        .order_by(CostEstimate.deployment_id, CostEstimate.created_at.desc())
+        .subquery()
+    )
+    user_total = (
+        select(func.coalesce(func.sum(Deployment.monthly_cost), 0.0))
+        .where(
+            Deployment.user_id == User.id,
+            Deployment.status.not_in(COST_RELEASED_STATUSES)
+        )
+        .scalar_subquery()
+    )
+
+    with SessionLocal() as db:
+        result = db.execute(
+            update(Deployment)
+            .where(Deployment.id == latest.c.deployment_id)
+            .values(
+                latest_cost_estimate_id=latest.c.id,
+                monthly_cost=latest.c.monthly_cost,
+                updated_at=Deployment.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(User)
+            .values(total_monthly_cost=user_total, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    logger.info(f"Cost rollups rebuilt for {result.rowcount} deployments in {time.monotonic() - started:.1f}s")
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild latest cost pointers and per-user cost totals")
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    count = rebuild_cost_rollups()
+    print(f"Rebuilt cost rollups for {count} deployments")
@@ -0,0 +1,94 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import Float, column, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.constants import SECURITY_SCORE_VERSION
+from app.db.base import engine
+from app.models.security_scan import SecurityScan
+from app.services.security_service import compute_security_scores
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def rescore_security_scans(batch_size: int = DEFAULT_BATCH_SIZE, rescore_all: bool = False) -> int:
+    """
+    Recompute stored security scores with the current scoring formula
+    
+    Rows are streamed from a server-side cursor on one connection and
+    updated batch by batch on a second connection, so memory use is bounded
+    by batch_size regardless of table size. Scores are recomputed from the
+    stored passed/severity counts with compute_security_scores, and each
+    batch is written with a single UPDATE ... FROM (VALUES ...) statement
+    that also stamps score_version.
+    
+    Args:
+        batch_size: Rows fetched, scored and updated per round trip
+        rescore_all: Also rescore rows already at SECURITY_SCORE_VERSION
+        
+    Returns:
+        Number of rows updated
+    """
+    scans = SecurityScan.__table__
+    
+    query = select(
+        scans.c.id,
+        scans.c.passed_checks,
+        scans.c.critical_issues,
+        scans.c.high_issues,
+        scans.c.medium_issues,
+        scans.c.low_issues
+    )
+    if not rescore_all:
+        query = query.where(or_(
+            scans.c.score_version.is_(None),
+            scans.c.score_version != SECURITY_SCORE_VERSION
+        ))
+    
+    updated = 0
+    started = time.monotonic()
+    
+    with engine.connect() as reader, engine.connect() as writer:
+        result = reader.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        
+        for rows in result.partitions():
+            ids = [row[0] for row in rows]
+            # NULL counts are treated as zero
+            counts = np.nan_to_num(np.array([row[1:] for row in rows], dtype=np.float64))
+            scores = compute_security_scores(*counts.T)
+            
+            rescored = values(
+                column("id", UUID(as_uuid=True)),
+                column("security_score", Float),
+                name="rescored"
+            ).data(list(zip(ids, scores.tolist())))
+            
+            writer.execute(
+                update(scans)
+                .where(scans.c.id == rescored.c.id)
+                .values(security_score=rescored.c.security_score, score_version=SECURITY_SCORE_VERSION)
+            )
+            writer.commit()
+            
+            updated += len(ids)
+            elapsed = time.monotonic() - started
+            logger.info(f"Rescored {updated} scans ({updated / elapsed:.0f} rows/s)")
+    
+    logger.info(f"Rescoring completed: {updated} scans updated to score version {SECURITY_SCORE_VERSION}")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute stored security scores with the current formula")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per batch")
+    parser.add_argument("--all", action="store_true", help="Rescore rows already at the current score version")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    count = rescore_security_scans(batch_size=args.batch_size, rescore_all=args.all)
+    print(f"Rescored {count} security scans")
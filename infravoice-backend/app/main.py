@@ -1,9 +1,10 @@
 import logging
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.api.v1.endpoints import auth, voice, code, security, cost, deployment
+from app.api.v1.endpoints import auth, voice, code, security, cost, deployment, analyze
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +14,8 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+_import_started = time.monotonic()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -38,6 +41,7 @@ app.include_router(code.router, prefix="/api/v1/code", tags=["Code Generation"])
 app.include_router(security.router, prefix="/api/v1/security", tags=["Security"])
 app.include_router(cost.router, prefix="/api/v1/cost", tags=["Cost Estimation"])
 app.include_router(deployment.router, prefix="/api/v1/deployment", tags=["Deployment"])
+app.include_router(analyze.router, prefix="/api/v1", tags=["Analysis"])
 
 
 @app.on_event("startup")
@@ -46,20 +50,32 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     
-    # Pre-load Whisper model (optional - can be lazy loaded)
+    # Load the Whisper model on its inference thread; in background mode
+    # everything else is served while it loads and voice endpoints answer 503
     try:
         from app.services.voice_service import get_whisper_service
-        logger.info("Initializing Whisper service...")
-        get_whisper_service()
-        logger.info("Whisper service initialized")
+        whisper_service = get_whisper_service()
+        if settings.WHISPER_WARMUP == "blocking":
+            logger.info("Loading Whisper model before serving...")
+            whisper_service.start_loading().result()
+        elif settings.WHISPER_WARMUP == "background":
+            logger.info("Loading Whisper model in the background")
+            whisper_service.start_loading()
+        else:
+            logger.info("Whisper model will load on the first voice request")
     except Exception as e:
         logger.warning(f"Failed to initialize Whisper service: {str(e)}")
+    
+    logger.info(f"Startup completed in {time.monotonic() - _import_started:.1f}s")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down application")
+    
+    from app.services.voice_service import get_whisper_service
+    get_whisper_service().shutdown()
 
 
 @app.get("/")
@@ -81,6 +97,16 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness of each subsystem; 503 until the API can serve requests"""
+    from app.services.readiness import get_readiness
+    readiness = await get_readiness()
+    if not readiness["ready"]:
+        response.status_code = 503
+    return readiness
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -3,6 +3,9 @@
 from .user import User
 from .deployment import Deployment
 from .security_scan import SecurityScan
+from .security_scan_issue import SecurityScanIssue
 from .cost_estimate import CostEstimate
+from .resource_cost_memo import ResourceCostMemo
+from .transcription import Transcription
 
-__all__ = ["User", "Deployment", "SecurityScan", "CostEstimate"]
+__all__ = ["User", "Deployment", "SecurityScan", "SecurityScanIssue", "CostEstimate", "ResourceCostMemo", "Transcription"]
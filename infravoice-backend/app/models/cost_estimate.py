@@ -21,6 +21,9 @@ class CostEstimate(Base):
     # Cost breakdown by resource (dict)
     breakdown = Column(JSONB, nullable=True, default=dict)
     
+    # Fingerprint per resource/module block of the estimated code (dict), used for cost diffs
+    resource_fingerprints = Column(JSONB, nullable=True)
+    
     # Optimization recommendations (array of objects)
     recommendations = Column(JSONB, nullable=True, default=list)
     
@@ -28,7 +31,7 @@ class CostEstimate(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
-    deployment = relationship("Deployment", back_populates="cost_estimates")
+    deployment = relationship("Deployment", back_populates="cost_estimates", foreign_keys=[deployment_id])
     
     def __repr__(self):
         return f"<CostEstimate {self.id} (monthly: ${self.monthly_cost:.2f})>"
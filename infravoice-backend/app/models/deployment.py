@@ -2,7 +2,7 @@ import uuid
 import json
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Float, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -15,7 +15,7 @@ class Deployment(Base):
     __tablename__ = "deployments"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Deployment details
     name = Column(String, nullable=False)
@@ -33,6 +33,14 @@ class Deployment(Base):
     # Resources
     resources = Column(Text, nullable=True)  # JSON array of resource types
     
+    # Latest cost estimate, maintained by app.services.cost_rollups
+    latest_cost_estimate_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("cost_estimates.id", ondelete="SET NULL", use_alter=True),
+        nullable=True
+    )
+    monthly_cost = Column(Float, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -42,7 +50,12 @@ class Deployment(Base):
     # Relationships
     user = relationship("User", back_populates="deployments")
     security_scans = relationship("SecurityScan", back_populates="deployment", cascade="all, delete-orphan")
-    cost_estimates = relationship("CostEstimate", back_populates="deployment", cascade="all, delete-orphan")
+    cost_estimates = relationship(
+        "CostEstimate",
+        back_populates="deployment",
+        cascade="all, delete-orphan",
+        foreign_keys="CostEstimate.deployment_id"
+    )
     
     @property
     def resources_list(self) -> Optional[List[str]]:
@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class ResourceCostMemo(Base):
+    """Priced resource block, shared across deployments"""
+    __tablename__ = "resource_cost_memo"
+    
+    # sha256 of normalized block content, region and price data version
+    memo_key = Column(String(64), primary_key=True)
+    resource_type = Column(String, nullable=False)
+    region = Column(String, nullable=False)
+    price_version = Column(String, nullable=False)
+    
+    # Breakdown entries of the block: [{"suffix": "[0]", "type": ..., "monthly_cost": ...}]
+    # An empty list means the block was priced at zero
+    entries = Column(JSONB, nullable=False, default=list)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<ResourceCostMemo {self.resource_type} ({self.region})>"
@@ -1,10 +1,11 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, Integer, Boolean, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.core.constants import SECURITY_SCORE_VERSION
 
 
 class SecurityScan(Base):
@@ -16,8 +17,11 @@ class SecurityScan(Base):
     
     # Scan results
     security_score = Column(Float, nullable=False)  # 0-10 scale
+    score_version = Column(Integer, nullable=True, default=SECURITY_SCORE_VERSION)  # NULL = scored before versioning
     passed_checks = Column(Integer, default=0)
     failed_checks = Column(Integer, default=0)
+    is_preliminary = Column(Boolean, nullable=False, default=False)  # Fast-path result awaiting the full Checkov scan
+    full_scan_error = Column(String, nullable=True)  # Why the full scan failed; the fast-path result is then final
     
     # Issue counts by severity
     critical_issues = Column(Integer, default=0)
@@ -33,6 +37,7 @@ class SecurityScan(Base):
     
     # Relationships
     deployment = relationship("Deployment", back_populates="security_scans")
+    issue_rows = relationship("SecurityScanIssue", back_populates="scan", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<SecurityScan {self.id} (score: {self.security_score})>"
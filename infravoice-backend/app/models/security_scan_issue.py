@@ -0,0 +1,42 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+class SecurityScanIssue(Base):
+    """Failed check from a security scan, one row per (scan, check_id, resource)"""
+    __tablename__ = "security_issues"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    scan_id = Column(UUID(as_uuid=True), ForeignKey("security_scans.id", ondelete="CASCADE"), nullable=False)
+    # Denormalized from the scan so cross-deployment queries avoid a join
+    deployment_id = Column(UUID(as_uuid=True), ForeignKey("deployments.id", ondelete="CASCADE"), nullable=True)
+    
+    # Issue details
+    check_id = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    resource = Column(String, nullable=False, default="")
+    title = Column(Text, nullable=True)
+    file_path = Column(String, nullable=True)
+    line_number = Column(Integer, nullable=True)
+    guideline = Column(String, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    scan = relationship("SecurityScan", back_populates="issue_rows")
+    
+    __table_args__ = (
+        UniqueConstraint("scan_id", "check_id", "resource", name="uq_security_issues_scan_check_resource"),
+        Index("ix_security_issues_check_deployment", "check_id", "deployment_id"),
+        Index("ix_security_issues_severity", "severity"),
+        Index("ix_security_issues_deployment", "deployment_id"),
+    )
+    
+    def __repr__(self):
+        return f"<SecurityScanIssue {self.check_id} ({self.severity}) on {self.resource}>"
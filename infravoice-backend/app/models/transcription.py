@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Float, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class Transcription(Base):
+    """Transcribed recording, one row per (user, audio content, model size)"""
+    __tablename__ = "transcriptions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    
+    # sha256 of the uploaded file's bytes
+    audio_hash = Column(String(64), nullable=False)
+    # Whisper model size requested (the user's tier model); NULL = stored before per-model history
+    model_size = Column(String, nullable=True)
+    # Whisper model that produced the transcript (the cascade model when its result was kept)
+    result_model_size = Column(String, nullable=True)
+    filename = Column(String, nullable=True)
+    
+    # Transcription result
+    transcript = Column(Text, nullable=False)
+    confidence = Column(Float, nullable=False)
+    duration = Column(Float, nullable=False)  # in seconds
+    language = Column(String, nullable=False, default="en")
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "audio_hash", "model_size", name="uq_transcriptions_user_audio_model"),
+        # Keyset pagination of a user's history, newest first (id breaks ties)
+        Index("ix_transcriptions_user_created", "user_id", "created_at", "id"),
+    )
+    
+    def __repr__(self):
+        return f"<Transcription {self.id} ({self.duration}s)>"
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Boolean, DateTime
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -22,6 +22,10 @@ class User(Base):
     api_quota = Column(Integer, default=API_QUOTAS[SubscriptionTier.FREE])
     api_calls_used = Column(Integer, default=0)
     
+    # Sum of the latest monthly costs of deployments not being destroyed,
+    # maintained by app.services.cost_rollups
+    total_monthly_cost = Column(Float, default=0.0, nullable=False)
+    
     # Status
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from uuid import UUID
+
+from app.schemas.security import SecurityScanResponse
+from app.schemas.cost import CostEstimateResponse
+
+
+class AnalyzeRequest(BaseModel):
+    """Schema for combined security scan and cost estimate request"""
+    terraform_code: str = Field(..., min_length=1)
+    deployment_id: Optional[UUID] = None
+
+
+class AnalyzeResponse(BaseModel):
+    """Schema for combined security scan and cost estimate response"""
+    deployment_id: Optional[UUID]
+    security: SecurityScanResponse
+    cost: CostEstimateResponse
+    message: str = "Analysis completed"
@@ -37,7 +37,86 @@ class CostEstimateResponse(BaseModel):
     recommendations: List[CostOptimization]
     created_at: datetime
     warning: Optional[str] = None
+    cached: bool = False
     message: str = "Cost estimate completed"
     
     class Config:
         from_attributes = True
+
+
+class CostDiffRequest(BaseModel):
+    """Schema for cost diff request, defaults to the deployment's current code"""
+    terraform_code: Optional[str] = Field(None, min_length=1)
+
+
+class ResourceCostChange(BaseModel):
+    """Schema for the cost change of one resource or module block"""
+    name: str
+    change: str  # added, changed, removed
+    previous_monthly_cost: float
+    monthly_cost: float
+    delta: float
+
+
+class CostDiffResponse(BaseModel):
+    """Schema for cost diff response"""
+    id: UUID
+    deployment_id: UUID
+    base_estimate_id: Optional[UUID]
+    previous_monthly_cost: float
+    monthly_cost: float
+    annual_cost: float
+    monthly_delta: float
+    changes: List[ResourceCostChange]
+    resource_costs: List[ResourceCost]
+    repriced_resources: int
+    reused_resources: int
+    created_at: datetime
+    warning: Optional[str] = None
+    message: str = "Cost diff completed"
+
+
+class CostSweepRequest(BaseModel):
+    """Schema for cost sweep request, defaults to the deployment's current code"""
+    terraform_code: Optional[str] = Field(None, min_length=1)
+    regions: List[str] = Field(default_factory=list)
+    instance_types: List[str] = Field(default_factory=list)  # fnmatch patterns, e.g. "m5.*"
+    counts: List[int] = Field(default_factory=list)
+    limit: int = Field(50, ge=1, le=1000)
+
+
+class CostSweepVariant(BaseModel):
+    """Schema for one ranked sweep combination (None keeps the code's value)"""
+    rank: int
+    region: Optional[str]
+    instance_type: Optional[str]
+    count: Optional[int]
+    monthly_cost: float
+    annual_cost: float
+    delta: float
+    approximated_prices: int
+
+
+class CostSweepResponse(BaseModel):
+    """Schema for cost sweep response"""
+    deployment_id: UUID
+    regions: List[Optional[str]]
+    instance_types: List[Optional[str]]
+    counts: List[Optional[int]]
+    baseline_monthly_cost: float
+    monthly_costs: List[List[List[Optional[float]]]]  # regions x instance types x counts
+    variants: List[CostSweepVariant]
+    total_variants: int
+    unavailable_variants: int
+    duration_ms: float
+    message: str = "Cost sweep completed"
+
+
+class CostMemoStats(BaseModel):
+    """Schema for resource cost memo hit-rate metrics"""
+    hits: int
+    misses: int
+    hit_rate: float
+    estimates: int
+    fully_memoized_estimates: int
+    entries: int
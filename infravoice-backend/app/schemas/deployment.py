@@ -35,6 +35,7 @@ class DeploymentResponse(DeploymentBase):
     status: DeploymentStatus
     error_message: Optional[str]
     resources: Optional[List[str]] = None
+    monthly_cost: Optional[float] = None  # Latest cost estimate
     created_at: datetime
     updated_at: datetime
     deployed_at: Optional[datetime]
@@ -35,7 +35,60 @@ class SecurityScanResponse(BaseModel):
     low_issues: int
     issues: List[SecurityIssue]
     created_at: datetime
+    is_preliminary: bool = False
+    full_scan_error: Optional[str] = None
     message: str = "Security scan completed"
     
     class Config:
         from_attributes = True
+
+
+class ModuleScanResult(BaseModel):
+    """Schema for one module of an archive scan, streamed as it completes"""
+    type: str = "module"
+    module: str
+    status: str  # completed, failed
+    completed: int
+    total: int
+    security_score: Optional[float] = None
+    passed_checks: int = 0
+    failed_checks: int = 0
+    critical_issues: int = 0
+    high_issues: int = 0
+    medium_issues: int = 0
+    low_issues: int = 0
+    issues: List[SecurityIssue] = []
+    error: Optional[str] = None
+
+
+class ArchiveScanSummary(BaseModel):
+    """Schema for the aggregate result closing an archive scan stream"""
+    type: str = "summary"
+    total_modules: int
+    scanned_modules: int
+    failed_modules: List[str]
+    security_score: float = Field(..., ge=0.0, le=10.0)
+    passed_checks: int
+    failed_checks: int
+    critical_issues: int
+    high_issues: int
+    medium_issues: int
+    low_issues: int
+
+
+class CheckFailureSummary(BaseModel):
+    """Schema for aggregated failures of one check across deployments"""
+    check_id: str
+    severity: str
+    title: Optional[str] = None
+    failure_count: int
+    deployment_count: int
+
+
+class FailingDeployment(BaseModel):
+    """Schema for a deployment failing a given check"""
+    deployment_id: UUID
+    deployment_name: str
+    failure_count: int
+    resource_count: int
+    last_seen: datetime
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from uuid import UUID
 
@@ -15,15 +16,75 @@ class VoiceTranscriptResponse(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0)
     duration: float  # in seconds
     language: str = "en"
+    cached: bool = False  # Answered from an earlier transcription of the same audio
+    model_size: Optional[str] = None  # Whisper model that produced the transcript
+    
+    class Config:
+        protected_namespaces = ()
+
+
+class UploadCreate(BaseModel):
+    """Schema for opening a resumable audio upload"""
+    filename: str
+    size: int = Field(..., gt=0)  # Total bytes that will be uploaded
+
+
+class UploadStatus(BaseModel):
+    """Schema for the state of a resumable audio upload"""
+    upload_id: str
+    filename: str
+    size: int
+    offset: int  # Bytes received; the next chunk starts here
+    complete: bool
+    expires_in: int  # Seconds until the upload is removed without further chunks
+    transcription: Optional[VoiceTranscriptResponse] = None  # Set once the final chunk is transcribed
+
+
+class CascadeStats(BaseModel):
+    """Schema for model cascade statistics"""
+    fast_model: str
+    transcriptions: int
+    escalations: int  # Re-run with the requested model
+    escalation_rate: float
+    accepted_latency_seconds: Dict[str, float]  # p50/p90/p99 of transcriptions kept from the fast model
+    escalated_latency_seconds: Dict[str, float]  # p50/p90/p99 of escalated transcriptions, both passes
+
+
+class VoiceQueueStats(BaseModel):
+    """Schema for transcription queue statistics"""
+    model_status: str
+    running: int
+    queued: int
+    queue_size: int
+    max_batch_size: int
+    completed: int
+    rejected: int
+    batches: int
+    avg_batch_size: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
+    avg_inference_seconds: float
+    cascade: Optional[CascadeStats] = None  # None when the cascade is off
+    
+    class Config:
+        protected_namespaces = ()
 
 
 class TranscriptionHistory(BaseModel):
     """Schema for transcription history item"""
     id: UUID
     transcript: str
+    filename: Optional[str] = None
     confidence: float
     duration: float
+    language: str = "en"
     created_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class TranscriptionHistoryPage(BaseModel):
+    """Schema for a page of transcription history, newest first"""
+    items: List[TranscriptionHistory]
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page; None on the last page
@@ -0,0 +1,253 @@
+import asyncio
+import gc
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.constants import (
+    STREAM_SAMPLE_RATE,
+    TRIM_FRAME_MS,
+    CHUNK_MAX_SECONDS,
+    CHUNK_SEARCH_SECONDS,
+    CHUNK_OVERLAP_SECONDS,
+    CHUNK_WORKER_MAX_MODELS,
+)
+from app.services.speech_trim import frame_energies, speech_threshold
+
+logger = logging.getLogger(__name__)
+
+# Words compared when removing text repeated across overlapping chunks
+OVERLAP_MAX_WORDS = 8
+
+# Models of a chunk worker process by size (least recently used first), and
+# the settings to load them with
+_worker_models: "OrderedDict[str, object]" = OrderedDict()
+_worker_settings: Tuple[str, int] = ("fp32", 0)
+
+
+def split_at_silence(audio: np.ndarray, sample_rate: int = STREAM_SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    Split a recording into chunks of at most CHUNK_MAX_SECONDS
+
+    Each cut is placed in the quietest frame of the last
+    CHUNK_SEARCH_SECONDS before the chunk limit, normally a pause between
+    words. When that frame is still speech (no pause to cut at), the two
+    chunks overlap by CHUNK_OVERLAP_SECONDS so no word is lost; the
+    repeated words are removed when stitching.
+
+    Returns:
+        List of (start, end) sample offsets, in order
+    """
+    max_length = CHUNK_MAX_SECONDS * sample_rate
+    if len(audio) <= max_length:
+        return [(0, len(audio))]
+
+    frame_size = sample_rate * TRIM_FRAME_MS // 1000
+    energies = frame_energies(audio, frame_size)
+    threshold = speech_threshold(energies)
+    overlap = int(CHUNK_OVERLAP_SECONDS * sample_rate)
+    search = CHUNK_SEARCH_SECONDS * sample_rate
+
+    chunks = []
+    start = 0
+    while len(audio) - start > max_length:
+        low = (start + max_length - overlap - search) // frame_size
+        high = (start + max_length - overlap) // frame_size
+        quietest = low + int(np.argmin(energies[low:high]))
+        cut = quietest * frame_size + frame_size // 2
+
+        if energies[quietest] > threshold:
+            chunks.append((start, cut + overlap // 2))
+            start = cut - overlap // 2
+        else:
+            chunks.append((start, cut))
+            start = cut
+    chunks.append((start, len(audio)))
+    return chunks
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _repeated_words(previous: List[str], following: List[str]) -> int:
+    """Number of leading words of `following` that repeat the end of `previous`"""
+    tail = [_normalize_word(word) for word in previous[-OVERLAP_MAX_WORDS:]]
+    head = [_normalize_word(word) for word in following[:OVERLAP_MAX_WORDS]]
+    for count in range(min(len(tail), len(head)), 0, -1):
+        if tail[-count:] == head[:count]:
+            return count
+    return 0
+
+
+def stitch_transcripts(
+    results: List[Dict],
+    chunks: List[Tuple[int, int]],
+    sample_rate: int = STREAM_SAMPLE_RATE
+) -> Dict:
+    """
+    Join chunk results into one transcribe()-style result
+
+    Segment times are shifted to recording time. Where chunks overlap,
+    words repeated at the start of the later chunk and segments lying
+    entirely within the earlier chunk are dropped.
+    """
+    words: List[str] = []
+    segments: List[Dict] = []
+    previous_end = 0
+
+    for result, (start, end) in zip(results, chunks):
+        offset = start / sample_rate
+        chunk_words = result["text"].split()
+        chunk_segments = [
+            {**segment, "start": segment.get("start", 0.0) + offset, "end": segment["end"] + offset}
+            for segment in result.get("segments", [])
+        ]
+
+        if start < previous_end:
+            chunk_words = chunk_words[_repeated_words(words, chunk_words):]
+            boundary = previous_end / sample_rate
+            chunk_segments = [segment for segment in chunk_segments if segment["end"] > boundary]
+
+        words += chunk_words
+        segments += chunk_segments
+        previous_end = end
+
+    return {
+        "text": " ".join(words),
+        "segments": segments,
+        "language": results[0].get("language", "en") if results else "en"
+    }
+
+
+def _worker_model_for(model_size: str):
+    """
+    Model of a size in this worker process, loaded on first use
+
+    At most CHUNK_WORKER_MAX_MODELS are kept; the least recently used is
+    unloaded before another one is loaded.
+    """
+    from app.services.voice_service import load_whisper_model
+
+    if model_size in _worker_models:
+        _worker_models.move_to_end(model_size)
+        return _worker_models[model_size]
+
+    while len(_worker_models) >= CHUNK_WORKER_MAX_MODELS:
+        _worker_models.popitem(last=False)
+        gc.collect()
+    _worker_models[model_size], _ = load_whisper_model(model_size, *_worker_settings)
+    return _worker_models[model_size]
+
+
+def _init_worker(model_size: str, inference_mode: str, cpu_threads: int) -> None:
+    """Load the default model once per worker process"""
+    global _worker_settings
+    _worker_settings = (inference_mode, cpu_threads)
+    _worker_model_for(model_size)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _transcribe_chunk(audio: np.ndarray, model_size: str) -> Dict:
+    """Transcribe one chunk in a worker process"""
+    result = _worker_model_for(model_size).transcribe(audio, fp16=False, language="en", task="transcribe")
+    return {
+        "text": result["text"],
+        "language": result.get("language", "en"),
+        "segments": [
+            {"start": segment["start"], "end": segment["end"], "no_speech_prob": segment["no_speech_prob"]}
+            for segment in result.get("segments", [])
+        ]
+    }
+
+
+class ChunkedTranscriber:
+    """
+    Parallel transcription of long recordings on a process pool
+
+    A recording is split at pauses into chunks of up to CHUNK_MAX_SECONDS,
+    which are transcribed concurrently by `workers` processes, each with
+    its own copy of the model, and stitched back together in order. Worker
+    processes are spawned (not forked, which is unsafe with torch threads)
+    and load the default model_size when the pool starts; other sizes are
+    loaded by each worker when a recording needs them, keeping at most
+    CHUNK_WORKER_MAX_MODELS per worker.
+    """
+
+    def __init__(self, workers: int, model_size: str, inference_mode: str, cpu_threads: int = 0):
+        """Initialize transcriber; the pool is started by start()"""
+        self.workers = workers
+        self.model_size = model_size
+        self.inference_mode = inference_mode
+        # Split the cores between workers unless a thread count is configured
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._startup: List = []
+
+    def start(self) -> None:
+        """Start the worker processes and have them load their models"""
+        if self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_size, self.inference_mode, self.cpu_threads)
+        )
+        # One task per worker so every process starts now, not on first use
+        self._startup = [self._pool.submit(_worker_ready) for _ in range(self.workers)]
+        logger.info(f"Chunked transcription pool started: {self.workers} workers, {self.cpu_threads} threads each")
+
+    def wait_until_started(self) -> None:
+        """Block until every worker process has loaded its model"""
+        for future in self._startup:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def transcribe(self, audio: np.ndarray, model_size: str) -> Dict:
+        """
+        Transcribe a long recording in parallel chunks with a model size
+
+        Returns:
+            transcribe()-style result (text, segments, language) with
+            recording-relative segment times
+
+        Raises:
+            RuntimeError: If a worker process died; the pool is restarted
+                on the next call
+        """
+        self.start()
+        started = time.monotonic()
+        chunks = split_at_silence(audio)
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await asyncio.gather(*[
+                loop.run_in_executor(self._pool, _transcribe_chunk, audio[start:end], model_size)
+                for start, end in chunks
+            ])
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise RuntimeError(f"Chunk worker process died: {str(e)}")
+
+        logger.info(
+            f"Transcribed {len(audio) / STREAM_SAMPLE_RATE:.0f}s of audio in {len(chunks)} chunks "
+            f"on {self.workers} workers in {time.monotonic() - started:.1f}s"
+        )
+        return stitch_transcripts(results, chunks)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.services.hcl_parser import HCLParseError, parse_terraform_files
+from app.services.pricing_catalog import get_pricing_catalog
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "cost-estimate"
+
+
+def canonicalize_terraform(terraform_code: Dict[str, str]) -> str:
+    """
+    Canonical form of Terraform code for cache keys
+
+    The parsed block structure is serialized with sorted keys, so comments,
+    formatting, attribute order and the file a block lives in do not change
+    the result. Unparseable code falls back to whitespace-normalized text.
+    """
+    try:
+        return json.dumps(parse_terraform_files(terraform_code), sort_keys=True, default=str)
+    except HCLParseError:
+        return "\n".join(
+            line.strip()
+            for key in ("main_tf", "variables_tf", "outputs_tf")
+            for line in (terraform_code.get(key, "") or "").splitlines()
+            if line.strip()
+        )
+
+
+class CostEstimateCache:
+    """
+    Two-level cache for cost estimates
+
+    A small in-process LRU sits in front of Redis. Keys combine a hash of
+    the canonicalized Terraform with the pricing data version, and entries
+    expire after COST_CACHE_TTL_SECONDS so estimates follow price updates.
+    Redis errors are logged and treated as misses.
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int, lru_size: int):
+        """Initialize cost estimate cache"""
+        self.ttl_seconds = ttl_seconds
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Short timeouts: an unreachable Redis must not stall estimates
+        self._redis = redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+        logger.info(f"Cost estimate cache initialized (ttl: {ttl_seconds}s, lru: {lru_size})")
+
+    def key_for(self, terraform_code: Dict[str, str]) -> str:
+        """Cache key for Terraform code under the current pricing data version"""
+        digest = hashlib.sha256(canonicalize_terraform(terraform_code).encode()).hexdigest()
+        return f"{CACHE_KEY_PREFIX}:{get_pricing_catalog().version}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Return a cached estimate, checking the LRU before Redis"""
+        entry = self._lru.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.monotonic():
+                self._lru.move_to_end(key)
+                return json.loads(payload)
+            del self._lru[key]
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                payload, ttl_ms = await pipe.get(key).pttl(key).execute()
+        except redis.RedisError as e:
+            logger.warning(f"Cost cache lookup failed: {str(e)}")
+            return None
+
+        if payload is None:
+            return None
+
+        # Keep the LRU copy no longer than the Redis entry lives
+        ttl = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else self.ttl_seconds
+        self._remember(key, payload.decode(), ttl)
+        return json.loads(payload)
+
+    async def set(self, key: str, estimate: Dict) -> None:
+        """Store an estimate in both cache levels"""
+        payload = json.dumps(estimate)
+        self._remember(key, payload, self.ttl_seconds)
+
+        try:
+            await self._redis.set(key, payload, ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"Cost cache store failed: {str(e)}")
+
+    async def ping(self) -> bool:
+        """Whether Redis is reachable"""
+        try:
+            return bool(await self._redis.ping())
+        except redis.RedisError as e:
+            logger.warning(f"Cost cache ping failed: {str(e)}")
+            return False
+
+    def _remember(self, key: str, payload: str, ttl: float) -> None:
+        self._lru[key] = (time.monotonic() + ttl, payload)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+# Singleton instance
+_cost_cache = None
+
+
+def get_cost_cache() -> CostEstimateCache:
+    """Get or create cost estimate cache singleton"""
+    global _cost_cache
+    if _cost_cache is None:
+        _cost_cache = CostEstimateCache(
+            settings.REDIS_URL,
+            settings.COST_CACHE_TTL_SECONDS,
+            settings.COST_CACHE_LRU_SIZE
+        )
+    return _cost_cache
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.resource_cost_memo import ResourceCostMemo
+from app.services.hcl_parser import HCLParseError, parse_terraform_files, referenced_inputs, referenced_variables
+from app.services.pricing_catalog import get_pricing_catalog, resource_region
+
+logger = logging.getLogger(__name__)
+
+
+def memo_keys(terraform_code: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+    """
+    Memo keys for every resource block of Terraform code
+
+    A key hashes the resource type, the normalized block body (attribute
+    order and formatting ignored), the locals and data sources it
+    references, the defaults of the variables it references (directly or
+    through those), its region and the pricing data version. The block name is
+    not part of the key, so identical blocks in different deployments share
+    one memo entry.
+
+    Returns:
+        Dict of block address -> {"key", "resource_type", "region"}; module
+        blocks have a None key (empty if the code cannot be parsed)
+    """
+    try:
+        parsed = parse_terraform_files(terraform_code)
+    except HCLParseError:
+        return {}
+
+    variables = parsed.get("variable", {}) or {}
+    providers = parsed.get("provider", {}) or {}
+    price_version = get_pricing_catalog().version
+
+    keys = {}
+    for resource_type, resources in (parsed.get("resource", {}) or {}).items():
+        if not isinstance(resources, dict):
+            continue
+        for name, body in resources.items():
+            if not isinstance(body, dict):
+                continue
+            region = resource_region(resource_type, body, providers, variables)
+            inputs = referenced_inputs(body, parsed)
+            payload = json.dumps(
+                [resource_type, body, inputs, referenced_variables([body, inputs], variables), region, price_version],
+                sort_keys=True,
+                default=str
+            )
+            keys[f"{resource_type}.{name}"] = {
+                "key": hashlib.sha256(payload.encode()).hexdigest(),
+                "resource_type": resource_type,
+                "region": region
+            }
+
+    # Module contents live outside the code, so modules are always priced
+    for name in (parsed.get("module", {}) or {}):
+        keys[f"module.{name}"] = {"key": None, "resource_type": "module", "region": ""}
+    return keys
+
+
+class ResourceCostMemoStore:
+    """
+    Database-backed memo of priced resource blocks
+
+    Entries older than COST_CACHE_TTL_SECONDS are ignored so memoized
+    prices follow upstream price updates. Memo access uses its own short
+    sessions; it is a cache shared by all requests, not part of their
+    transactions. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        """Initialize resource cost memo"""
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.estimates = 0
+        self.fully_memoized = 0
+        logger.info(f"Resource cost memo initialized (ttl: {ttl_seconds}s)")
+
+    def lookup(self, keys: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Fetch memoized breakdown entries
+
+        Returns:
+            Dict of memo key -> breakdown entries for the keys found
+        """
+        if not keys:
+            return {}
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(ResourceCostMemo.memo_key, ResourceCostMemo.entries).where(
+                    ResourceCostMemo.memo_key.in_(set(keys)),
+                    ResourceCostMemo.created_at >= cutoff
+                )
+            ).all()
+        return {key: entries for key, entries in rows}
+
+    def store(self, rows: List[Dict]) -> None:
+        """Insert or refresh memo entries (memo_key, resource_type, region, entries)"""
+        if not rows:
+            return
+
+        price_version = get_pricing_catalog().version
+        now = datetime.utcnow()
+        values = [
+            {**row, "price_version": price_version, "created_at": now}
+            for row in {row["memo_key"]: row for row in rows}.values()
+        ]
+
+        statement = insert(ResourceCostMemo).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ResourceCostMemo.memo_key],
+            set_={"entries": statement.excluded.entries, "created_at": statement.excluded.created_at}
+        )
+        with SessionLocal() as db:
+            db.execute(statement)
+            db.commit()
+
+    def record(self, hits: int, misses: int, infracost_skipped: bool) -> None:
+        """Update hit-rate counters after an estimate"""
+        self.hits += hits
+        self.misses += misses
+        self.estimates += 1
+        if infracost_skipped:
+            self.fully_memoized += 1
+
+    def stats(self) -> Dict[str, any]:
+        """Hit-rate metrics for this process plus the memo table size"""
+        lookups = self.hits + self.misses
+        with SessionLocal() as db:
+            entries = db.execute(select(func.count()).select_from(ResourceCostMemo)).scalar_one()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "estimates": self.estimates,
+            "fully_memoized_estimates": self.fully_memoized,
+            "entries": entries
+        }
+
+
+# Singleton instance
+_cost_memo = None
+
+
+def get_cost_memo() -> ResourceCostMemoStore:
+    """Get or create resource cost memo singleton"""
+    global _cost_memo
+    if _cost_memo is None:
+        _cost_memo = ResourceCostMemoStore(settings.COST_CACHE_TTL_SECONDS)
+    return _cost_memo
@@ -0,0 +1,69 @@
+import logging
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.core.constants import COST_RELEASED_STATUSES, DeploymentStatus
+from app.models.cost_estimate import CostEstimate
+from app.models.deployment import Deployment
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def _lock(db: Session, deployment: Deployment) -> None:
+    """Reload the rollup inputs of a deployment under a row lock"""
+    db.refresh(deployment, attribute_names=["user_id", "status", "monthly_cost"], with_for_update=True)
+
+
+def _adjust_user_total(db: Session, user_id: uuid.UUID, delta: float) -> None:
+    # Relative update, so concurrent changes to other deployments are not lost;
+    # a rollup is not a profile change, so updated_at is kept
+    if delta:
+        db.query(User).filter(User.id == user_id).update(
+            {User.total_monthly_cost: User.total_monthly_cost + delta, User.updated_at: User.updated_at},
+            synchronize_session=False
+        )
+
+
+def record_cost_estimate(db: Session, cost_estimate: CostEstimate) -> None:
+    """
+    Make a new cost estimate its deployment's latest and update the owner's total
+
+    Flushes the estimate first so its id is available. The caller owns the
+    transaction, so the estimate and the rollups commit together.
+    """
+    if cost_estimate.deployment_id is None:
+        return
+
+    db.flush()
+    deployment = db.get(Deployment, cost_estimate.deployment_id)
+    if deployment is None:
+        return
+    _lock(db, deployment)
+
+    previous = deployment.monthly_cost or 0.0
+    deployment.latest_cost_estimate_id = cost_estimate.id
+    deployment.monthly_cost = cost_estimate.monthly_cost
+
+    if deployment.status not in COST_RELEASED_STATUSES:
+        _adjust_user_total(db, deployment.user_id, cost_estimate.monthly_cost - previous)
+
+
+def set_deployment_status(db: Session, deployment: Deployment, status: DeploymentStatus) -> None:
+    """
+    Change a deployment's status, moving its cost in or out of the owner's total
+
+    Destroying a deployment releases its latest monthly cost; moving it back
+    to any other state counts it again. The caller commits.
+    """
+    _lock(db, deployment)
+
+    was_counted = deployment.status not in COST_RELEASED_STATUSES
+    is_counted = status not in COST_RELEASED_STATUSES
+    deployment.status = status
+
+    if deployment.monthly_cost and was_counted != is_counted:
+        delta = deployment.monthly_cost if is_counted else -deployment.monthly_cost
+        _adjust_user_total(db, deployment.user_id, delta)
+        logger.debug(f"Deployment {deployment.id} cost {delta:+.2f}/month applied to user total")
@@ -1,15 +1,113 @@
+import asyncio
+import hashlib
 import json
-import subprocess
-import tempfile
 import os
+import re
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 from app.core.config import settings
 from app.core.constants import COST_WARNING_THRESHOLD
+from app.services.cost_cache import get_cost_cache
+from app.services.cost_memo import get_cost_memo, memo_keys
+from app.services.hcl_parser import HCLParseError, parse_terraform_files, referenced_variables, split_blocks
+from app.services.pricing_catalog import get_pricing_catalog
+from app.services.streaming_parsers import InfracostOutputParser, run_streaming_command
+from app.services.terraform_workspace import terraform_workspace
 
 logger = logging.getLogger(__name__)
 
+_INDEX_RE = re.compile(r"\[[^\]]*\]")
+
+
+def _block_address(block_type: str, labels: List[str]) -> Optional[str]:
+    """Address of a priced block: resource TYPE.NAME or module.NAME"""
+    if block_type == "resource" and len(labels) == 2:
+        return f"{labels[0]}.{labels[1]}"
+    if block_type == "module" and len(labels) == 1:
+        return f"module.{labels[0]}"
+    return None
+
+
+def breakdown_address(name: str) -> str:
+    """
+    Map a breakdown entry to the block that produced it
+    
+    aws_instance.web[1] -> aws_instance.web,
+    module.vpc.aws_nat_gateway.this[0] -> module.vpc
+    """
+    return ".".join(_INDEX_RE.sub("", name).split(".")[:2])
+
+
+def group_breakdown(breakdown: Dict[str, float]) -> Dict[str, float]:
+    """Sum breakdown costs per resource/module block"""
+    grouped: Dict[str, float] = {}
+    for name, cost in (breakdown or {}).items():
+        address = breakdown_address(name)
+        grouped[address] = grouped.get(address, 0.0) + cost
+    return grouped
+
+
+def resource_fingerprints(terraform_code: Dict[str, str]) -> Dict[str, str]:
+    """
+    Fingerprint every resource and module block of Terraform code
+    
+    A fingerprint covers the block body, the values of the variables it
+    references, and the provider/locals configuration shared by all
+    blocks, so any edit that can change a block's price changes it.
+    
+    Returns:
+        Dict of block address -> fingerprint (empty if the code cannot be parsed)
+    """
+    try:
+        parsed = parse_terraform_files(terraform_code)
+    except HCLParseError as e:
+        logger.warning(f"Could not fingerprint Terraform resources: {str(e)}")
+        return {}
+    
+    variables = parsed.get("variable", {}) or {}
+    shared = json.dumps(
+        [parsed.get("provider"), parsed.get("locals"), parsed.get("terraform")],
+        sort_keys=True,
+        default=str
+    )
+    
+    blocks = {}
+    for resource_type, resources in (parsed.get("resource", {}) or {}).items():
+        if isinstance(resources, dict):
+            for name, body in resources.items():
+                blocks[f"{resource_type}.{name}"] = body
+    for name, body in (parsed.get("module", {}) or {}).items():
+        blocks[f"module.{name}"] = body
+    
+    fingerprints = {}
+    for address, body in blocks.items():
+        payload = json.dumps([body, referenced_variables(body, variables), shared], sort_keys=True, default=str)
+        fingerprints[address] = hashlib.sha256(payload.encode()).hexdigest()[:16]
+    
+    return fingerprints
+
+
+def select_blocks(terraform_code: Dict[str, str], addresses: Set[str]) -> Dict[str, str]:
+    """
+    Reduce Terraform code to the given resource/module blocks
+    
+    Provider, terraform, locals, variable and data blocks of main.tf and
+    the whole variables.tf are kept so the selected blocks still evaluate;
+    outputs are dropped since they may reference blocks that were removed.
+    """
+    kept = []
+    for block_type, labels, source in split_blocks(terraform_code.get("main_tf", "")):
+        address = _block_address(block_type, labels)
+        if address is None or address in addresses:
+            kept.append(source)
+    
+    return {
+        "main_tf": "\n\n".join(kept) + "\n",
+        "variables_tf": terraform_code.get("variables_tf", "") or "",
+        "outputs_tf": ""
+    }
+
 
 class InfracostEstimator:
     """Service for cost estimation using Infracost"""
@@ -29,39 +127,293 @@ class InfracostEstimator:
         Returns:
             Dict with monthly cost, annual cost, breakdown, and recommendations
         """
+        cache_key, cached = await self._get_cached(terraform_code)
+        if cached is not None:
+            return cached
+        
         try:
-            logger.info("Starting Infracost cost estimation")
-            
             # Create temporary directory for Terraform files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Write Terraform files
-                main_path = os.path.join(temp_dir, "main.tf")
-                vars_path = os.path.join(temp_dir, "variables.tf")
-                outputs_path = os.path.join(temp_dir, "outputs.tf")
-                
-                with open(main_path, 'w') as f:
-                    f.write(terraform_code.get("main_tf", ""))
-                with open(vars_path, 'w') as f:
-                    f.write(terraform_code.get("variables_tf", ""))
-                with open(outputs_path, 'w') as f:
-                    f.write(terraform_code.get("outputs_tf", ""))
-                
-                # Run Infracost
-                result = await self._run_infracost(temp_dir)
-                
-                # Parse and process results
-                cost_data = self._process_cost_data(result)
-                
-                logger.info(f"Cost estimation completed: ${cost_data['monthly_cost']:.2f}/month")
-                return cost_data
+            with terraform_workspace(terraform_code) as temp_dir:
+                cost_data = await self._estimate_directory(temp_dir, terraform_code)
+        except OSError as e:
+            logger.error(f"Failed to prepare Terraform workspace: {str(e)}")
+            return self._get_fallback_estimate(terraform_code)
+        
+        await self._store(cache_key, cost_data)
+        return cost_data
+    
+    async def estimate_directory(self, directory: str, terraform_code: Dict[str, str]) -> Dict[str, any]:
+        """
+        Estimate costs for an already materialized Terraform directory
+        
+        Args:
+            directory: Path containing the Terraform files
+            terraform_code: Dict with main_tf, variables_tf, outputs_tf (used for fallback)
+            
+        Returns:
+            Dict with monthly cost, annual cost, breakdown, and recommendations
+        """
+        cache_key, cached = await self._get_cached(terraform_code)
+        if cached is not None:
+            return cached
+        
+        cost_data = await self._estimate_directory(directory, terraform_code)
+        await self._store(cache_key, cost_data)
+        return cost_data
+    
+    async def estimate_diff(
+        self,
+        terraform_code: Dict[str, str],
+        previous_breakdown: Dict[str, float],
+        previous_fingerprints: Optional[Dict[str, str]]
+    ) -> Dict[str, any]:
+        """
+        Estimate the cost change from a previous estimate to new code
+        
+        Blocks whose fingerprint matches the previous estimate keep their
+        stored breakdown entries; only added or changed blocks are priced,
+        by estimating a copy of the code reduced to those blocks.
+        
+        Args:
+            terraform_code: New Dict with main_tf, variables_tf, outputs_tf
+            previous_breakdown: Breakdown of the previous estimate
+            previous_fingerprints: Block fingerprints of the previous estimate,
+                None to reprice every block
+            
+        Returns:
+            Dict with previous and new monthly cost, merged breakdown,
+            per-block changes, fingerprints and recommendations
+        """
+        fingerprints = resource_fingerprints(terraform_code)
+        previous_costs = group_breakdown(previous_breakdown)
+        
+        if previous_fingerprints:
+            previous_addresses = set(previous_fingerprints)
+            changed = {a for a, fp in fingerprints.items() if previous_fingerprints.get(a) != fp}
+        else:
+            # No baseline fingerprints: every block has to be priced
+            previous_addresses = set(previous_costs)
+            changed = set(fingerprints)
+        removed = previous_addresses - set(fingerprints)
+        
+        breakdown = {
+            name: cost for name, cost in (previous_breakdown or {}).items()
+            if breakdown_address(name) in fingerprints and breakdown_address(name) not in changed
+        }
+        warning = None
+        
+        if not fingerprints:
+            # Unparseable code: fall back to a full estimate
+            full = await self.estimate_cost(terraform_code)
+            breakdown = dict(full["breakdown"])
+            changed = set(group_breakdown(breakdown))
+            removed = previous_addresses - changed
+            warning = full.get("warning")
+        elif changed:
+            logger.info(f"Repricing {len(changed)} of {len(fingerprints)} blocks")
+            partial = await self.estimate_cost(select_blocks(terraform_code, changed))
+            breakdown.update(partial["breakdown"])
+            warning = partial.get("warning")
+        
+        new_costs = group_breakdown(breakdown)
+        changes = []
+        for address in sorted(changed | removed):
+            previous_cost = round(previous_costs.get(address, 0.0), 2)
+            new_cost = round(new_costs.get(address, 0.0), 2)
+            if address in removed:
+                change = "removed"
+            elif address in previous_addresses:
+                change = "changed"
+            else:
+                change = "added"
+            changes.append({
+                "name": address,
+                "change": change,
+                "previous_monthly_cost": previous_cost,
+                "monthly_cost": new_cost,
+                "delta": round(new_cost - previous_cost, 2)
+            })
+        changes.sort(key=lambda c: abs(c["delta"]), reverse=True)
+        
+        previous_monthly = sum((previous_breakdown or {}).values())
+        monthly_cost = sum(breakdown.values())
+        
+        resource_costs = [
+            {
+                "name": name,
+                "type": breakdown_address(name).split(".")[0],
+                "monthly_cost": round(cost, 2),
+                "percentage": round((cost / monthly_cost * 100) if monthly_cost > 0 else 0, 1)
+            }
+            for name, cost in breakdown.items()
+        ]
+        resource_costs.sort(key=lambda x: x["monthly_cost"], reverse=True)
+        
+        return {
+            "previous_monthly_cost": round(previous_monthly, 2),
+            "monthly_cost": round(monthly_cost, 2),
+            "annual_cost": round(monthly_cost * 12, 2),
+            "monthly_delta": round(monthly_cost - previous_monthly, 2),
+            "breakdown": breakdown,
+            "resource_costs": resource_costs,
+            "changes": changes,
+            "repriced_resources": len(changed),
+            "reused_resources": len(fingerprints) - len(changed) if fingerprints else 0,
+            "resource_fingerprints": fingerprints,
+            "recommendations": self._generate_recommendations(monthly_cost, resource_costs),
+            "warning": warning
+        }
+    
+    async def _get_cached(self, terraform_code: Dict[str, str]) -> Tuple[Optional[str], Optional[Dict]]:
+        """Look up a cached estimate; returns (cache key, estimate or None)"""
+        try:
+            cache = get_cost_cache()
+            cache_key = cache.key_for(terraform_code)
+            cached = await cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Cost cache unavailable: {str(e)}")
+            return None, None
+        
+        if cached is not None:
+            logger.info(f"Cost estimate served from cache: ${cached['monthly_cost']:.2f}/month")
+            cached["cached"] = True
+        return cache_key, cached
+    
+    async def _store(self, cache_key: Optional[str], cost_data: Dict) -> None:
+        """Cache an Infracost estimate; fallback estimates are never cached"""
+        if cache_key and not cost_data.get("is_fallback"):
+            await get_cost_cache().set(cache_key, cost_data)
+    
+    async def _estimate_directory(self, directory: str, terraform_code: Dict[str, str]) -> Dict[str, any]:
+        """
+        Price a directory, reusing memoized resource blocks
+        
+        Resource blocks found in the cross-deployment memo are not sent to
+        Infracost; the rest are priced (on the full directory if nothing
+        was memoized, otherwise on a copy reduced to the missing blocks)
+        and memoized. Falls back to the pricing catalog on failure.
+        """
+        try:
+            memo = get_cost_memo()
+            keys = memo_keys(terraform_code)
+            try:
+                memoized = memo.lookup([k["key"] for k in keys.values() if k["key"]])
+            except Exception as e:
+                logger.warning(f"Resource cost memo lookup failed: {str(e)}")
+                memoized = {}
+            
+            missing = {address for address, k in keys.items() if k["key"] not in memoized}
+            hits = len(keys) - len(missing)
+            
+            if not hits:
+                logger.info("Starting Infracost cost estimation")
+                infracost_result = await self._run_infracost(directory)
+            elif missing:
+                logger.info(f"Starting Infracost cost estimation for {len(missing)} of {len(keys)} blocks")
+                with terraform_workspace(select_blocks(terraform_code, missing)) as temp_dir:
+                    infracost_result = await self._run_infracost(temp_dir)
+            else:
+                infracost_result = None
+            cost_data = self._process_cost_data(infracost_result) if infracost_result is not None else None
+            
+            # Group Infracost entries by block and memoize the newly priced blocks.
+            # Only blocks Infracost reported are memoized: an empty entry list
+            # means "priced at zero", not "left out of the output".
+            reported = self._reported_addresses(infracost_result) if infracost_result is not None else set()
+            priced: Dict[str, List[Dict]] = {address: [] for address in missing}
+            for rc in (cost_data["resource_costs"] if cost_data else []):
+                address = breakdown_address(rc["name"])
+                priced.setdefault(address, []).append({
+                    "suffix": rc["name"][len(address):],
+                    "type": rc["type"],
+                    "monthly_cost": cost_data["breakdown"].get(rc["name"], rc["monthly_cost"])
+                })
+            
+            new_rows = [
+                {
+                    "memo_key": keys[address]["key"],
+                    "resource_type": keys[address]["resource_type"],
+                    "region": keys[address]["region"],
+                    "entries": priced[address]
+                }
+                for address in missing if keys[address]["key"] and address in reported
+            ]
+            try:
+                memo.store(new_rows)
+            except Exception as e:
+                logger.warning(f"Resource cost memo store failed: {str(e)}")
+            
+            if keys:
+                memo.record(
+                    hits=hits,
+                    misses=sum(1 for address in missing if keys[address]["key"]),
+                    infracost_skipped=cost_data is None
+                )
+            
+            if hits:
+                # Assemble the estimate from memoized and freshly priced blocks
+                items = [
+                    (f"{address}{entry['suffix']}", entry["type"], entry["monthly_cost"])
+                    for address, k in keys.items() if address not in missing
+                    for entry in memoized[k["key"]]
+                ]
+                items += [
+                    (f"{address}{entry['suffix']}", entry["type"], entry["monthly_cost"])
+                    for address, entries in priced.items()
+                    for entry in entries
+                ]
+                cost_data = self._assemble_cost_data(items)
+            
+            logger.info(
+                f"Cost estimation completed: ${cost_data['monthly_cost']:.2f}/month "
+                f"({hits}/{len(keys)} blocks memoized)"
+            )
+            return cost_data
                 
         except Exception as e:
             logger.error(f"Cost estimation failed: {str(e)}")
             # Return fallback estimate instead of failing
             return self._get_fallback_estimate(terraform_code)
     
+    def _assemble_cost_data(self, items: List[Tuple[str, str, float]]) -> Dict[str, any]:
+        """Build the standardized estimate from (name, type, monthly cost) entries"""
+        monthly_cost = sum(cost for _, _, cost in items)
+        
+        breakdown = {}
+        resource_costs = []
+        for name, resource_type, cost in items:
+            if cost <= 0:
+                continue
+            breakdown[name] = cost
+            resource_costs.append({
+                "name": name,
+                "type": resource_type,
+                "monthly_cost": round(cost, 2),
+                "percentage": round((cost / monthly_cost * 100) if monthly_cost > 0 else 0, 1)
+            })
+        resource_costs.sort(key=lambda x: x["monthly_cost"], reverse=True)
+        
+        warning = None
+        if monthly_cost > COST_WARNING_THRESHOLD:
+            warning = f"Monthly cost exceeds ${COST_WARNING_THRESHOLD:,.0f} threshold"
+        
+        return {
+            "monthly_cost": round(monthly_cost, 2),
+            "annual_cost": round(monthly_cost * 12, 2),
+            "breakdown": breakdown,
+            "resource_costs": resource_costs,
+            "recommendations": self._generate_recommendations(monthly_cost, resource_costs),
+            "warning": warning
+        }
+    
     async def _run_infracost(self, directory: str) -> Dict:
-        """Run Infracost subprocess and return results"""
+        """
+        Run Infracost subprocess and return results
+        
+        Raises:
+            RuntimeError: If Infracost is missing, times out, fails or
+                produces no parseable output
+        """
         try:
             # Run infracost breakdown with JSON output
             cmd = [
@@ -73,31 +425,14 @@ class InfracostEstimator:
             
             logger.debug(f"Running command: {' '.join(cmd)}")
             
-            # Run subprocess
-            process = subprocess.run(
+            # Stream stdout through the incremental parser
+            result, returncode, stderr = await run_streaming_command(
                 cmd,
-                capture_output=True,
-                text=True,
+                InfracostOutputParser(),
                 timeout=120,
                 env={**os.environ, "INFRACOST_SKIP_UPDATE_CHECK": "true"}
             )
-            
-            if process.returncode != 0:
-                logger.warning(f"Infracost returned non-zero exit code: {process.returncode}")
-                logger.warning(f"stderr: {process.stderr}")
-            
-            # Parse JSON output
-            if process.stdout:
-                try:
-                    result = json.loads(process.stdout)
-                    return result
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse Infracost JSON output: {e}")
-                    return {}
-            
-            return {}
-            
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error("Infracost estimation timed out")
             raise RuntimeError("Cost estimation timed out")
         except FileNotFoundError:
@@ -106,6 +441,24 @@ class InfracostEstimator:
         except Exception as e:
             logger.error(f"Infracost execution failed: {str(e)}")
             raise RuntimeError(f"Failed to run Infracost: {str(e)}")
+        
+        # A failed run must not be priced (and cached) as a $0 estimate
+        if returncode != 0:
+            logger.warning(f"stderr: {stderr.decode(errors='replace')}")
+            raise RuntimeError(f"Infracost returned non-zero exit code: {returncode}")
+        if not result:
+            raise RuntimeError("Infracost produced no parseable output")
+        
+        return result
+    
+    def _reported_addresses(self, infracost_result: Dict) -> Set[str]:
+        """Blocks with at least one resource, priced or free, in Infracost output"""
+        return {
+            breakdown_address(resource.get("name") or "")
+            for project in infracost_result.get("projects", [])
+            for key in ("resources", "freeResources")
+            for resource in (project.get("breakdown", {}).get(key) or [])
+        }
     
     def _process_cost_data(self, infracost_result: Dict) -> Dict[str, any]:
         """Process Infracost results into standardized format"""
@@ -203,65 +556,52 @@ class InfracostEstimator:
         return recommendations
     
     def _get_fallback_estimate(self, terraform_code: Dict[str, str]) -> Dict[str, any]:
-        """Generate fallback estimate when Infracost is unavailable"""
-        
-        # Simple heuristic-based estimation
-        main_tf = terraform_code.get("main_tf", "")
-        
-        # Count resource types (very rough estimate)
-        import re
-        resources = re.findall(r'resource\s+"([^"]+)"', main_tf)
-        
-        # Rough cost estimates per resource type
-        cost_map = {
-            "aws_instance": 50,
-            "aws_db_instance": 100,
-            "aws_lb": 25,
-            "aws_nat_gateway": 45,
-            "aws_vpn_gateway": 40,
-            "google_compute_instance": 50,
-            "google_sql_database_instance": 100,
-            "azurerm_virtual_machine": 50,
-            "azurerm_sql_database": 100,
-        }
+        """Generate fallback estimate from the offline pricing catalog when Infracost is unavailable"""
         
-        monthly_cost = 0.0
-        breakdown = {}
-        resource_costs = []
+        try:
+            catalog = get_pricing_catalog()
+            priced = catalog.estimate_resources(terraform_code)
+        except Exception as e:
+            logger.error(f"Offline pricing failed: {str(e)}")
+            catalog = None
+            priced = {"resource_costs": [], "unpriced": [], "approximated": 0}
         
-        for i, resource_type in enumerate(resources):
-            cost = cost_map.get(resource_type, 20)  # Default $20/month
-            monthly_cost += cost
-            resource_name = f"{resource_type}_{i}"
-            breakdown[resource_name] = cost
-            
-            resource_costs.append({
-                "name": resource_name,
-                "type": resource_type,
-                "monthly_cost": cost,
-                "percentage": 0  # Will calculate after total known
-            })
+        # Free resources are left out, as in the Infracost breakdown
+        resource_costs = [rc for rc in priced["resource_costs"] if rc["monthly_cost"] > 0]
+        monthly_cost = sum(rc["monthly_cost"] for rc in resource_costs)
+        breakdown = {rc["name"]: rc["monthly_cost"] for rc in resource_costs}
         
         # Calculate percentages
         for rc in resource_costs:
             rc["percentage"] = round((rc["monthly_cost"] / monthly_cost * 100) if monthly_cost > 0 else 0, 1)
         
+        resource_costs.sort(key=lambda x: x["monthly_cost"], reverse=True)
+        
         annual_cost = monthly_cost * 12
         
+        recommendations = self._generate_recommendations(monthly_cost, resource_costs)
+        recommendations.append({
+            "title": "Estimate based on list prices",
+            "description": "On-demand list prices without usage-based charges. Install Infracost for a full estimate.",
+            "potential_savings": 0,
+            "priority": "low"
+        })
+        
+        version = catalog.version if catalog else "unavailable"
+        warning = f"This is a fallback estimate from pricing catalog {version} - Infracost is not available"
+        if priced["unpriced"]:
+            warning += f". {len(priced['unpriced'])} usage-based or unknown resources not priced: {', '.join(priced['unpriced'][:10])}"
+        if priced["approximated"]:
+            warning += f". {priced['approximated']} prices taken from the provider's default region"
+        
         return {
             "monthly_cost": round(monthly_cost, 2),
             "annual_cost": round(annual_cost, 2),
             "breakdown": breakdown,
             "resource_costs": resource_costs,
-            "recommendations": [
-                {
-                    "title": "Estimate based on heuristics",
-                    "description": "This is a rough estimate. Install Infracost for accurate cost estimation.",
-                    "potential_savings": 0,
-                    "priority": "low"
-                }
-            ],
-            "warning": "This is a fallback estimate - Infracost is not available"
+            "recommendations": recommendations,
+            "warning": warning,
+            "is_fallback": True
         }
 
 
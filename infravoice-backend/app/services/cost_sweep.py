@@ -0,0 +1,291 @@
+import fnmatch
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from app.core.constants import MAX_SWEEP_VARIANTS, SWEEP_INSTANCE_RESOURCES
+from app.services.hcl_parser import HCLParseError, parse_terraform_files
+from app.services.pricing_catalog import (
+    PricingCatalog,
+    get_pricing_catalog,
+    resource_components,
+    resource_region,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SweepError(ValueError):
+    """Raised when sweep axes do not apply to the deployment's Terraform code"""
+
+
+def _sweep_resources(terraform_code: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Priced components of every resource block, split into instance SKU and the rest"""
+    try:
+        parsed = parse_terraform_files(terraform_code)
+    except HCLParseError as e:
+        raise SweepError(f"Terraform code could not be parsed: {str(e)}")
+
+    variables = parsed.get("variable", {}) or {}
+    providers = parsed.get("provider", {}) or {}
+
+    resources = []
+    for resource_type, blocks in (parsed.get("resource", {}) or {}).items():
+        if not isinstance(blocks, dict):
+            continue
+        for name, body in blocks.items():
+            if not isinstance(body, dict):
+                continue
+            count, components = resource_components(resource_type, body, variables)
+            instance_type = None
+            if resource_type in SWEEP_INSTANCE_RESOURCES:
+                instance_type = next((sku for sku, _ in components if not sku.startswith("storage:")), None)
+                components = [(sku, quantity) for sku, quantity in components if sku != instance_type]
+            resources.append({
+                "address": f"{resource_type}.{name}",
+                "type": resource_type,
+                "provider": resource_type.split("_", 1)[0],
+                "region": resource_region(resource_type, body, providers, variables),
+                "count": count,
+                "components": components,
+                "is_instance": resource_type in SWEEP_INSTANCE_RESOURCES,
+                "instance_type": instance_type
+            })
+    return resources
+
+
+def _expand_instance_types(patterns: Sequence[str], known: Dict[str, Set[str]]) -> List[str]:
+    """Resolve instance type patterns (e.g. "m5.*", "*.large") against the catalog"""
+    instance_types: List[str] = []
+    for pattern in patterns:
+        matches = sorted({sku for skus in known.values() for sku in fnmatch.filter(skus, pattern)})
+        if not matches:
+            raise SweepError(f"No priced instance type matches '{pattern}'")
+        instance_types += [sku for sku in matches if sku not in instance_types]
+    return instance_types
+
+
+class _PriceTables:
+    """Per resource type price tables covering every SKU and region of a sweep"""
+
+    def __init__(self, catalog: PricingCatalog, needed: Dict[str, Dict[str, Set[str]]]):
+        self._tables = {}
+        for resource_type, wanted in needed.items():
+            skus = sorted(wanted["skus"])
+            regions = sorted(wanted["regions"])
+            prices, approximated = catalog.price_table(resource_type, skus, regions)
+            self._tables[resource_type] = (
+                prices,
+                approximated,
+                {sku: j for j, sku in enumerate(skus)},
+                {region: i for i, region in enumerate(regions)}
+            )
+
+    def gather(self, resource_type: str, regions: Sequence[str], sku: str):
+        """Monthly unit prices and approximation flags of one SKU along the region axis"""
+        prices, approximated, sku_index, region_index = self._tables[resource_type]
+        rows = [region_index[region] for region in regions]
+        j = sku_index[sku]
+        return prices[rows, j], approximated[rows, j]
+
+
+def _evaluate(
+    resources: List[Dict[str, Any]],
+    region_axis: List[Optional[str]],
+    type_axis: List[Optional[str]],
+    count_axis: List[Optional[int]],
+    provider_regions: Dict[str, Set[str]],
+    known: Dict[str, Set[str]],
+    catalog: PricingCatalog
+):
+    """
+    Monthly cost of every (region, instance type, count) combination
+
+    None on an axis keeps the value written in the code. A swept instance
+    type the catalog cannot price in a region yields NaN for that
+    combination; other missing prices count as zero, like the offline
+    estimate.
+
+    Returns:
+        Tuple of (regions x types x counts) arrays of monthly costs and
+        numbers of approximated prices
+    """
+    # Effective region of every resource along the region axis
+    effective = [
+        [
+            region if region is not None and region in provider_regions[resource["provider"]] else resource["region"]
+            for region in region_axis
+        ]
+        for resource in resources
+    ]
+
+    needed: Dict[str, Dict[str, Set[str]]] = {}
+    for resource, regions in zip(resources, effective):
+        wanted = needed.setdefault(resource["type"], {"skus": set(), "regions": set()})
+        wanted["regions"].update(regions)
+        wanted["skus"].update(sku for sku, _ in resource["components"])
+        if resource["is_instance"]:
+            if resource["instance_type"] is not None:
+                wanted["skus"].add(resource["instance_type"])
+            wanted["skus"].update(t for t in type_axis if t in known.get(resource["type"], ()))
+    tables = _PriceTables(catalog, needed)
+
+    shape = (len(region_axis), len(type_axis))
+    fixed = np.zeros(len(region_axis))
+    fixed_approximated = np.zeros(len(region_axis))
+    per_instance = []
+    per_instance_approximated = []
+    instance_counts = []
+
+    for resource, regions in zip(resources, effective):
+        # Components whose SKU no axis changes, per unit of count
+        components = np.zeros(len(region_axis))
+        approximated = np.zeros(len(region_axis))
+        for sku, quantity in resource["components"]:
+            prices, approx = tables.gather(resource["type"], regions, sku)
+            components += np.nan_to_num(prices) * quantity
+            approximated += approx
+
+        if not resource["is_instance"]:
+            fixed += components * resource["count"]
+            fixed_approximated += approximated
+            continue
+
+        unit = np.repeat(components[:, None], len(type_axis), axis=1)
+        unit_approximated = np.repeat(approximated[:, None], len(type_axis), axis=1)
+        for j, instance_type in enumerate(type_axis):
+            if instance_type in known.get(resource["type"], ()):
+                prices, approx = tables.gather(resource["type"], regions, instance_type)
+            elif resource["instance_type"] is not None:
+                # Written size: unpriced counts as zero, as in the offline estimate
+                prices, approx = tables.gather(resource["type"], regions, resource["instance_type"])
+                prices = np.nan_to_num(prices)
+            else:
+                continue
+            unit[:, j] += prices
+            unit_approximated[:, j] += approx
+
+        per_instance.append(unit)
+        per_instance_approximated.append(unit_approximated)
+        instance_counts.append([resource["count"] if count is None else count for count in count_axis])
+
+    if per_instance:
+        instances = np.einsum("irt,ic->rtc", np.stack(per_instance), np.array(instance_counts, dtype=float))
+        approximated = np.stack(per_instance_approximated).sum(axis=0)
+    else:
+        instances = np.zeros(shape + (len(count_axis),))
+        approximated = np.zeros(shape)
+
+    totals = fixed[:, None, None] + instances
+    approximated_prices = (fixed_approximated[:, None] + approximated)[:, :, None] + np.zeros(len(count_axis))
+    return totals, approximated_prices.astype(int)
+
+
+def sweep_costs(
+    terraform_code: Dict[str, str],
+    regions: Sequence[str] = (),
+    instance_types: Sequence[str] = (),
+    counts: Sequence[int] = (),
+    limit: int = 50,
+    catalog: Optional[PricingCatalog] = None
+) -> Dict[str, Any]:
+    """
+    Price every combination of regions, instance types and counts
+
+    Regions apply to resources of providers that have prices in them;
+    instance types (fnmatch patterns such as "m5.*" or "*.large") and
+    counts apply to virtual machine resources. Every combination is
+    evaluated at once from per resource type price tables of the offline
+    catalog, so no Infracost run is needed.
+
+    Args:
+        terraform_code: Dict with main_tf, variables_tf, outputs_tf
+        regions: Regions to move resources to (empty keeps the code's)
+        instance_types: Instance type patterns (empty keeps the code's)
+        counts: Virtual machine counts (empty keeps the code's)
+        limit: Number of ranked variants to return
+
+    Returns:
+        Dict with the resolved axes, the baseline cost, the cost matrix
+        (regions x instance types x counts, None where unavailable) and
+        the cheapest variants
+
+    Raises:
+        SweepError: If the code cannot be parsed or an axis value does not
+            apply to it
+    """
+    started = time.perf_counter()
+    catalog = catalog or get_pricing_catalog()
+    resources = _sweep_resources(terraform_code)
+    if not resources:
+        raise SweepError("Terraform code has no resources to price")
+
+    has_instances = any(resource["is_instance"] for resource in resources)
+    if (instance_types or counts) and not has_instances:
+        raise SweepError("Terraform code has no virtual machine resources to resize")
+    if any(count < 0 for count in counts):
+        raise SweepError("Counts must not be negative")
+
+    provider_regions = {
+        provider: catalog.regions(provider)
+        for provider in {resource["provider"] for resource in resources}
+    }
+    for region in regions:
+        if not any(region in known_regions for known_regions in provider_regions.values()):
+            raise SweepError(f"Region '{region}' has no prices for this deployment's providers")
+
+    known = {
+        resource_type: set(catalog.skus(resource_type))
+        for resource_type in {resource["type"] for resource in resources if resource["is_instance"]}
+    }
+
+    region_axis: List[Optional[str]] = list(dict.fromkeys(regions)) or [None]
+    type_axis: List[Optional[str]] = _expand_instance_types(instance_types, known) or [None]
+    count_axis: List[Optional[int]] = list(dict.fromkeys(counts)) or [None]
+
+    total_variants = len(region_axis) * len(type_axis) * len(count_axis)
+    if total_variants > MAX_SWEEP_VARIANTS:
+        raise SweepError(f"Sweep has {total_variants} combinations, the limit is {MAX_SWEEP_VARIANTS}")
+
+    baseline, _ = _evaluate(resources, [None], [None], [None], provider_regions, known, catalog)
+    baseline_cost = round(float(baseline[0, 0, 0]), 2)
+    totals, approximated = _evaluate(
+        resources, region_axis, type_axis, count_axis, provider_regions, known, catalog
+    )
+
+    # NaN (unavailable) combinations sort last and are left out of the ranking
+    flat = totals.ravel()
+    order = np.argsort(flat, kind="stable")
+    order = order[~np.isnan(flat[order])]
+
+    variants = []
+    for rank, index in enumerate(order[:limit], start=1):
+        r, t, c = np.unravel_index(index, totals.shape)
+        monthly_cost = round(float(totals[r, t, c]), 2)
+        variants.append({
+            "rank": rank,
+            "region": region_axis[r],
+            "instance_type": type_axis[t],
+            "count": count_axis[c],
+            "monthly_cost": monthly_cost,
+            "annual_cost": round(monthly_cost * 12, 2),
+            "delta": round(monthly_cost - baseline_cost, 2),
+            "approximated_prices": int(approximated[r, t, c])
+        })
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Cost sweep evaluated {total_variants} combinations in {duration_ms:.1f}ms")
+
+    return {
+        "regions": region_axis,
+        "instance_types": type_axis,
+        "counts": count_axis,
+        "baseline_monthly_cost": baseline_cost,
+        "monthly_costs": np.where(np.isnan(totals), None, totals.round(2)).tolist(),
+        "variants": variants,
+        "total_variants": total_variants,
+        "unavailable_variants": total_variants - len(order),
+        "duration_ms": round(duration_ms, 1)
+    }
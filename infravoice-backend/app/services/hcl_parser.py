@@ -0,0 +1,387 @@
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+# Lightweight HCL parser for the block structure of generated Terraform.
+# It understands blocks, attributes, strings (with ${} templates), heredocs,
+# lists, objects and comments. Literal values become Python values; any
+# other expression (references, function calls, conditionals) is kept as
+# its raw source text, e.g. "var.bucket_acl" or "aws_s3_bucket.logs.id".
+
+_IDENT_RE = re.compile(r"[A-Za-z0-9_\-.*]+")
+_SPACE_RE = re.compile(r"[ \t\r]*")
+_NUMBER_RE = re.compile(r"^-?\d+(\.\d+)?([eE][+-]?\d+)?$")
+_HEREDOC_RE = re.compile(r"<<(-?)([A-Za-z_][A-Za-z0-9_]*)[ \t]*\r?\n")
+_VAR_REF_RE = re.compile(r"^var\.([A-Za-z0-9_\-]+)$")
+_VAR_USE_RE = re.compile(r"\bvar\.([A-Za-z0-9_\-]+)")
+_LOCAL_USE_RE = re.compile(r"\blocal\.([A-Za-z0-9_\-]+)")
+_DATA_USE_RE = re.compile(r"\bdata\.([A-Za-z0-9_\-]+)\.([A-Za-z0-9_\-]+)")
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+_CLOSING = {"(": ")", "[": "]", "{": "}"}
+
+
+class HCLParseError(ValueError):
+    """Raised when Terraform source cannot be parsed"""
+
+
+class _Parser:
+    """Recursive-descent parser over a single HCL source string"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.length = len(text)
+
+    # Whitespace and comments
+
+    def _skip_space(self, newlines: bool) -> None:
+        text = self.text
+        while self.pos < self.length:
+            self.pos = _SPACE_RE.match(text, self.pos).end()
+            if self.pos >= self.length:
+                return
+            ch = text[self.pos]
+            if ch == "\n" and newlines:
+                self.pos += 1
+            elif ch == "#" or text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = self.length if end == -1 else end
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                if end == -1:
+                    raise HCLParseError("Unterminated block comment")
+                self.pos = end + 2
+            else:
+                return
+
+    # Bodies and blocks
+
+    def parse_body(self, closing: str = None) -> Dict[str, Any]:
+        """Parse attributes and nested blocks until `closing` or end of input"""
+        body: Dict[str, Any] = {}
+
+        while True:
+            self._skip_space(newlines=True)
+            if self.pos >= self.length:
+                if closing:
+                    raise HCLParseError(f"Expected '{closing}' before end of input")
+                return body
+
+            ch = self.text[self.pos]
+            if ch == closing:
+                self.pos += 1
+                return body
+            if ch == ",":
+                # Object constructors allow comma separated items
+                self.pos += 1
+                continue
+
+            key = self._read_name()
+            self._skip_space(newlines=False)
+
+            if self.pos < self.length and self.text[self.pos] in "=:":
+                self.pos += 1
+                body[key] = self._parse_expression()
+                continue
+
+            labels = []
+            while self.pos < self.length and self.text[self.pos] != "{":
+                labels.append(self._read_name())
+                self._skip_space(newlines=False)
+            if self.pos >= self.length:
+                raise HCLParseError(f"Expected '{{' after block '{key}'")
+            self.pos += 1
+            self._add_block(body, key, labels, self.parse_body("}"))
+
+    def top_level_blocks(self) -> List[Tuple[str, List[str], str]]:
+        """Split the source into top-level blocks with their original text"""
+        blocks = []
+        while True:
+            self._skip_space(newlines=True)
+            if self.pos >= self.length:
+                return blocks
+
+            start = self.pos
+            key = self._read_name()
+            self._skip_space(newlines=False)
+
+            if self.pos < self.length and self.text[self.pos] in "=:":
+                # Top-level attributes are not valid Terraform, skip them
+                self.pos += 1
+                self._parse_expression()
+                continue
+
+            labels = []
+            while self.pos < self.length and self.text[self.pos] != "{":
+                labels.append(self._read_name())
+                self._skip_space(newlines=False)
+            if self.pos >= self.length:
+                raise HCLParseError(f"Expected '{{' after block '{key}'")
+            self.pos += 1
+            self.parse_body("}")
+            blocks.append((key, labels, self.text[start:self.pos]))
+
+    @staticmethod
+    def _add_block(body: Dict[str, Any], key: str, labels: List[str], block: Dict[str, Any]) -> None:
+        """
+        Store a block: unlabeled blocks are appended to a list under their
+        type, labeled blocks are nested by label (resource.type.name).
+        """
+        if not labels:
+            existing = body.setdefault(key, [])
+            if isinstance(existing, list):
+                existing.append(block)
+            return
+
+        target = body.setdefault(key, {})
+        if not isinstance(target, dict):
+            return
+        for label in labels[:-1]:
+            target = target.setdefault(label, {})
+        target[labels[-1]] = block
+
+    def _read_name(self) -> str:
+        if self.text[self.pos] == '"':
+            return self._read_string()
+        match = _IDENT_RE.match(self.text, self.pos)
+        if not match:
+            raise HCLParseError(f"Unexpected character {self.text[self.pos]!r} at offset {self.pos}")
+        self.pos = match.end()
+        return match.group(0)
+
+    # Expressions
+
+    def _parse_expression(self) -> Any:
+        self._skip_space(newlines=False)
+        start = self.pos
+        if self.pos >= self.length:
+            return None
+
+        ch = self.text[self.pos]
+        if ch == '"':
+            value = self._read_string()
+        elif ch == "[":
+            value = self._parse_list()
+        elif ch == "{":
+            self.pos += 1
+            try:
+                value = self.parse_body("}")
+            except HCLParseError:
+                # Not an object constructor (e.g. a `for` expression)
+                self.pos = start
+                return self._read_raw()
+        elif self.text.startswith("<<", self.pos):
+            value = self._read_heredoc()
+        else:
+            return self._literal(self._read_raw())
+
+        # A literal followed by operators is a compound expression: keep raw text
+        self._skip_space(newlines=False)
+        if self.pos < self.length and self.text[self.pos] not in "\n,]})#/":
+            self.pos = start
+            return self._read_raw()
+        return value
+
+    def _parse_list(self) -> List[Any]:
+        self.pos += 1
+        items = []
+        while True:
+            self._skip_space(newlines=True)
+            if self.pos >= self.length:
+                raise HCLParseError("Unterminated list")
+            ch = self.text[self.pos]
+            if ch == "]":
+                self.pos += 1
+                return items
+            if ch == ",":
+                self.pos += 1
+                continue
+            items.append(self._parse_expression())
+
+    def _read_string(self) -> str:
+        """Read a quoted string; template sequences are kept verbatim"""
+        text = self.text
+        self.pos += 1
+        parts = []
+        while self.pos < self.length:
+            ch = text[self.pos]
+            if ch == '"':
+                self.pos += 1
+                return "".join(parts)
+            if ch == "\\" and self.pos + 1 < self.length:
+                parts.append(_ESCAPES.get(text[self.pos + 1], text[self.pos + 1]))
+                self.pos += 2
+            elif ch in "$%" and text.startswith("{", self.pos + 1):
+                start = self.pos
+                self.pos += 1
+                self._skip_nested()
+                parts.append(text[start:self.pos])
+            elif ch == "\n":
+                raise HCLParseError("Unterminated string")
+            else:
+                parts.append(ch)
+                self.pos += 1
+        raise HCLParseError("Unterminated string")
+
+    def _read_heredoc(self) -> str:
+        match = _HEREDOC_RE.match(self.text, self.pos)
+        if not match:
+            raise HCLParseError(f"Invalid heredoc at offset {self.pos}")
+        marker = match.group(2)
+        lines = []
+        self.pos = match.end()
+        while self.pos < self.length:
+            end = self.text.find("\n", self.pos)
+            end = self.length if end == -1 else end
+            line = self.text[self.pos:end]
+            self.pos = end
+            if line.strip() == marker:
+                return "\n".join(lines)
+            lines.append(line)
+            self.pos += 1
+        raise HCLParseError(f"Unterminated heredoc '{marker}'")
+
+    def _skip_nested(self) -> None:
+        """Skip a bracketed region starting at self.pos, honoring strings"""
+        stack = [_CLOSING[self.text[self.pos]]]
+        self.pos += 1
+        while self.pos < self.length:
+            ch = self.text[self.pos]
+            if ch == '"':
+                self._read_string()
+                continue
+            if ch in _CLOSING:
+                stack.append(_CLOSING[ch])
+            elif ch == stack[-1]:
+                stack.pop()
+                if not stack:
+                    self.pos += 1
+                    return
+            self.pos += 1
+        raise HCLParseError("Unbalanced brackets")
+
+    def _read_raw(self) -> str:
+        """Read an arbitrary expression up to the end of the attribute"""
+        start = self.pos
+        while self.pos < self.length:
+            ch = self.text[self.pos]
+            if ch in "\n,]})" or ch == "#" or self.text.startswith("//", self.pos):
+                break
+            if ch == '"':
+                self._read_string()
+            elif ch in _CLOSING:
+                self._skip_nested()
+            elif self.text.startswith("<<", self.pos) and _HEREDOC_RE.match(self.text, self.pos):
+                self._read_heredoc()
+            else:
+                self.pos += 1
+        return self.text[start:self.pos].strip()
+
+    @staticmethod
+    def _literal(raw: str) -> Any:
+        if raw == "true":
+            return True
+        if raw == "false":
+            return False
+        if raw == "null":
+            return None
+        if _NUMBER_RE.match(raw):
+            return float(raw) if any(c in raw for c in ".eE") else int(raw)
+        return raw
+
+
+def parse_hcl(text: str) -> Dict[str, Any]:
+    """
+    Parse Terraform HCL source into a nested dict
+
+    Labeled blocks are nested by label, mirroring Terraform's JSON syntax:
+    {"resource": {"aws_s3_bucket": {"logs": {...}}}, "variable": {...}}.
+    Unlabeled nested blocks (ingress, logging, ...) become lists of dicts.
+
+    Raises:
+        HCLParseError: If the source is not valid HCL
+    """
+    return _Parser(text or "").parse_body()
+
+
+def split_blocks(text: str) -> List[Tuple[str, List[str], str]]:
+    """
+    Split Terraform source into top-level blocks
+
+    Returns:
+        List of (block type, labels, source text) in file order, e.g.
+        ("resource", ["aws_instance", "web"], 'resource "aws_instance" ...')
+
+    Raises:
+        HCLParseError: If the source is not valid HCL
+    """
+    return _Parser(text or "").top_level_blocks()
+
+
+def parse_terraform_files(terraform_code: Dict[str, str]) -> Dict[str, Any]:
+    """Parse main_tf, variables_tf and outputs_tf and merge their top-level blocks"""
+    merged: Dict[str, Any] = {}
+    for key in ("main_tf", "variables_tf", "outputs_tf"):
+        for block_type, blocks in parse_hcl(terraform_code.get(key, "")).items():
+            if isinstance(blocks, dict) and isinstance(merged.get(block_type), dict):
+                for label, value in blocks.items():
+                    if isinstance(value, dict) and isinstance(merged[block_type].get(label), dict):
+                        merged[block_type][label].update(value)
+                    else:
+                        merged[block_type][label] = value
+            else:
+                merged[block_type] = blocks
+    return merged
+
+
+def resolve_variable(value: Any, variables: Dict[str, Any]) -> Any:
+    """Replace a bare `var.x` reference with the variable's default, if any"""
+    if isinstance(value, str):
+        match = _VAR_REF_RE.match(value)
+        if match:
+            variable = variables.get(match.group(1))
+            if isinstance(variable, dict) and "default" in variable:
+                return variable["default"]
+    return value
+
+
+def referenced_variables(body: Any, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Defaults of every variable referenced anywhere in a parsed block body"""
+    serialized = json.dumps(body, sort_keys=True, default=str)
+    return {
+        name: variables[name].get("default") if isinstance(variables.get(name), dict) else None
+        for name in sorted(set(_VAR_USE_RE.findall(serialized)))
+    }
+
+
+def referenced_inputs(body: Any, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Locals and data sources referenced by a parsed block body
+
+    References are followed through locals and data sources, so a block
+    using local.size gets local.size and whatever local.size refers to.
+
+    Returns:
+        Dict of "local.NAME" / "data.TYPE.NAME" -> parsed value (None if undefined)
+    """
+    local_values: Dict[str, Any] = {}
+    for block in parsed.get("locals") or []:
+        if isinstance(block, dict):
+            local_values.update(block)
+    data_sources = parsed.get("data") or {}
+
+    inputs: Dict[str, Any] = {}
+    pending = [body]
+    while pending:
+        serialized = json.dumps(pending.pop(), sort_keys=True, default=str)
+        found = [(f"local.{name}", local_values.get(name)) for name in _LOCAL_USE_RE.findall(serialized)]
+        found += [
+            (f"data.{data_type}.{name}", (data_sources.get(data_type) or {}).get(name))
+            for data_type, name in _DATA_USE_RE.findall(serialized)
+        ]
+        for address, value in found:
+            if address not in inputs:
+                inputs[address] = value
+                pending.append(value)
+    return dict(sorted(inputs.items()))
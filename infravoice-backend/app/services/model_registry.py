@@ -0,0 +1,177 @@
+import gc
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from app.core.constants import WHISPER_MODEL_PARAMS
+
+logger = logging.getLogger(__name__)
+
+# Bytes per parameter by inference mode; int8 keeps embeddings and
+# convolutions in fp32, so it averages above one byte
+BYTES_PER_PARAM = {"fp32": 4.0, "int8": 1.6}
+
+
+class ModelBudgetExceeded(RuntimeError):
+    """Raised when a model does not fit in the memory budget next to the pinned ones"""
+
+
+def estimated_model_mb(model_size: str, inference_mode: str) -> float:
+    """Approximate memory of a loaded Whisper model, from its parameter count"""
+    params = WHISPER_MODEL_PARAMS.get(model_size.split(".")[0], WHISPER_MODEL_PARAMS["large"])
+    return params * BYTES_PER_PARAM.get(inference_mode, BYTES_PER_PARAM["fp32"])
+
+
+class _LoadedModel:
+    """A model held by the registry, with its usage"""
+
+    def __init__(self, model, device: str, memory_mb: float, load_seconds: float):
+        self.model = model
+        self.device = device
+        self.memory_mb = memory_mb
+        self.load_seconds = load_seconds
+        self.last_used = time.monotonic()
+        self.uses = 0
+
+
+class WhisperModelRegistry:
+    """
+    Whisper models of several sizes, loaded on demand within a memory budget
+
+    get() returns a loaded model, loading it first if needed. Before a load,
+    least recently used unpinned models are unloaded until the new one fits
+    in memory_budget_mb (by estimated size). The budget is hard: pinned
+    models (the default model, kept warm) are never unloaded, and a model
+    that does not fit next to them is refused with ModelBudgetExceeded.
+    unload_idle() unloads models unused for idle_seconds, except pinned ones.
+
+    Not thread-safe: call it from the inference thread only, which also
+    keeps loading on the thread whose torch settings apply to inference.
+    """
+
+    def __init__(
+        self,
+        inference_mode: str,
+        cpu_threads: int,
+        memory_budget_mb: int,
+        idle_seconds: int,
+        pinned: Iterable[str] = ()
+    ):
+        """Initialize an empty registry"""
+        self.inference_mode = inference_mode
+        self.cpu_threads = cpu_threads
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_seconds = idle_seconds
+        self.pinned = set(pinned)
+        # Least recently used first
+        self._models: "OrderedDict[str, _LoadedModel]" = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def used_mb(self) -> float:
+        """Estimated memory of the loaded models"""
+        return sum(loaded.memory_mb for loaded in list(self._models.values()))
+
+    def is_loaded(self, model_size: str) -> bool:
+        """Whether a model size is in memory"""
+        return model_size in self._models
+
+    def get(self, model_size: str):
+        """
+        Loaded model of a size, loading it if needed
+
+        Returns:
+            Tuple of (model, device)
+
+        Raises:
+            ModelBudgetExceeded: If the model does not fit in the budget
+            Exception: Whatever loading the model raised
+        """
+        loaded = self._models.get(model_size)
+        if loaded is None:
+            loaded = self._load(model_size)
+        else:
+            self._models.move_to_end(model_size)
+        loaded.last_used = time.monotonic()
+        loaded.uses += 1
+        return loaded.model, loaded.device
+
+    def _load(self, model_size: str) -> _LoadedModel:
+        from app.services.voice_service import load_whisper_model
+
+        memory_mb = estimated_model_mb(model_size, self.inference_mode)
+        pinned_mb = sum(loaded.memory_mb for size, loaded in self._models.items() if size in self.pinned)
+        if pinned_mb + memory_mb > self.memory_budget_mb:
+            raise ModelBudgetExceeded(
+                f"Whisper model {model_size} (~{memory_mb:.0f}MB) does not fit in the model memory budget "
+                f"of {self.memory_budget_mb}MB next to the pinned models (~{pinned_mb:.0f}MB)"
+            )
+        while self.used_mb + memory_mb > self.memory_budget_mb:
+            # Least recently used first
+            victim = next(size for size in self._models if size not in self.pinned)
+            self.unload(victim, reason="memory budget")
+
+        started = time.monotonic()
+        model, device = load_whisper_model(model_size, self.inference_mode, self.cpu_threads)
+        loaded = _LoadedModel(model, device, memory_mb, time.monotonic() - started)
+        self._models[model_size] = loaded
+        self.loads += 1
+        logger.info(
+            f"Loaded Whisper model {model_size} ({self.inference_mode}, ~{memory_mb:.0f}MB) "
+            f"in {loaded.load_seconds:.1f}s; {self.used_mb:.0f}/{self.memory_budget_mb}MB in use"
+        )
+        return loaded
+
+    def unload(self, model_size: str, reason: str = "") -> None:
+        """Drop a model and return its memory"""
+        loaded = self._models.pop(model_size, None)
+        if loaded is None:
+            return
+        device = loaded.device
+        del loaded
+        gc.collect()
+        if device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+        self.evictions += 1
+        logger.info(f"Unloaded Whisper model {model_size}" + (f" ({reason})" if reason else ""))
+
+    def unload_idle(self) -> List[str]:
+        """
+        Unload models unused for idle_seconds, except pinned ones
+
+        Returns:
+            Sizes unloaded
+        """
+        now = time.monotonic()
+        idle = [
+            model_size for model_size, loaded in self._models.items()
+            if model_size not in self.pinned and now - loaded.last_used >= self.idle_seconds
+        ]
+        for model_size in idle:
+            self.unload(model_size, reason="idle")
+        return idle
+
+    def stats(self) -> Dict[str, any]:
+        """Loaded models, memory use and load/eviction counts"""
+        now = time.monotonic()
+        return {
+            "memory_budget_mb": self.memory_budget_mb,
+            "pinned": sorted(self.pinned),
+            "estimated_mb": round(self.used_mb),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "models": [
+                {
+                    "model_size": model_size,
+                    "device": loaded.device,
+                    "estimated_mb": round(loaded.memory_mb),
+                    "uses": loaded.uses,
+                    "idle_seconds": round(now - loaded.last_used)
+                }
+                # Snapshot: the inference thread may be loading meanwhile
+                for model_size, loaded in list(self._models.items())
+            ]
+        }
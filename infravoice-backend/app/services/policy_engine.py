@@ -0,0 +1,304 @@
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from app.core.constants import SecuritySeverity
+from app.services.hcl_parser import HCLParseError, parse_terraform_files, resolve_variable
+from app.services.security_service import compute_security_scores
+
+logger = logging.getLogger(__name__)
+
+_S3_BUCKET_REF_RE = re.compile(r"aws_s3_bucket\.([A-Za-z0-9_\-]+)\.(?:id|bucket)")
+
+PUBLIC_CIDRS = {"0.0.0.0/0", "::/0"}
+PUBLIC_READ_ACLS = {"public-read", "public-read-write", "authenticated-read"}
+
+# Checkov policy index, used as guideline for fast-path issues
+CHECKOV_POLICY_INDEX = "https://www.checkov.io/5.Policy%20Index/terraform.html"
+
+
+class _Context:
+    """Parsed Terraform plus lookups shared by all policies"""
+
+    def __init__(self, parsed: Dict[str, Any]):
+        self.resources: Dict[str, Dict[str, Dict]] = parsed.get("resource", {}) or {}
+        self.variables: Dict[str, Dict] = parsed.get("variable", {}) or {}
+        self.encrypted_buckets = self._referenced_buckets("aws_s3_bucket_server_side_encryption_configuration")
+        self.logged_buckets = self._referenced_buckets("aws_s3_bucket_logging")
+
+    def resolve(self, value: Any) -> Any:
+        """Replace a bare `var.x` reference with the variable's default, if any"""
+        return resolve_variable(value, self.variables)
+
+    def attr(self, body: Dict, key: str, default: Any = None) -> Any:
+        return self.resolve(body.get(key, default))
+
+    def _referenced_buckets(self, resource_type: str) -> Set[str]:
+        names = set()
+        for body in self.resources.get(resource_type, {}).values():
+            match = _S3_BUCKET_REF_RE.search(str(body.get("bucket", "")))
+            if match:
+                names.add(match.group(1))
+        return names
+
+
+def _blocks(body: Dict, key: str) -> List[Dict]:
+    value = body.get(key)
+    if isinstance(value, list):
+        return [block for block in value if isinstance(block, dict)]
+    if isinstance(value, dict):
+        return [value]
+    return []
+
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return value
+    return [] if value is None else [value]
+
+
+def _is_true(value: Any) -> bool:
+    return value is True or value == "true"
+
+
+def _port_open(rule: Dict, ctx: _Context, port: int) -> bool:
+    """Whether an ingress rule exposes `port` to the internet"""
+    cidrs = set(_as_list(ctx.attr(rule, "cidr_blocks"))) | set(_as_list(ctx.attr(rule, "ipv6_cidr_blocks")))
+    cidrs |= set(_as_list(ctx.attr(rule, "cidr_ipv4"))) | set(_as_list(ctx.attr(rule, "cidr_ipv6")))
+    if not cidrs & PUBLIC_CIDRS:
+        return False
+
+    protocol = str(ctx.attr(rule, "protocol", ctx.attr(rule, "ip_protocol", "tcp")))
+    if protocol in ("-1", "all"):
+        return True
+
+    from_port, to_port = ctx.attr(rule, "from_port"), ctx.attr(rule, "to_port")
+    if not isinstance(from_port, int) or not isinstance(to_port, int):
+        # Unresolvable port expressions are left to the full scan
+        return False
+    return from_port <= port <= to_port
+
+
+def _ingress_rules(resource_type: str, body: Dict, ctx: _Context) -> List[Dict]:
+    if resource_type == "aws_security_group":
+        return _blocks(body, "ingress")
+    if resource_type == "aws_security_group_rule":
+        return [body] if ctx.attr(body, "type") == "ingress" else []
+    return [body]
+
+
+def _no_public_port(port: int) -> Callable[[str, str, Dict, _Context], bool]:
+    def check(resource_type: str, name: str, body: Dict, ctx: _Context) -> bool:
+        return not any(_port_open(rule, ctx, port) for rule in _ingress_rules(resource_type, body, ctx))
+    return check
+
+
+SECURITY_GROUP_TYPES = (
+    "aws_security_group",
+    "aws_security_group_rule",
+    "aws_vpc_security_group_ingress_rule",
+)
+
+# Each policy's check(resource_type, name, body, ctx) returns True (passed)
+# or False (failed) for one resource.
+# Check ids mirror the equivalent Checkov checks so the full scan result
+# lines up with the preliminary one.
+POLICIES: List[Dict[str, Any]] = [
+    {
+        "check_id": "CKV_AWS_20",
+        "title": "Ensure the S3 bucket does not allow READ permissions to everyone",
+        "severity": SecuritySeverity.HIGH,
+        "resource_types": ("aws_s3_bucket", "aws_s3_bucket_acl"),
+        "check": lambda t, name, body, ctx: ctx.attr(body, "acl") not in PUBLIC_READ_ACLS,
+    },
+    {
+        "check_id": "CKV_AWS_57",
+        "title": "Ensure the S3 bucket does not allow WRITE permissions to everyone",
+        "severity": SecuritySeverity.CRITICAL,
+        "resource_types": ("aws_s3_bucket", "aws_s3_bucket_acl"),
+        "check": lambda t, name, body, ctx: ctx.attr(body, "acl") != "public-read-write",
+    },
+    {
+        "check_id": "CKV_AWS_19",
+        "title": "Ensure all data stored in the S3 bucket is securely encrypted at rest",
+        "severity": SecuritySeverity.MEDIUM,
+        "resource_types": ("aws_s3_bucket",),
+        "check": lambda t, name, body, ctx: bool(_blocks(body, "server_side_encryption_configuration"))
+        or name in ctx.encrypted_buckets,
+    },
+    {
+        "check_id": "CKV_AWS_18",
+        "title": "Ensure the S3 bucket has access logging enabled",
+        "severity": SecuritySeverity.MEDIUM,
+        "resource_types": ("aws_s3_bucket",),
+        "check": lambda t, name, body, ctx: bool(_blocks(body, "logging"))
+        or name in ctx.logged_buckets,
+    },
+    {
+        "check_id": "CKV_AWS_16",
+        "title": "Ensure all data stored in the RDS is securely encrypted at rest",
+        "severity": SecuritySeverity.HIGH,
+        "resource_types": ("aws_db_instance", "aws_rds_cluster"),
+        "check": lambda t, name, body, ctx: _is_true(ctx.attr(body, "storage_encrypted")),
+    },
+    {
+        "check_id": "CKV_AWS_17",
+        "title": "Ensure all data stored in RDS is not publicly accessible",
+        "severity": SecuritySeverity.CRITICAL,
+        "resource_types": ("aws_db_instance",),
+        "check": lambda t, name, body, ctx: not _is_true(ctx.attr(body, "publicly_accessible")),
+    },
+    {
+        "check_id": "CKV_AWS_3",
+        "title": "Ensure all data stored in the EBS is securely encrypted",
+        "severity": SecuritySeverity.MEDIUM,
+        "resource_types": ("aws_ebs_volume",),
+        "check": lambda t, name, body, ctx: _is_true(ctx.attr(body, "encrypted")),
+    },
+    {
+        "check_id": "CKV_AWS_24",
+        "title": "Ensure no security groups allow ingress from 0.0.0.0:0 to port 22",
+        "severity": SecuritySeverity.HIGH,
+        "resource_types": SECURITY_GROUP_TYPES,
+        "check": _no_public_port(22),
+    },
+    {
+        "check_id": "CKV_AWS_25",
+        "title": "Ensure no security groups allow ingress from 0.0.0.0:0 to port 3389",
+        "severity": SecuritySeverity.HIGH,
+        "resource_types": SECURITY_GROUP_TYPES,
+        "check": _no_public_port(3389),
+    },
+    {
+        "check_id": "CKV_AWS_260",
+        "title": "Ensure no security groups allow ingress from 0.0.0.0:0 to port 80",
+        "severity": SecuritySeverity.MEDIUM,
+        "resource_types": SECURITY_GROUP_TYPES,
+        "check": _no_public_port(80),
+    },
+    {
+        "check_id": "CKV_AWS_88",
+        "title": "EC2 instance should not have public IP",
+        "severity": SecuritySeverity.MEDIUM,
+        "resource_types": ("aws_instance", "aws_launch_template"),
+        "check": lambda t, name, body, ctx: not _is_true(ctx.attr(body, "associate_public_ip_address"))
+        and not any(_is_true(ctx.attr(ni, "associate_public_ip_address")) for ni in _blocks(body, "network_interfaces")),
+    },
+    {
+        "check_id": "CKV_AWS_130",
+        "title": "Ensure VPC subnets do not assign public IP by default",
+        "severity": SecuritySeverity.MEDIUM,
+        "resource_types": ("aws_subnet",),
+        "check": lambda t, name, body, ctx: not _is_true(ctx.attr(body, "map_public_ip_on_launch")),
+    },
+    {
+        "check_id": "CKV_AWS_91",
+        "title": "Ensure the ELBv2 (Application/Network) has access logging enabled",
+        "severity": SecuritySeverity.LOW,
+        "resource_types": ("aws_lb", "aws_alb"),
+        "check": lambda t, name, body, ctx: any(_is_true(ctx.attr(logs, "enabled")) for logs in _blocks(body, "access_logs")),
+    },
+]
+
+
+class FastPolicyEngine:
+    """
+    In-process evaluation of high-value security policies
+
+    Runs a small set of Checkov-equivalent policies directly on the parsed
+    Terraform block structure. It is used to return a preliminary security
+    score immediately while the full Checkov scan runs in the background.
+    """
+
+    def __init__(self, policies: Iterable[Dict[str, Any]] = POLICIES):
+        """Initialize policy engine"""
+        self.policies = list(policies)
+        logger.info(f"Fast policy engine initialized with {len(self.policies)} policies")
+
+    def evaluate(self, terraform_code: Dict[str, str]) -> Dict[str, any]:
+        """
+        Evaluate the fast-path policies against Terraform code
+
+        Args:
+            terraform_code: Dict with main_tf, variables_tf, outputs_tf
+
+        Returns:
+            Dict with security score and issues, in the same layout as
+            CheckovSecurityScanner.scan_terraform
+        """
+        started = time.perf_counter()
+
+        try:
+            parsed = parse_terraform_files(terraform_code)
+        except HCLParseError as e:
+            logger.warning(f"Fast policy evaluation skipped, could not parse Terraform: {str(e)}")
+            parsed = {}
+
+        ctx = _Context(parsed)
+        passed_count = 0
+        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        issues = []
+
+        for policy in self.policies:
+            for resource_type in policy["resource_types"]:
+                for name, body in ctx.resources.get(resource_type, {}).items():
+                    if not isinstance(body, dict):
+                        continue
+
+                    try:
+                        passed = policy["check"](resource_type, name, body, ctx)
+                    except Exception as e:
+                        logger.debug(f"Policy {policy['check_id']} errored on {resource_type}.{name}: {str(e)}")
+                        continue
+
+                    if passed:
+                        passed_count += 1
+                        continue
+
+                    severity = policy["severity"].value
+                    severity_counts[severity] += 1
+                    issues.append({
+                        "check_id": policy["check_id"],
+                        "severity": severity,
+                        "title": policy["title"],
+                        "description": "",
+                        "resource": f"{resource_type}.{name}",
+                        "file_path": "main.tf",
+                        "line_number": None,
+                        "guideline": CHECKOV_POLICY_INDEX
+                    })
+
+        security_score = float(compute_security_scores(
+            passed_count,
+            severity_counts["critical"],
+            severity_counts["high"],
+            severity_counts["medium"],
+            severity_counts["low"]
+        ))
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Fast policy evaluation completed in {elapsed_ms:.1f} ms: score {security_score:.1f}/10")
+
+        return {
+            "security_score": security_score,
+            "passed_checks": passed_count,
+            "failed_checks": len(issues),
+            "critical_issues": severity_counts["critical"],
+            "high_issues": severity_counts["high"],
+            "medium_issues": severity_counts["medium"],
+            "low_issues": severity_counts["low"],
+            "issues": issues
+        }
+
+
+# Singleton instance
+_policy_engine = None
+
+
+def get_policy_engine() -> FastPolicyEngine:
+    """Get or create fast policy engine singleton"""
+    global _policy_engine
+    if _policy_engine is None:
+        _policy_engine = FastPolicyEngine()
+    return _policy_engine
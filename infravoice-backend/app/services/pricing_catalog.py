@@ -0,0 +1,358 @@
+import csv
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.constants import (
+    HOURS_PER_MONTH,
+    PRICING_DEFAULT_REGIONS,
+    PRICING_SKU_ATTRIBUTES,
+    PRICING_STORAGE_ATTRIBUTES,
+    PRICING_QUANTITY_ATTRIBUTES,
+)
+from app.services.hcl_parser import HCLParseError, parse_terraform_files, resolve_variable
+
+logger = logging.getLogger(__name__)
+
+# Bundled price dump used when no PRICING_CATALOG_PATH is configured
+SEED_CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "pricing_seed.csv")
+
+# Columns of a pricing dump, in order
+PRICING_DUMP_COLUMNS = ("resource_type", "region", "sku", "unit", "price_usd")
+
+# Region matching every region, used for region-independent prices
+ANY_REGION = "*"
+
+_RESOURCE_RE = re.compile(r'resource\s+"([^"]+)"\s+"([^"]+)"')
+_ZONE_SUFFIX_RE = re.compile(r"-[a-z]$")
+
+_SCHEMA = """
+CREATE TABLE prices (
+    resource_type TEXT NOT NULL,
+    region TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    price_usd REAL NOT NULL,
+    PRIMARY KEY (resource_type, sku, region)
+) WITHOUT ROWID;
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_LOOKUP_SQL = """
+SELECT region, unit, price_usd FROM prices
+WHERE resource_type = ? AND sku = ? AND region IN (?, ?, ?)
+ORDER BY region = ? DESC, region = ? DESC
+LIMIT 1
+"""
+
+
+def build_catalog(connection: sqlite3.Connection, rows: Iterable[Tuple], version: str) -> int:
+    """
+    Create the catalog tables on an empty connection and load price rows
+
+    Args:
+        connection: Empty SQLite connection
+        rows: (resource_type, region, sku, unit, price_usd) tuples
+        version: Price data version stored in the catalog metadata
+
+    Returns:
+        Number of price rows loaded
+    """
+    connection.executescript(_SCHEMA)
+    cursor = connection.executemany(
+        "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)",
+        ((t, r, s or "", u, float(p)) for t, r, s, u, p in rows)
+    )
+    connection.execute("INSERT INTO metadata VALUES ('version', ?)", (version,))
+    connection.commit()
+    return cursor.rowcount
+
+
+def read_pricing_dump(path: str) -> Iterable[Tuple]:
+    """Stream (resource_type, region, sku, unit, price_usd) rows from a CSV dump"""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield tuple(row[column] for column in PRICING_DUMP_COLUMNS)
+
+
+def _provider(resource_type: str) -> str:
+    return resource_type.split("_", 1)[0]
+
+
+def _attribute(body: Dict, path: str, variables: Dict) -> Any:
+    """Read a possibly nested attribute (e.g. settings.tier) from a resource body"""
+    value: Any = body
+    for key in path.split("."):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return resolve_variable(value, variables)
+
+
+def _as_count(value: Any) -> int:
+    if isinstance(value, bool):
+        return int(value)
+    return value if isinstance(value, int) and value >= 0 else 1
+
+
+def resource_components(resource_type: str, body: Dict, variables: Dict) -> Tuple[int, List[Tuple[str, float]]]:
+    """
+    Priced components of a resource block
+
+    Returns:
+        Tuple of the block's count and its (sku, quantity per instance)
+        components; storage components use "storage:<type>" SKUs
+    """
+    count = _as_count(resolve_variable(body.get("count"), variables))
+    quantity = 1
+    if resource_type in PRICING_QUANTITY_ATTRIBUTES:
+        quantity = _as_count(_attribute(body, PRICING_QUANTITY_ATTRIBUTES[resource_type], variables))
+
+    components = []
+    sku_attribute = PRICING_SKU_ATTRIBUTES.get(resource_type)
+    sku = _attribute(body, sku_attribute, variables) if sku_attribute else ""
+    if isinstance(sku, str):
+        components.append((sku, quantity))
+
+    if resource_type in PRICING_STORAGE_ATTRIBUTES:
+        type_attribute, size_attribute, default_type = PRICING_STORAGE_ATTRIBUTES[resource_type]
+        storage_type = _attribute(body, type_attribute, variables) or default_type
+        size = _attribute(body, size_attribute, variables)
+        if isinstance(size, (int, float)) and isinstance(storage_type, str):
+            components.append((f"storage:{storage_type}", size * quantity))
+
+    return count, components
+
+
+def resource_region(resource_type: str, body: Dict, providers: Dict, variables: Dict) -> str:
+    """Region of a resource: its own location/region/zone, else its provider's, else the default"""
+    provider = _provider(resource_type)
+
+    for key in ("location", "region"):
+        value = resolve_variable(body.get(key), variables)
+        if isinstance(value, str) and value:
+            return value.replace(" ", "").lower() if provider == "azurerm" else value
+
+    zone = resolve_variable(body.get("zone"), variables)
+    if isinstance(zone, str) and zone:
+        return _ZONE_SUFFIX_RE.sub("", zone)
+
+    provider_block = (providers or {}).get(provider)
+    if isinstance(provider_block, dict):
+        value = resolve_variable(provider_block.get("region"), variables)
+        if isinstance(value, str) and value:
+            return value
+
+    return PRICING_DEFAULT_REGIONS.get(provider, "")
+
+
+class PricingCatalog:
+    """
+    Local price catalog keyed by resource type, region and SKU
+
+    Prices are stored in a small SQLite database, either a file built with
+    `python -m app.jobs.build_pricing_catalog` (opened read-only and
+    memory-mapped) or an in-memory copy of the bundled seed dump.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        """Initialize catalog on an open connection"""
+        self._connection = connection
+        row = connection.execute("SELECT value FROM metadata WHERE key = 'version'").fetchone()
+        self.version = row[0] if row else "unknown"
+        logger.info(f"Pricing catalog loaded (version {self.version})")
+
+    @classmethod
+    def open(cls, path: str) -> "PricingCatalog":
+        """Open a catalog file built by build_catalog"""
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        connection.execute("PRAGMA mmap_size = 268435456")
+        return cls(connection)
+
+    @classmethod
+    def from_dump(cls, path: str) -> "PricingCatalog":
+        """Load a CSV pricing dump into an in-memory catalog"""
+        with open(path, "rb") as f:
+            version = f"seed-{hashlib.sha1(f.read()).hexdigest()[:12]}"
+        connection = sqlite3.connect(":memory:", check_same_thread=False)
+        build_catalog(connection, read_pricing_dump(path), version)
+        return cls(connection)
+
+    def lookup(self, resource_type: str, region: str, sku: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Find the price of a SKU, preferring the exact region
+
+        Falls back to a region-independent price, then to the provider's
+        default region (flagged as approximated).
+
+        Returns:
+            Dict with unit, price and approximated, or None if not in the catalog
+        """
+        default_region = PRICING_DEFAULT_REGIONS.get(_provider(resource_type), region)
+        row = self._connection.execute(
+            _LOOKUP_SQL,
+            (resource_type, sku, region, ANY_REGION, default_region, region, ANY_REGION)
+        ).fetchone()
+        if not row:
+            return None
+
+        matched_region, unit, price = row
+        return {
+            "unit": unit,
+            "price": price,
+            "approximated": matched_region not in (region, ANY_REGION)
+        }
+
+    def skus(self, resource_type: str) -> List[str]:
+        """SKUs with a price for a resource type, in any region"""
+        rows = self._connection.execute(
+            "SELECT DISTINCT sku FROM prices WHERE resource_type = ? AND sku != '' ORDER BY sku",
+            (resource_type,)
+        ).fetchall()
+        return [sku for sku, in rows]
+
+    def regions(self, provider: str) -> Set[str]:
+        """Regions with at least one price for a provider's resource types"""
+        rows = self._connection.execute(
+            "SELECT DISTINCT region FROM prices WHERE resource_type LIKE ? ESCAPE '\\' AND region != ?",
+            (f"{provider}\\_%", ANY_REGION)
+        ).fetchall()
+        return {region for region, in rows}
+
+    def price_table(
+        self,
+        resource_type: str,
+        skus: Sequence[str],
+        regions: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Monthly unit prices of many SKUs across many regions in one query
+
+        Applies the same region preference as lookup: exact region, then
+        region-independent, then the provider's default region.
+
+        Returns:
+            Tuple of a (regions x skus) array of monthly unit prices (NaN
+            where unknown) and a boolean array marking approximated prices
+        """
+        skus = list(skus)
+        region_index = {region: i for i, region in enumerate(regions)}
+        sku_index = {sku: j for j, sku in enumerate(skus)}
+        default_region = PRICING_DEFAULT_REGIONS.get(_provider(resource_type))
+
+        exact = np.full((len(region_index), len(skus)), np.nan)
+        any_region = np.full(len(skus), np.nan)
+        default = np.full(len(skus), np.nan)
+
+        if skus:
+            rows = self._connection.execute(
+                f"SELECT region, sku, unit, price_usd FROM prices "
+                f"WHERE resource_type = ? AND sku IN ({', '.join('?' * len(skus))})",
+                (resource_type, *skus)
+            )
+            for region, sku, unit, price in rows:
+                monthly = self._monthly({"unit": unit, "price": price}, 1)
+                j = sku_index[sku]
+                if region in region_index:
+                    exact[region_index[region], j] = monthly
+                if region == ANY_REGION:
+                    any_region[j] = monthly
+                if region == default_region:
+                    default[j] = monthly
+
+        fallback = np.where(np.isnan(any_region), default, any_region)
+        prices = np.where(np.isnan(exact), fallback, exact)
+        approximated = np.isnan(exact) & np.isnan(any_region) & ~np.isnan(default)
+        return prices, approximated
+
+    def _monthly(self, price: Dict[str, Any], quantity: float) -> float:
+        if price["unit"] == "hour":
+            return price["price"] * HOURS_PER_MONTH * quantity
+        return price["price"] * quantity
+
+    def estimate_resources(self, terraform_code: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Price every resource of Terraform code from the catalog
+
+        Args:
+            terraform_code: Dict with main_tf, variables_tf, outputs_tf
+
+        Returns:
+            Dict with resource_costs (name, type, monthly_cost), unpriced
+            resource addresses and the number of approximated prices
+        """
+        try:
+            parsed = parse_terraform_files(terraform_code)
+        except HCLParseError as e:
+            # Price by resource type alone, with default SKUs and regions
+            logger.warning(f"Could not parse Terraform for offline pricing: {str(e)}")
+            parsed = {"resource": {}}
+            for resource_type, name in _RESOURCE_RE.findall(terraform_code.get("main_tf", "") or ""):
+                parsed["resource"].setdefault(resource_type, {})[name] = {}
+
+        variables = parsed.get("variable", {}) or {}
+        providers = parsed.get("provider", {}) or {}
+
+        resource_costs = []
+        unpriced = []
+        approximated = 0
+
+        for resource_type, resources in (parsed.get("resource", {}) or {}).items():
+            if not isinstance(resources, dict):
+                continue
+
+            for name, body in resources.items():
+                if not isinstance(body, dict):
+                    continue
+                address = f"{resource_type}.{name}"
+                region = resource_region(resource_type, body, providers, variables)
+                count, components = resource_components(resource_type, body, variables)
+
+                prices = []
+                for sku, quantity in components:
+                    price = self.lookup(resource_type, region, sku)
+                    if price:
+                        prices.append((price, quantity * count))
+
+                if not prices:
+                    unpriced.append(address)
+                    continue
+
+                approximated += sum(1 for price, _ in prices if price["approximated"])
+                resource_costs.append({
+                    "name": address,
+                    "type": resource_type,
+                    "monthly_cost": round(sum(self._monthly(price, quantity) for price, quantity in prices), 2)
+                })
+
+        return {
+            "resource_costs": resource_costs,
+            "unpriced": unpriced,
+            "approximated": approximated
+        }
+
+
+# Singleton instance
+_pricing_catalog = None
+
+
+def get_pricing_catalog() -> PricingCatalog:
+    """Get or create pricing catalog singleton"""
+    global _pricing_catalog
+    if _pricing_catalog is None:
+        if settings.PRICING_CATALOG_PATH:
+            _pricing_catalog = PricingCatalog.open(settings.PRICING_CATALOG_PATH)
+        else:
+            _pricing_catalog = PricingCatalog.from_dump(SEED_CSV_PATH)
+    return _pricing_catalog
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import text
+
+from app.core.constants import ModelStatus
+from app.db.base import engine
+from app.services.cost_cache import get_cost_cache
+from app.services.voice_service import get_whisper_service
+
+logger = logging.getLogger(__name__)
+
+# Seconds a dependency check may take before it counts as unavailable
+CHECK_TIMEOUT_SECONDS = 2.0
+
+
+def _ping_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _check(name: str, check) -> Dict[str, Any]:
+    """Run one dependency check with a timeout, timing it"""
+    started = time.monotonic()
+    try:
+        ok = await asyncio.wait_for(check(), CHECK_TIMEOUT_SECONDS)
+        error = None if ok else f"{name} is unreachable"
+    except Exception as e:
+        ok = False
+        error = str(e) or type(e).__name__
+    if error:
+        logger.warning(f"Readiness check for {name} failed: {error}")
+    return {
+        "status": "ready" if ok else "unavailable",
+        "latency_ms": round((time.monotonic() - started) * 1000, 1),
+        "error": error
+    }
+
+
+async def _check_database() -> bool:
+    await asyncio.get_running_loop().run_in_executor(None, _ping_database)
+    return True
+
+
+async def get_readiness() -> Dict[str, Any]:
+    """
+    Readiness of each subsystem
+
+    The API is ready to serve as soon as the database answers. Redis only
+    backs the cost cache, and the Whisper model only gates voice
+    endpoints (which answer 503 while it warms up), so either being
+    unavailable or loading degrades the service without making it unready.
+
+    Returns:
+        Dict with ready, overall status (ready, degraded or unavailable)
+        and per-subsystem details
+    """
+    database, redis_cache = await asyncio.gather(
+        _check("database", _check_database),
+        _check("redis", get_cost_cache().ping)
+    )
+    subsystems = {
+        "database": database,
+        "redis": redis_cache,
+        "whisper": get_whisper_service().model_status()
+    }
+
+    ready = database["status"] == "ready"
+    if not ready:
+        overall = "unavailable"
+    elif redis_cache["status"] == "ready" and subsystems["whisper"]["status"] == ModelStatus.READY.value:
+        overall = "ready"
+    else:
+        overall = "degraded"
+
+    return {
+        "ready": ready,
+        "status": overall,
+        "subsystems": subsystems
+    }
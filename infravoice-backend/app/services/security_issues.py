@@ -0,0 +1,135 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.deployment import Deployment
+from app.models.security_scan import SecurityScan
+from app.models.security_scan_issue import SecurityScanIssue
+
+logger = logging.getLogger(__name__)
+
+
+def build_issue_rows(
+    scan_id: uuid.UUID,
+    deployment_id: Optional[uuid.UUID],
+    issues: Iterable[Dict],
+    created_at: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Convert scan issue dicts into security_issues rows
+
+    Duplicate (check_id, resource) pairs within a scan are collapsed so the
+    rows satisfy the table's unique constraint.
+    """
+    rows = []
+    seen = set()
+
+    for issue in issues or []:
+        key = (issue.get("check_id") or "", issue.get("resource") or "")
+        if key in seen:
+            continue
+        seen.add(key)
+
+        rows.append({
+            "id": uuid.uuid4(),
+            "scan_id": scan_id,
+            "deployment_id": deployment_id,
+            "check_id": key[0],
+            "severity": issue.get("severity") or "medium",
+            "resource": key[1],
+            "title": issue.get("title") or "",
+            "file_path": issue.get("file_path"),
+            "line_number": issue.get("line_number"),
+            "guideline": issue.get("guideline"),
+            "created_at": created_at or datetime.utcnow()
+        })
+
+    return rows
+
+
+def save_scan_issues(db: Session, security_scan: SecurityScan) -> int:
+    """
+    Bulk insert the issues of a scan into security_issues
+
+    Flushes the scan first so its id is available. The caller owns the
+    transaction, so the scan and its issue rows commit together.
+
+    Returns:
+        Number of issue rows inserted
+    """
+    db.flush()
+
+    rows = build_issue_rows(
+        security_scan.id,
+        security_scan.deployment_id,
+        security_scan.issues,
+        created_at=security_scan.created_at
+    )
+    if rows:
+        db.execute(insert(SecurityScanIssue), rows)
+
+    logger.debug(f"Stored {len(rows)} issue rows for scan {security_scan.id}")
+    return len(rows)
+
+
+def get_top_failing_checks(
+    db: Session,
+    user_id: uuid.UUID,
+    severity: Optional[str] = None,
+    limit: int = 20
+) -> List[Dict]:
+    """Most frequently failing checks across a user's deployments"""
+    deployment_count = func.count(func.distinct(SecurityScanIssue.deployment_id))
+
+    query = (
+        select(
+            SecurityScanIssue.check_id,
+            func.max(SecurityScanIssue.severity).label("severity"),
+            func.max(SecurityScanIssue.title).label("title"),
+            func.count().label("failure_count"),
+            deployment_count.label("deployment_count")
+        )
+        .join(Deployment, Deployment.id == SecurityScanIssue.deployment_id)
+        .where(Deployment.user_id == user_id)
+        .group_by(SecurityScanIssue.check_id)
+        .order_by(deployment_count.desc(), func.count().desc())
+        .limit(limit)
+    )
+    if severity:
+        query = query.where(SecurityScanIssue.severity == severity)
+
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def get_deployments_failing_check(
+    db: Session,
+    user_id: uuid.UUID,
+    check_id: str,
+    limit: int = 100
+) -> List[Dict]:
+    """Deployments of a user with at least one failure of a given check"""
+    last_seen = func.max(SecurityScanIssue.created_at)
+
+    query = (
+        select(
+            Deployment.id.label("deployment_id"),
+            Deployment.name.label("deployment_name"),
+            func.count().label("failure_count"),
+            func.count(func.distinct(SecurityScanIssue.resource)).label("resource_count"),
+            last_seen.label("last_seen")
+        )
+        .join(Deployment, Deployment.id == SecurityScanIssue.deployment_id)
+        .where(
+            SecurityScanIssue.check_id == check_id,
+            Deployment.user_id == user_id
+        )
+        .group_by(Deployment.id, Deployment.name)
+        .order_by(last_seen.desc())
+        .limit(limit)
+    )
+
+    return [dict(row._mapping) for row in db.execute(query)]
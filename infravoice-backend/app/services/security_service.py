@@ -1,15 +1,61 @@
-import json
-import subprocess
-import tempfile
-import os
+import asyncio
 import logging
-from typing import Dict, List
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from app.core.config import settings
+from app.core.constants import (
+    SecuritySeverity,
+    SECURITY_SEVERITY_WEIGHTS,
+    SECURITY_PENALTY_FACTOR,
+    SECURITY_SCORE_NO_CHECKS,
+)
+from app.services.streaming_parsers import CheckovOutputParser, run_streaming_command
+from app.services.terraform_workspace import terraform_workspace
 
 logger = logging.getLogger(__name__)
 
 
+def compute_security_scores(passed, critical, high, medium, low):
+    """
+    Compute security scores (0-10) from check counts
+    
+    Accepts scalars or equally shaped numpy arrays, so the same formula is
+    used for a single scan and for bulk rescoring of stored scans.
+    
+    Returns:
+        Score rounded to 2 decimals (numpy scalar or array)
+    """
+    passed = np.asarray(passed, dtype=np.float64)
+    critical = np.asarray(critical, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    medium = np.asarray(medium, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    
+    total = passed + critical + high + medium + low
+    
+    # Penalize based on severity
+    penalty = (
+        critical * SECURITY_SEVERITY_WEIGHTS[SecuritySeverity.CRITICAL] +
+        high * SECURITY_SEVERITY_WEIGHTS[SecuritySeverity.HIGH] +
+        medium * SECURITY_SEVERITY_WEIGHTS[SecuritySeverity.MEDIUM] +
+        low * SECURITY_SEVERITY_WEIGHTS[SecuritySeverity.LOW]
+    )
+    
+    # Base score on pass rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pass_rate = passed / total
+    
+    scores = np.where(
+        total > 0,
+        np.clip(pass_rate * 10 - penalty * SECURITY_PENALTY_FACTOR, 0, 10),
+        SECURITY_SCORE_NO_CHECKS
+    )
+    return np.round(scores, 2)
+
+
 class CheckovSecurityScanner:
     """Service for security scanning using Checkov"""
     
@@ -29,42 +75,89 @@ class CheckovSecurityScanner:
             Dict with security score and issues
         """
         try:
-            logger.info("Starting Checkov security scan")
-            
             # Create temporary directory for Terraform files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Write Terraform files
-                main_path = os.path.join(temp_dir, "main.tf")
-                vars_path = os.path.join(temp_dir, "variables.tf")
-                outputs_path = os.path.join(temp_dir, "outputs.tf")
-                
-                with open(main_path, 'w') as f:
-                    f.write(terraform_code.get("main_tf", ""))
-                with open(vars_path, 'w') as f:
-                    f.write(terraform_code.get("variables_tf", ""))
-                with open(outputs_path, 'w') as f:
-                    f.write(terraform_code.get("outputs_tf", ""))
-                
-                # Run Checkov
-                result = await self._run_checkov(temp_dir)
-                
-                # Calculate security score
-                security_data = self._calculate_security_score(result)
-                
-                logger.info(f"Security scan completed: score {security_data['security_score']:.1f}/10")
-                return security_data
+            with terraform_workspace(terraform_code) as temp_dir:
+                return await self.scan_directory(temp_dir)
                 
         except Exception as e:
             logger.error(f"Security scan failed: {str(e)}")
             raise RuntimeError(f"Failed to scan Terraform code: {str(e)}")
     
-    async def _run_checkov(self, directory: str) -> Dict:
-        """Run Checkov subprocess and return results"""
+    async def scan_directory(self, directory: str, files: Optional[List[str]] = None) -> Dict[str, any]:
+        """
+        Scan an already materialized Terraform directory using Checkov
+        
+        Args:
+            directory: Path containing the Terraform files
+            files: Scan only these files instead of the whole directory tree
+            
+        Returns:
+            Dict with security score and issues
+        """
+        logger.info("Starting Checkov security scan")
+        
+        # Run Checkov
+        result = await self._run_checkov(directory, files)
+        
+        # Calculate security score
+        security_data = self._calculate_security_score(result)
+        
+        logger.info(f"Security scan completed: score {security_data['security_score']:.1f}/10")
+        return security_data
+    
+    async def scan_modules(
+        self,
+        root: str,
+        modules: Dict[str, List[str]],
+        max_workers: int
+    ) -> AsyncIterator[Tuple[str, Optional[Dict], Optional[str]]]:
+        """
+        Scan several Terraform modules with a bounded number of Checkov processes
+        
+        Args:
+            root: Directory the modules were extracted to
+            modules: Module path -> Terraform files directly in that module
+            max_workers: Maximum number of concurrent Checkov processes
+            
+        Yields:
+            Tuples of (module, scan result, error message) in completion order
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+        
+        async def _scan(module: str, files: List[str]):
+            async with semaphore:
+                try:
+                    result = await self.scan_directory(root, files)
+                except Exception as e:
+                    logger.error(f"Security scan of module {module} failed: {str(e)}")
+                    return module, None, str(e)
+            
+            # Report file paths relative to the archive root
+            for issue in result["issues"]:
+                if issue["file_path"].startswith(root):
+                    issue["file_path"] = os.path.relpath(issue["file_path"], root)
+            return module, result, None
+        
+        tasks = [asyncio.ensure_future(_scan(module, files)) for module, files in modules.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding scans if the consumer goes away
+            for task in tasks:
+                task.cancel()
+    
+    async def _run_checkov(self, directory: str, files: Optional[List[str]] = None) -> Dict:
+        """Run Checkov subprocess and return passed count and failed checks"""
         try:
             # Run checkov with JSON output
+            if files:
+                target = [arg for path in files for arg in ("-f", path)]
+            else:
+                target = ["-d", directory]
             cmd = [
                 self.checkov_path,
-                "-d", directory,
+                *target,
                 "-o", "json",
                 "--compact",
                 "--quiet"
@@ -72,29 +165,15 @@ class CheckovSecurityScanner:
             
             logger.debug(f"Running command: {' '.join(cmd)}")
             
-            # Run subprocess
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            # Stream stdout through the incremental parser
+            result, _, _ = await run_streaming_command(cmd, CheckovOutputParser(), timeout=60)
             
             # Checkov returns non-zero exit code when issues are found
             # So we don't check returncode
             
-            # Parse JSON output
-            if process.stdout:
-                try:
-                    result = json.loads(process.stdout)
-                    return result
-                except json.JSONDecodeError:
-                    logger.warning("Failed to parse Checkov JSON output")
-                    return {"results": {"passed_checks": [], "failed_checks": []}}
-            
-            return {"results": {"passed_checks": [], "failed_checks": []}}
+            return result
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error("Checkov scan timed out")
             raise RuntimeError("Security scan timed out")
         except FileNotFoundError:
@@ -108,13 +187,10 @@ class CheckovSecurityScanner:
         """Calculate security score from Checkov results"""
         
         # Extract results
-        results = checkov_result.get("results", {})
-        passed_checks = results.get("passed_checks", [])
-        failed_checks = results.get("failed_checks", [])
+        passed_count = checkov_result.get("passed_count", 0)
+        failed_checks = checkov_result.get("failed_checks", [])
         
-        passed_count = len(passed_checks)
         failed_count = len(failed_checks)
-        total_checks = passed_count + failed_count
         
         # Count by severity
         severity_counts = {
@@ -153,25 +229,16 @@ class CheckovSecurityScanner:
             issues.append(issue)
         
         # Calculate score (0-10)
-        if total_checks == 0:
-            security_score = 7.0  # Default score if no checks
-        else:
-            # Base score on pass rate
-            pass_rate = passed_count / total_checks
-            
-            # Penalize based on severity
-            penalty = (
-                severity_counts["critical"] * 2.0 +
-                severity_counts["high"] * 1.0 +
-                severity_counts["medium"] * 0.5 +
-                severity_counts["low"] * 0.2
-            )
-            
-            # Calculate final score
-            security_score = max(0, min(10, (pass_rate * 10) - (penalty * 0.5)))
+        security_score = float(compute_security_scores(
+            passed_count,
+            severity_counts["critical"],
+            severity_counts["high"],
+            severity_counts["medium"],
+            severity_counts["low"]
+        ))
         
         return {
-            "security_score": round(security_score, 2),
+            "security_score": security_score,
             "passed_checks": passed_count,
             "failed_checks": failed_count,
             "critical_issues": severity_counts["critical"],
@@ -0,0 +1,75 @@
+import fcntl
+import logging
+import os
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def weights_dir() -> str:
+    """Directory of model files: WHISPER_WEIGHTS_DIR, or Whisper's own download cache"""
+    default = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper")
+    return settings.WHISPER_WEIGHTS_DIR or default
+
+
+def shared_weights_path(model_size: str) -> str:
+    """Memory-mappable fp32 model file of a size, for the installed Whisper version"""
+    import whisper
+    return os.path.join(weights_dir(), f"{model_size}-{whisper.__version__}.fp32.pt")
+
+
+def export_shared_weights(model_size: str) -> str:
+    """
+    Write the memory-mappable model file of a size, unless it exists
+
+    Whisper's checkpoints hold fp16 weights that load_model() converts to
+    fp32 copies in every process, so they cannot be shared as they are.
+    This saves the converted CPU model once (in torch's zip format, which
+    torch.load can memory-map). Processes starting together convert it only
+    once: the others wait on a file lock and use the result.
+
+    Returns:
+        Path of the model file
+    """
+    import torch
+    import whisper
+
+    path = shared_weights_path(model_size)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(weights_dir(), exist_ok=True)
+    with open(path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(path):
+            started = time.monotonic()
+            model = whisper.load_model(model_size, device="cpu", download_root=weights_dir())
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            torch.save(model, temp_path)
+            os.replace(temp_path, path)
+            logger.info(f"Exported shared Whisper weights {path} in {time.monotonic() - started:.1f}s")
+    return path
+
+
+def load_shared_model(model_size: str):
+    """
+    fp32 CPU Whisper model whose weights are memory-mapped, not copied
+
+    The weights are mapped read-only from the file of export_shared_weights,
+    so every process loading the same size (uvicorn workers, chunk workers)
+    uses the same physical pages from the page cache; each one only adds
+    its own activations and caches. Every page is touched once here so the
+    first transcription does not wait for the model to be read from disk.
+    """
+    import torch
+
+    path = export_shared_weights(model_size)
+    # The file is written by export_shared_weights, so unpickling the module is safe
+    model = torch.load(path, map_location="cpu", mmap=True, weights_only=False)
+    with torch.no_grad():
+        for tensor in model.state_dict().values():
+            if tensor.numel() and not tensor.is_sparse:
+                tensor.sum()
+    return model
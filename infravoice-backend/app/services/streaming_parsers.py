@@ -0,0 +1,235 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import ijson
+
+logger = logging.getLogger(__name__)
+
+# Size of each stdout read fed to the incremental parsers
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Checkov failed-check fields kept for scoring and issue reporting.
+# Everything else (code_block, evaluations, ...) is dropped per item.
+CHECKOV_ISSUE_FIELDS = (
+    "check_id",
+    "check_name",
+    "severity",
+    "description",
+    "resource",
+    "file_path",
+    "file_line_range",
+    "guideline",
+)
+
+# Infracost resource fields used by the cost breakdown
+INFRACOST_RESOURCE_FIELDS = ("name", "resourceType", "monthlyCost")
+
+# Infracost free resource fields, used to tell priced-at-zero blocks apart
+INFRACOST_FREE_RESOURCE_FIELDS = ("name", "resourceType")
+
+
+class StreamingJSONParser(ABC):
+    """
+    Base class for push-style JSON parsers fed with raw stdout chunks
+
+    Subclasses register ijson item coroutines for the prefixes they care
+    about; only values under those prefixes are ever built. A parse error
+    disables the parser and result() falls back to the empty result.
+    """
+
+    tool_name = "tool"
+
+    def __init__(self):
+        self._coroutines = []
+        self._started = False
+        self._failed = False
+
+    @abstractmethod
+    def _setup(self, root_prefix: str) -> None:
+        """Register item coroutines once the top-level layout is known"""
+
+    @abstractmethod
+    def _collect(self) -> None:
+        """Consume items produced by the coroutines since the last chunk"""
+
+    @abstractmethod
+    def _build_result(self) -> Dict:
+        """Reduced result of a complete parse"""
+
+    @abstractmethod
+    def _empty_result(self) -> Dict:
+        """Result when there was no output or it could not be parsed"""
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next chunk of raw JSON bytes"""
+        if self._failed or not chunk:
+            return
+
+        if not self._started:
+            stripped = chunk.lstrip()
+            if not stripped:
+                return
+            # Multi-framework output is a top-level array of result objects
+            self._setup("item." if stripped[:1] == b"[" else "")
+            self._started = True
+
+        try:
+            for coroutine in self._coroutines:
+                coroutine.send(chunk)
+            self._collect()
+        except ijson.JSONError as e:
+            logger.warning(f"Failed to parse {self.tool_name} JSON output: {e}")
+            self._failed = True
+
+    def result(self) -> Dict:
+        """Finish parsing and return the reduced result"""
+        if not self._started or self._failed:
+            return self._empty_result()
+
+        try:
+            for coroutine in self._coroutines:
+                coroutine.close()
+            self._collect()
+        except ijson.JSONError as e:
+            logger.warning(f"Failed to parse {self.tool_name} JSON output: {e}")
+            return self._empty_result()
+
+        return self._build_result()
+
+
+class CheckovOutputParser(StreamingJSONParser):
+    """
+    Incremental parser for `checkov -o json` output
+
+    Passed checks are counted from their check_id values without building
+    the check objects. Failed checks are built one at a time and reduced to
+    CHECKOV_ISSUE_FIELDS before being kept.
+    """
+
+    tool_name = "Checkov"
+
+    def __init__(self):
+        super().__init__()
+        self.passed_count = 0
+        self.failed_checks: List[Dict] = []
+        self._passed_ids = ijson.sendable_list()
+        self._failed_items = ijson.sendable_list()
+
+    def _setup(self, root_prefix: str) -> None:
+        self._coroutines = [
+            ijson.items_coro(self._passed_ids, f"{root_prefix}results.passed_checks.item.check_id"),
+            ijson.items_coro(self._failed_items, f"{root_prefix}results.failed_checks.item", use_float=True),
+        ]
+
+    def _collect(self) -> None:
+        self.passed_count += len(self._passed_ids)
+        del self._passed_ids[:]
+
+        for check in self._failed_items:
+            self.failed_checks.append({key: check.get(key) for key in CHECKOV_ISSUE_FIELDS})
+        del self._failed_items[:]
+
+    def _build_result(self) -> Dict:
+        return {"passed_count": self.passed_count, "failed_checks": self.failed_checks}
+
+    def _empty_result(self) -> Dict:
+        return {"passed_count": 0, "failed_checks": []}
+
+
+class InfracostOutputParser(StreamingJSONParser):
+    """
+    Incremental parser for `infracost breakdown --format json` output
+
+    Only totalMonthlyCost, the name/type/cost of each resource in
+    projects[].breakdown and the name/type of its free resources are kept.
+    The result uses the Infracost layout so it can be passed straight to
+    the cost processing code.
+    """
+
+    tool_name = "Infracost"
+
+    def __init__(self):
+        super().__init__()
+        self.total_monthly_cost = "0"
+        self.resources: List[Dict] = []
+        self.free_resources: List[Dict] = []
+        self._totals = ijson.sendable_list()
+        self._resource_items = ijson.sendable_list()
+        self._free_items = ijson.sendable_list()
+
+    def _setup(self, root_prefix: str) -> None:
+        self._coroutines = [
+            ijson.items_coro(self._totals, "totalMonthlyCost", use_float=True),
+            ijson.items_coro(self._resource_items, "projects.item.breakdown.resources.item", use_float=True),
+            ijson.items_coro(self._free_items, "projects.item.breakdown.freeResources.item"),
+        ]
+
+    def _collect(self) -> None:
+        if self._totals:
+            self.total_monthly_cost = self._totals[-1]
+            del self._totals[:]
+
+        for resource in self._resource_items:
+            self.resources.append({key: resource.get(key) for key in INFRACOST_RESOURCE_FIELDS})
+        del self._resource_items[:]
+
+        for resource in self._free_items:
+            self.free_resources.append({key: resource.get(key) for key in INFRACOST_FREE_RESOURCE_FIELDS})
+        del self._free_items[:]
+
+    def _build_result(self) -> Dict:
+        return {
+            "totalMonthlyCost": self.total_monthly_cost,
+            "projects": [{"breakdown": {"resources": self.resources, "freeResources": self.free_resources}}]
+        }
+
+    def _empty_result(self) -> Dict:
+        return {}
+
+
+async def run_streaming_command(
+    cmd: List[str],
+    parser: StreamingJSONParser,
+    timeout: float,
+    env: Optional[Dict[str, str]] = None
+) -> Tuple[Dict, int, bytes]:
+    """
+    Run a subprocess and feed its stdout to a parser while it is produced
+
+    stderr is drained concurrently so a chatty tool cannot fill the pipe
+    and stall stdout. The process is killed if the timeout expires.
+
+    Returns:
+        Tuple of (parsed result, return code, stderr bytes)
+
+    Raises:
+        asyncio.TimeoutError: If the command did not finish in time
+        FileNotFoundError: If the executable does not exist
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env
+    )
+
+    async def _read_stdout():
+        while True:
+            chunk = await process.stdout.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+
+    async def _collect():
+        _, stderr = await asyncio.gather(_read_stdout(), process.stderr.read())
+        returncode = await process.wait()
+        return parser.result(), returncode, stderr
+
+    try:
+        return await asyncio.wait_for(_collect(), timeout=timeout)
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
@@ -0,0 +1,147 @@
+import logging
+import os
+import shutil
+import tarfile
+import zipfile
+from typing import BinaryIO, Dict, List
+
+from app.core.constants import ARCHIVE_TERRAFORM_EXTENSIONS, MAX_ARCHIVE_MEMBERS
+
+logger = logging.getLogger(__name__)
+
+# Copy buffer used when extracting archive members
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+
+class ArchiveError(ValueError):
+    """Raised when an uploaded archive is invalid or exceeds limits"""
+
+
+def _is_terraform_file(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_TERRAFORM_EXTENSIONS)
+
+
+def _safe_destination(root: str, member_name: str) -> str:
+    """Resolve a member path inside root, rejecting absolute and escaping paths"""
+    normalized = os.path.normpath(member_name.replace("\\", "/").lstrip("/"))
+    if normalized.startswith("..") or os.path.isabs(normalized):
+        raise ArchiveError(f"Archive member escapes extraction directory: {member_name}")
+    return os.path.join(root, normalized)
+
+
+class _ExtractionBudget:
+    """Tracks extracted members and bytes against the configured limits"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.files = 0
+
+    def copy(self, source: BinaryIO, destination: str) -> None:
+        self.files += 1
+        if self.files > MAX_ARCHIVE_MEMBERS:
+            raise ArchiveError(f"Archive contains more than {MAX_ARCHIVE_MEMBERS} Terraform files")
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        with open(destination, "wb") as target:
+            while True:
+                chunk = source.read(EXTRACT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.bytes += len(chunk)
+                if self.bytes > self.max_bytes:
+                    raise ArchiveError(
+                        f"Extracted Terraform files exceed {self.max_bytes // 1024 // 1024}MB"
+                    )
+                target.write(chunk)
+
+
+def _extract_tar(fileobj: BinaryIO, root: str, budget: _ExtractionBudget) -> None:
+    # Stream mode reads members sequentially without seeking or indexing
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            # Links, devices and directories are never extracted
+            if not member.isfile() or not _is_terraform_file(member.name):
+                continue
+            destination = _safe_destination(root, member.name)
+            source = archive.extractfile(member)
+            if source is not None:
+                budget.copy(source, destination)
+
+
+def _extract_zip(fileobj: BinaryIO, root: str, budget: _ExtractionBudget) -> None:
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not _is_terraform_file(info.filename):
+                continue
+            destination = _safe_destination(root, info.filename)
+            with archive.open(info) as source:
+                budget.copy(source, destination)
+
+
+def extract_terraform_archive(fileobj: BinaryIO, root: str, max_bytes: int) -> Dict[str, int]:
+    """
+    Extract the Terraform files of a tar (optionally compressed) or zip archive
+
+    Only .tf, .tf.json and .tfvars files are written; every other member is
+    skipped. Members are copied in chunks so neither the archive nor any
+    single file is held in memory.
+
+    Args:
+        fileobj: Seekable binary file positioned anywhere
+        root: Existing directory to extract into
+        max_bytes: Limit on the total size of extracted files
+
+    Returns:
+        Dict with the number of extracted files and bytes
+
+    Raises:
+        ArchiveError: If the archive is not a tar/zip, is corrupt, contains
+            unsafe paths or exceeds the extraction limits
+    """
+    budget = _ExtractionBudget(max_bytes)
+
+    fileobj.seek(0)
+    is_zip = zipfile.is_zipfile(fileobj)
+    fileobj.seek(0)
+
+    try:
+        if is_zip:
+            _extract_zip(fileobj, root, budget)
+        else:
+            _extract_tar(fileobj, root, budget)
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+        raise ArchiveError(f"Unsupported or corrupt archive: {str(e)}")
+
+    logger.debug(f"Extracted {budget.files} Terraform files ({budget.bytes} bytes) to {root}")
+    return {"files": budget.files, "bytes": budget.bytes}
+
+
+def find_terraform_modules(root: str) -> List[str]:
+    """
+    List directories under root that directly contain Terraform files
+
+    Returns:
+        Sorted module paths relative to root ("." for the root itself)
+    """
+    modules = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        if any(_is_terraform_file(name) for name in filenames):
+            modules.append(os.path.relpath(directory, root))
+    return sorted(modules)
+
+
+def module_terraform_files(root: str, module: str) -> List[str]:
+    """Absolute paths of the Terraform files directly inside a module directory"""
+    directory = os.path.join(root, module)
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if _is_terraform_file(name) and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def remove_tree(root: str) -> None:
+    """Remove an extraction directory, ignoring errors"""
+    shutil.rmtree(root, ignore_errors=True)
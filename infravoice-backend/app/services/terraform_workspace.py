@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from app.core.constants import TERRAFORM_FILES
+
+logger = logging.getLogger(__name__)
+
+
+def parse_terraform_code(raw_code: str) -> Dict[str, str]:
+    """
+    Parse the terraform_code payload sent by clients
+
+    Args:
+        raw_code: JSON string with main_tf, variables_tf, outputs_tf, or plain HCL
+
+    Returns:
+        Dict with main_tf, variables_tf, outputs_tf
+    """
+    try:
+        terraform_code = json.loads(raw_code)
+    except json.JSONDecodeError:
+        terraform_code = None
+
+    if not isinstance(terraform_code, dict):
+        # If not JSON, assume it's just main.tf
+        terraform_code = {
+            "main_tf": raw_code,
+            "variables_tf": "",
+            "outputs_tf": ""
+        }
+
+    return terraform_code
+
+
+def write_terraform_files(directory: str, terraform_code: Dict[str, str]) -> None:
+    """Write main.tf, variables.tf and outputs.tf into a directory"""
+    for key, filename in TERRAFORM_FILES.items():
+        with open(os.path.join(directory, filename), 'w') as f:
+            f.write(terraform_code.get(f"{key}_tf", "") or "")
+
+
+@contextmanager
+def terraform_workspace(terraform_code: Dict[str, str]) -> Iterator[str]:
+    """
+    Materialize Terraform code into a temporary directory
+
+    The directory is shared by every tool run inside the context and removed
+    when the context exits.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_terraform_files(temp_dir, terraform_code)
+        logger.debug(f"Terraform workspace created at {temp_dir}")
+        yield temp_dir
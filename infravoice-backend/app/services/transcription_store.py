@@ -0,0 +1,141 @@
+import base64
+import binascii
+import hashlib
+import logging
+import uuid
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.transcription import Transcription
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed per read
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def audio_fingerprint(audio_file: BinaryIO) -> str:
+    """
+    sha256 of an uploaded file's bytes
+
+    Reads the file in chunks and rewinds it afterwards, so it can still be
+    decoded. Blocking; run it off the event loop for large uploads.
+    """
+    digest = hashlib.sha256()
+    audio_file.seek(0)
+    for chunk in iter(lambda: audio_file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    audio_file.seek(0)
+    return digest.hexdigest()
+
+
+def find_transcription(
+    db: Session,
+    user_id: uuid.UUID,
+    audio_hash: str,
+    model_size: str
+) -> Optional[Transcription]:
+    """Earlier transcription of the same audio by the same user with the same model size"""
+    return (
+        db.query(Transcription)
+        .filter(
+            Transcription.user_id == user_id,
+            Transcription.audio_hash == audio_hash,
+            Transcription.model_size == model_size
+        )
+        .first()
+    )
+
+
+def save_transcription(
+    db: Session,
+    user_id: uuid.UUID,
+    audio_hash: str,
+    model_size: str,
+    filename: Optional[str],
+    result: Dict
+) -> None:
+    """
+    Store a transcription result and commit
+
+    The row is keyed by the requested model size, so a user whose tier
+    model changes gets a new transcription; the model that produced it
+    (result["model_size"]) is stored alongside. Concurrent uploads of the same
+    audio by the same user both transcribe; the first one stored wins and
+    later inserts are ignored.
+    """
+    db.execute(
+        insert(Transcription)
+        .values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            audio_hash=audio_hash,
+            model_size=model_size,
+            result_model_size=result.get("model_size"),
+            filename=filename,
+            transcript=result["transcript"],
+            confidence=result["confidence"],
+            duration=result["duration"],
+            language=result.get("language", "en"),
+            created_at=datetime.utcnow()
+        )
+        .on_conflict_do_nothing(constraint="uq_transcriptions_user_audio_model")
+    )
+    db.commit()
+
+
+def _encode_cursor(transcription: Transcription) -> str:
+    raw = f"{transcription.created_at.isoformat()}|{transcription.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, transcription_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(transcription_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid history cursor")
+
+
+def list_transcriptions(
+    db: Session,
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Transcription], Optional[str]]:
+    """
+    A page of a user's transcriptions, newest first
+
+    Keyset pagination on (created_at, id), served from the
+    (user_id, created_at, id) index: every page costs the same however
+    deep it is, and rows added meanwhile do not shift later pages.
+
+    Args:
+        limit: Page size
+        cursor: next_cursor of the previous page
+
+    Returns:
+        Tuple of (transcriptions, cursor of the next page or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = db.query(Transcription).filter(Transcription.user_id == user_id)
+    if cursor:
+        created_at, transcription_id = _decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Transcription.created_at, Transcription.id) < tuple_(created_at, transcription_id)
+        )
+
+    rows = (
+        query.order_by(Transcription.created_at.desc(), Transcription.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
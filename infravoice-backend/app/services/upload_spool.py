@@ -0,0 +1,378 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.constants import SUPPORTED_AUDIO_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes checked against the file format once received
+SIGNATURE_BYTES = 12
+
+
+class UploadError(ValueError):
+    """Raised when an upload or chunk is invalid"""
+
+
+class UploadNotFound(UploadError):
+    """Raised for unknown, expired or foreign uploads"""
+
+
+class UploadTooLarge(UploadError):
+    """Raised when an upload or chunk exceeds its size limit"""
+
+
+class UploadOffsetMismatch(UploadError):
+    """Raised when a chunk does not start where the upload left off"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadBusy(UploadError):
+    """Raised when another chunk of the same upload is still being written"""
+
+
+class SpoolFull(RuntimeError):
+    """Raised when the spool has no room for another upload"""
+
+
+def _matches_format(header: bytes, extension: str) -> bool:
+    """Whether the first bytes of a file fit its audio extension"""
+    if extension == ".wav":
+        return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+    if extension == ".mp3":
+        # ID3 tag, or an MPEG frame sync
+        return header[:3] == b"ID3" or (header[0] == 0xFF and header[1] & 0xE0 == 0xE0)
+    if extension == ".webm":
+        return header[:4] == b"\x1a\x45\xdf\xa3"
+    if extension == ".m4a":
+        return header[4:8] == b"ftyp"
+    return False
+
+
+class UploadSpool:
+    """
+    Disk spool for resumable chunked audio uploads
+
+    Each upload is a data file, appended to chunk by chunk, and a JSON
+    metadata file (owner, filename, declared size) in the spool directory;
+    the upload offset is the data file's size, so it survives restarts
+    and is shared by every API process of the node. Chunks are streamed
+    to disk as they arrive and checked as they go: an upload can never
+    grow past its declared size, and its leading bytes must match the
+    audio format of its extension.
+
+    Storage is bounded: declared sizes of all open uploads together stay
+    within max_bytes, each user has at most max_per_user open uploads, each
+    chunk request writes at most max_chunk_bytes, and uploads without a
+    chunk for expiry_seconds are removed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        max_chunk_bytes: int,
+        max_per_user: int,
+        expiry_seconds: int
+    ):
+        """Initialize spool, creating its directory"""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_per_user = max_per_user
+        self.expiry_seconds = expiry_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def _data_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def _read_meta(self, upload_id: str) -> Optional[Dict]:
+        try:
+            with open(self._meta_path(upload_id)) as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    def _uploads(self) -> List[Dict]:
+        """Metadata of all open uploads"""
+        uploads = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                meta = self._read_meta(name[:-len(".json")])
+                if meta is not None:
+                    uploads.append(meta)
+        return uploads
+
+    def _last_activity(self, upload_id: str) -> float:
+        try:
+            return os.path.getmtime(self._data_path(upload_id))
+        except OSError:
+            return 0.0
+
+    def _status(self, meta: Dict) -> Dict:
+        offset = os.path.getsize(self._data_path(meta["upload_id"]))
+        return {
+            "upload_id": meta["upload_id"],
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "offset": offset,
+            "complete": offset == meta["size"],
+            "expires_in": max(0, round(self._last_activity(meta["upload_id"]) + self.expiry_seconds - time.time()))
+        }
+
+    def purge_expired(self) -> int:
+        """
+        Remove uploads without a chunk for expiry_seconds
+
+        Uploads whose lock is held (a slow chunk still arriving, or a
+        transcription) are skipped.
+
+        Returns:
+            Number of uploads removed
+        """
+        cutoff = time.time() - self.expiry_seconds
+        expired = [meta["upload_id"] for meta in self._uploads() if self._last_activity(meta["upload_id"]) < cutoff]
+        removed = sum(1 for upload_id in expired if self._delete_unlocked(upload_id))
+        if removed:
+            logger.info(f"Removed {removed} expired uploads")
+        return removed
+
+    def create(self, user_id: uuid.UUID, filename: str, size: int) -> Dict:
+        """
+        Open an upload of a declared size
+
+        Returns:
+            Upload status (offset 0)
+
+        Raises:
+            UploadError: If the file extension is not a supported audio format
+            UploadTooLarge: If size exceeds MAX_FILE_SIZE
+            SpoolFull: If the user or the spool has no room for another upload
+        """
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in SUPPORTED_AUDIO_EXTENSIONS:
+            raise UploadError(f"Unsupported file format. Supported formats: {', '.join(SUPPORTED_AUDIO_EXTENSIONS)}")
+        if size <= 0:
+            raise UploadError("Upload size must be positive")
+        if size > settings.MAX_FILE_SIZE:
+            raise UploadTooLarge(
+                f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE // 1024 // 1024}MB"
+            )
+
+        # Serialize reservations across API processes
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.purge_expired()
+            uploads = self._uploads()
+            if sum(1 for meta in uploads if meta["user_id"] == str(user_id)) >= self.max_per_user:
+                raise SpoolFull(f"At most {self.max_per_user} uploads can be open at a time")
+            if sum(meta["size"] for meta in uploads) + size > self.max_bytes:
+                raise SpoolFull("Upload storage is full, please retry later")
+
+            upload_id = uuid.uuid4().hex
+            meta = {
+                "upload_id": upload_id,
+                "user_id": str(user_id),
+                "filename": filename,
+                "extension": extension,
+                "size": size
+            }
+            open(self._data_path(upload_id), "wb").close()
+            with open(self._meta_path(upload_id), "w") as meta_file:
+                json.dump(meta, meta_file)
+
+        logger.info(f"Opened upload {upload_id}: {filename} ({size} bytes)")
+        return self._status(meta)
+
+    def _owned_meta(self, upload_id: str, user_id: uuid.UUID) -> Dict:
+        """Metadata of an upload of this user"""
+        try:
+            upload_id = uuid.UUID(upload_id).hex
+        except ValueError:
+            raise UploadNotFound("Upload not found")
+        meta = self._read_meta(upload_id)
+        if meta is None or meta["user_id"] != str(user_id) or not os.path.exists(self._data_path(upload_id)):
+            raise UploadNotFound("Upload not found")
+        return meta
+
+    def status(self, upload_id: str, user_id: uuid.UUID) -> Dict:
+        """
+        Status of an upload, to resume it from its offset
+
+        Raises:
+            UploadNotFound: If the upload does not exist or is not the user's
+        """
+        return self._status(self._owned_meta(upload_id, user_id))
+
+    def _open_locked(self, upload_id: str, offset: int) -> BinaryIO:
+        """Data file of an upload opened for appending, locked against other chunks and removal"""
+        path = self._data_path(upload_id)
+        try:
+            # Never create it: the upload may have just been removed
+            data = os.fdopen(os.open(path, os.O_WRONLY | os.O_APPEND), "ab")
+        except FileNotFoundError:
+            raise UploadNotFound("Upload not found")
+        try:
+            try:
+                fcntl.flock(data, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusy("Another chunk of this upload is still being written or transcribed")
+            # Removed between opening and locking
+            try:
+                if os.stat(path).st_ino != os.fstat(data.fileno()).st_ino:
+                    raise UploadNotFound("Upload not found")
+            except FileNotFoundError:
+                raise UploadNotFound("Upload not found")
+            received = os.fstat(data.fileno()).st_size
+            if offset != received:
+                raise UploadOffsetMismatch(received)
+        except BaseException:
+            data.close()
+            raise
+        return data
+
+    def _check_format(self, meta: Dict) -> None:
+        """Remove an upload whose leading bytes do not match its audio format"""
+        with open(self._data_path(meta["upload_id"]), "rb") as data:
+            header = data.read(min(SIGNATURE_BYTES, meta["size"]))
+        if not _matches_format(header, meta["extension"]):
+            self._delete(meta["upload_id"])
+            raise UploadError(f"File content is not {meta['extension']} audio")
+
+    @asynccontextmanager
+    async def append(
+        self,
+        upload_id: str,
+        user_id: uuid.UUID,
+        offset: int,
+        chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[Dict]:
+        """
+        Write a chunk streamed from the request body at an offset
+
+        Async context manager yielding the upload status after the chunk.
+        The upload stays locked until the block exits, so the request that
+        completes an upload can transcribe it while concurrent chunks for
+        the same upload (such as a retried final chunk) get UploadBusy.
+
+        Bytes are written as they arrive, so a chunk cut off by a dropped
+        connection still advances the upload by what was received. A chunk
+        that would pass the declared size or max_chunk_bytes is rolled back
+        entirely; the bytes received are counted, so this holds for bodies
+        without Content-Length too. File I/O runs in worker threads, off
+        the event loop.
+
+        Raises:
+            UploadNotFound: If the upload does not exist or is not the user's
+            UploadOffsetMismatch: If offset is not the upload's offset
+            UploadBusy: If another chunk of the upload is being written, or
+                the upload is being transcribed
+            UploadTooLarge: If the chunk passes the declared size or max_chunk_bytes
+            UploadError: If the data does not match the audio format; the
+                upload is removed
+        """
+        meta = await asyncio.to_thread(self._owned_meta, upload_id, user_id)
+        upload_id = meta["upload_id"]
+
+        data = await asyncio.to_thread(self._open_locked, upload_id, offset)
+        try:
+            received = offset
+            try:
+                async for chunk in chunks:
+                    if received + len(chunk) > meta["size"]:
+                        await asyncio.to_thread(data.truncate, offset)
+                        raise UploadTooLarge(f"Chunk passes the declared upload size of {meta['size']} bytes")
+                    if received + len(chunk) - offset > self.max_chunk_bytes:
+                        await asyncio.to_thread(data.truncate, offset)
+                        raise UploadTooLarge(
+                            f"Chunk exceeds maximum size of {self.max_chunk_bytes // 1024 // 1024}MB"
+                        )
+                    await asyncio.to_thread(data.write, chunk)
+                    received += len(chunk)
+            finally:
+                await asyncio.to_thread(data.flush)
+
+            # Check the format as soon as its signature has arrived
+            if offset < min(SIGNATURE_BYTES, meta["size"]) <= received:
+                await asyncio.to_thread(self._check_format, meta)
+
+            yield await asyncio.to_thread(self._status, meta)
+        finally:
+            # Closing the file releases the lock
+            data.close()
+
+    def path(self, upload_id: str) -> str:
+        """Data file of an upload"""
+        return self._data_path(uuid.UUID(upload_id).hex)
+
+    def cancel(self, upload_id: str, user_id: uuid.UUID) -> None:
+        """
+        Remove an upload, finished or not
+
+        Raises:
+            UploadNotFound: If the upload does not exist or is not the user's
+            UploadBusy: If a chunk of the upload is being written or it is
+                being transcribed
+        """
+        if not self._delete_unlocked(self._owned_meta(upload_id, user_id)["upload_id"]):
+            raise UploadBusy("Upload is still being written or transcribed")
+
+    def finish(self, upload_id: str) -> None:
+        """Remove a completed upload from inside its append() block, which holds its lock"""
+        self._delete(uuid.UUID(upload_id).hex)
+
+    def _delete_unlocked(self, upload_id: str) -> bool:
+        """Remove an upload's files unless its lock is held; returns whether it was removed"""
+        try:
+            data = open(self._data_path(upload_id), "rb")
+        except FileNotFoundError:
+            # Metadata left without data
+            self._delete(upload_id)
+            return True
+        with data:
+            try:
+                fcntl.flock(data, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            self._delete(upload_id)
+        return True
+
+    def _delete(self, upload_id: str) -> None:
+        """Remove an upload's files"""
+        for path in (self._meta_path(upload_id), self._data_path(upload_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# Singleton instance
+_upload_spool = None
+
+
+def get_upload_spool() -> UploadSpool:
+    """Get or create upload spool singleton"""
+    global _upload_spool
+    if _upload_spool is None:
+        _upload_spool = UploadSpool(
+            settings.UPLOAD_SPOOL_DIR or os.path.join(tempfile.gettempdir(), "infravoice-uploads"),
+            settings.UPLOAD_SPOOL_MAX_BYTES,
+            settings.UPLOAD_CHUNK_MAX_BYTES,
+            settings.UPLOAD_MAX_PER_USER,
+            settings.UPLOAD_EXPIRY_SECONDS
+        )
+    return _upload_spool
@@ -1,12 +1,52 @@
-import os
-import tempfile
+import asyncio
+import io
+import math
 import logging
-from typing import Dict, Optional
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 
 from app.core.config import settings
+from app.core.constants import (
+    ModelStatus,
+    STREAM_SAMPLE_RATE,
+    SubscriptionTier,
+    TIER_WHISPER_MODELS,
+    WHISPER_INFERENCE_MODES,
+)
+from app.services.audio_decoder import AudioDecodeError, decode_audio
+from app.services.chunked_transcription import ChunkedTranscriber
+from app.services.model_registry import ModelBudgetExceeded, WhisperModelRegistry, estimated_model_mb
+from app.services.shared_weights import load_shared_model
+from app.services.speech_trim import trim_silence
 
 logger = logging.getLogger(__name__)
 
+# Assumed inference time until the first transcription has been measured
+DEFAULT_INFERENCE_SECONDS = 5.0
+# Retry-After while the model is still loading
+WARMUP_RETRY_SECONDS = 5
+# Weight of the latest sample in the moving averages of wait and inference time
+STATS_SMOOTHING = 0.2
+# How often idle models are unloaded while no transcriptions arrive
+IDLE_CHECK_SECONDS = 60
+
+# Quality thresholds of Whisper's transcribe(); batched greedy results failing
+# them are re-run through transcribe() and its temperature fallback
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+# Stricter thresholds of the model cascade: a fast-model segment with text
+# failing any of them is re-run with the requested model
+CASCADE_LOGPROB_THRESHOLD = -0.6
+CASCADE_NO_SPEECH_THRESHOLD = 0.5
+CASCADE_COMPRESSION_RATIO_THRESHOLD = 2.0
+# Recent cascade transcriptions kept for latency percentiles
+LATENCY_WINDOW = 1000
+LATENCY_PERCENTILES = (50, 90, 99)
+
 # Lazy import to avoid startup failures
 whisper = None
 torch = None
@@ -25,57 +65,630 @@ def _import_whisper():
             raise ImportError(f"Whisper dependencies not available: {str(e)}")
 
 
+def _quantize_linear_layers(model):
+    """Replace the model's linear layers with dynamically quantized int8 ones"""
+    # Whisper's Linear subclass only adds dtype casting for fp16, and the
+    # quantizer matches exact module types: treat them as plain nn.Linear
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_whisper_model(model_size: str, inference_mode: str = "fp32", cpu_threads: int = 0):
+    """
+    Load a Whisper model for an inference mode
+    
+    fp32 runs on CUDA when available, otherwise on the CPU. int8 runs on
+    the CPU with the attention and MLP linear layers (most of the compute
+    and weights) dynamically quantized: int8 weights, activations
+    quantized on the fly.
+    
+    With WHISPER_SHARED_WEIGHTS, fp32 CPU weights are memory-mapped from
+    a converted model file (see load_shared_model) instead of copied, so
+    all processes loading the same size share one copy in memory.
+    
+    Args:
+        model_size: tiny, base, small, medium or large
+        inference_mode: One of WHISPER_INFERENCE_MODES
+        cpu_threads: Intra-op threads for CPU inference (0 keeps PyTorch's
+            default). Applies to the calling thread, so load on the thread
+            that will run inference.
+    
+    Returns:
+        Tuple of (model, device)
+    """
+    if inference_mode not in WHISPER_INFERENCE_MODES:
+        raise ValueError(f"Unknown Whisper inference mode '{inference_mode}'")
+    
+    # Import whisper/torch only when needed
+    _import_whisper()
+    
+    # Use CPU if CUDA is not available; quantized kernels are CPU only
+    device = "cuda" if inference_mode == "fp32" and torch.cuda.is_available() else "cpu"
+    if device == "cpu" and cpu_threads > 0:
+        torch.set_num_threads(cpu_threads)
+    
+    if device == "cpu" and inference_mode == "fp32" and settings.WHISPER_SHARED_WEIGHTS:
+        model = load_shared_model(model_size)
+    else:
+        model = whisper.load_model(model_size, device=device)
+    if inference_mode == "int8":
+        model = _quantize_linear_layers(model)
+    return model, device
+
+
+def needs_escalation(result: Dict) -> bool:
+    """
+    Whether a fast-model result is too uncertain to keep
+    
+    True when any segment with text has an average log probability below
+    CASCADE_LOGPROB_THRESHOLD, a no-speech probability above
+    CASCADE_NO_SPEECH_THRESHOLD (speech it is unsure is there) or a
+    compression ratio above CASCADE_COMPRESSION_RATIO_THRESHOLD (repetition
+    loops). Silence is kept as is.
+    """
+    for segment in result.get("segments", []):
+        if not segment.get("text", "").strip():
+            continue
+        if (
+            segment.get("avg_logprob", 0.0) < CASCADE_LOGPROB_THRESHOLD
+            or segment.get("no_speech_prob", 0.0) > CASCADE_NO_SPEECH_THRESHOLD
+            or segment.get("compression_ratio", 0.0) > CASCADE_COMPRESSION_RATIO_THRESHOLD
+        ):
+            return True
+    return False
+
+
+def latency_percentiles(samples) -> Dict[str, float]:
+    """p50/p90/p99 of latency samples in seconds (empty without samples)"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        f"p{percentile}": round(ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)], 3)
+        for percentile in LATENCY_PERCENTILES
+    }
+
+
+class TranscriptionOverloaded(RuntimeError):
+    """Raised when the transcription queue is full"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__("Transcription queue is full")
+        self.retry_after = retry_after
+
+
+class TranscriptionWarming(RuntimeError):
+    """Raised while the Whisper model is still loading"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__("Whisper model is still loading")
+        self.retry_after = retry_after
+
+
 class LocalWhisperService:
-    """Service for local voice transcription using OpenAI Whisper"""
+    """
+    Service for local voice transcription using OpenAI Whisper
+    
+    Inference runs on a single dedicated thread so it never blocks the event
+    loop; one thread because Whisper installs its decoding caches as hooks
+    on the shared model. Recordings waiting for the model are decoded
+    together: a batch is collected for up to WHISPER_BATCH_WINDOW_MS when
+    the model is idle (immediately when it is busy), up to
+    WHISPER_MAX_BATCH_SIZE recordings, and run through the encoder and
+    decoder as one batch. Beyond WHISPER_QUEUE_SIZE waiting recordings,
+    requests are rejected immediately with TranscriptionOverloaded.
+    
+    The default model (the free tier's model with WHISPER_TIER_MODELS,
+    otherwise WHISPER_MODEL_SIZE) is loaded on the inference thread by
+    start_loading(), so the server can start serving other requests first;
+    transcriptions arriving before it is ready are rejected with
+    TranscriptionWarming. It is the only model pinned in the registry.
+    Other sizes (paid tiers, see model_for_tier, and the cascade model) are
+    loaded on demand, or at startup with WHISPER_WARM_TIER_MODELS, within
+    the hard budget WHISPER_MODEL_MEMORY_MB, and unloaded when least
+    recently used or idle for WHISPER_MODEL_IDLE_SECONDS; voice is disabled
+    at startup when the budget cannot hold the default model next to the
+    largest of them. A batch only holds recordings for one model size.
+    
+    With WHISPER_CASCADE_MODEL, recordings are first transcribed by that
+    fast model and only re-run with the requested model when the result
+    is uncertain (see needs_escalation).
+    """
     
     def __init__(self):
-        """Initialize Whisper model"""
-        self.model = None
-        self.model_size = settings.WHISPER_MODEL_SIZE
-        self._load_model()
+        """Initialize inference executor; the models are loaded by start_loading()"""
+        self.inference_mode = settings.WHISPER_INFERENCE_MODE
+        self.cpu_threads = settings.WHISPER_CPU_THREADS
+        self.tier_models = settings.WHISPER_TIER_MODELS
+        self.cascade_model = settings.WHISPER_CASCADE_MODEL or None
+        
+        # Default size (unknown tiers, callers without a size), the only one
+        # pinned in memory, and every size requests can be routed to
+        if self.tier_models:
+            self.model_size = TIER_WHISPER_MODELS[SubscriptionTier.FREE]
+            routed = list(TIER_WHISPER_MODELS.values())
+        else:
+            self.model_size = settings.WHISPER_MODEL_SIZE
+            routed = []
+        if self.cascade_model is not None:
+            routed.append(self.cascade_model)
+        self.model_sizes = list(dict.fromkeys([self.model_size, *routed]))
+        self.warm_tier_models = settings.WHISPER_WARM_TIER_MODELS
+        
+        self.registry = WhisperModelRegistry(
+            self.inference_mode,
+            self.cpu_threads,
+            settings.WHISPER_MODEL_MEMORY_MB,
+            settings.WHISPER_MODEL_IDLE_SECONDS,
+            pinned=[self.model_size]
+        )
+        self.trim_silence = settings.WHISPER_TRIM_SILENCE
+        self.chunk_min_seconds = settings.WHISPER_CHUNK_MIN_SECONDS
+        self.status = ModelStatus.NOT_LOADED
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._loading: Optional[Future] = None
+        self.queue_size = settings.WHISPER_QUEUE_SIZE
+        self.max_batch_size = max(1, settings.WHISPER_MAX_BATCH_SIZE)
+        self.batch_window = settings.WHISPER_BATCH_WINDOW_MS / 1000
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        
+        # Process pool for long recordings, started once the model has loaded
+        self._chunker: Optional[ChunkedTranscriber] = None
+        if settings.WHISPER_CHUNK_WORKERS > 0:
+            self._chunker = ChunkedTranscriber(
+                settings.WHISPER_CHUNK_WORKERS,
+                self.model_size,
+                self.inference_mode,
+                settings.WHISPER_CPU_THREADS
+            )
+        
+        # Batch scheduler, started on the first transcription
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        
+        # Queue statistics, only touched from the event loop
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._batches = 0
+        self._avg_batch_size = 0.0
+        self._avg_wait = 0.0
+        self._avg_inference = DEFAULT_INFERENCE_SECONDS
+        self._max_wait = 0.0
+        self._cascaded = 0
+        self._escalated = 0
+        self._accepted_latency: deque = deque(maxlen=LATENCY_WINDOW)
+        self._escalated_latency: deque = deque(maxlen=LATENCY_WINDOW)
+    
+    def start_loading(self) -> Future:
+        """
+        Start loading the model on the inference thread, once
+        
+        Returns:
+            Future that completes when loading has finished (successfully
+            or not); inference submitted later runs after it
+        """
+        if self._loading is None:
+            self.status = ModelStatus.WARMING
+            self._loading = self._executor.submit(self._load_model)
+        return self._loading
+    
+    def model_status(self) -> Dict[str, any]:
+        """Loading state of the model"""
+        return {
+            "status": self.status.value,
+            "model_size": self.model_size,
+            "model_sizes": self.model_sizes,
+            "inference_mode": self.inference_mode,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "error": self.load_error,
+            "registry": self.registry.stats()
+        }
+    
+    def _check_memory_budget(self) -> None:
+        """
+        Refuse a model memory budget that cannot serve every routed size
+        
+        The pinned default model has to fit next to the largest other size
+        requests can be routed to, or requests for that size would always
+        fail.
+        
+        Raises:
+            ModelBudgetExceeded: If WHISPER_MODEL_MEMORY_MB is too small
+        """
+        default_mb = estimated_model_mb(self.model_size, self.inference_mode)
+        others = [size for size in self.model_sizes if size != self.model_size]
+        largest = max(others, key=lambda size: estimated_model_mb(size, self.inference_mode), default=None)
+        needed_mb = default_mb + (estimated_model_mb(largest, self.inference_mode) if largest else 0)
+        if needed_mb > self.registry.memory_budget_mb:
+            raise ModelBudgetExceeded(
+                f"WHISPER_MODEL_MEMORY_MB={self.registry.memory_budget_mb} cannot hold the default Whisper "
+                f"model {self.model_size}" + (f" next to {largest}" if largest else "") +
+                f" (~{math.ceil(needed_mb)}MB)"
+            )
     
     def _load_model(self):
-        """Load Whisper model on initialization"""
+        """Load the default Whisper model, and with WHISPER_WARM_TIER_MODELS the others (runs on the inference thread)"""
+        started = time.monotonic()
         try:
-            # Import whisper/torch only when needed
-            _import_whisper()
+            self._check_memory_budget()
+            logger.info(f"Loading Whisper model: {self.model_size} ({self.inference_mode})")
             
-            logger.info(f"Loading Whisper model: {self.model_size}")
+            _, device = self.registry.get(self.model_size)
+            logger.info(f"Using device: {device}, {torch.get_num_threads()} threads")
+            if self.warm_tier_models:
+                # Not pinned: unloaded like any other when idle or out of budget
+                for model_size in self.model_sizes[1:]:
+                    try:
+                        self.registry.get(model_size)
+                    except Exception as e:
+                        logger.error(f"Failed to warm up Whisper model {model_size}: {str(e)}")
             
-            # Use CPU if CUDA is not available
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Using device: {device}")
+            self.load_seconds = time.monotonic() - started
+            self.status = ModelStatus.READY
+            logger.info(f"Whisper model loaded successfully in {self.load_seconds:.1f}s")
             
-            self.model = whisper.load_model(self.model_size, device=device)
-            logger.info("Whisper model loaded successfully")
+            if self._chunker is not None:
+                self._chunker.start()
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {str(e)}")
-            # Don't raise - allow server to start without voice features
-            self.model = None
+            # Don't raise - allow server to run without voice features
+            self.load_seconds = time.monotonic() - started
+            self.load_error = str(e)
+            self.status = ModelStatus.UNAVAILABLE
+    
+    def _transcribe_full(self, model, audio) -> Dict:
+        """Whisper's sequential transcribe(), with seeking and temperature fallback"""
+        return model.transcribe(
+            audio,
+            fp16=False,  # Use FP32 for better compatibility
+            language="en",  # Can be auto-detected by removing this
+            task="transcribe"
+        )
+    
+    def _transcribe_batch(self, model_size: str, audios: List) -> Tuple[List[Dict], float, float]:
+        """
+        Transcribe a batch of recordings on the inference thread
+        
+        The model is taken from the registry, which loads it if needed
+        (included in the batch time). Recordings of up to 30 seconds (one Whisper window) are padded and
+        decoded together in a single batched forward pass. Longer recordings
+        and results failing the transcribe() quality thresholds go through
+        the full sequential transcribe().
+        
+        Returns:
+            Tuple of transcribe()-style results (text, segments, language),
+            start and end time of the batch
+        """
+        started = time.monotonic()
+        model, _ = self.registry.get(model_size)
+        results: List[Optional[Dict]] = [None] * len(audios)
+        
+        short = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+        if short:
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[i]), model.dims.n_mels)
+                for i in short
+            ]).to(model.device)
+            options = whisper.DecodingOptions(
+                task="transcribe",
+                language="en",
+                fp16=False,
+                without_timestamps=True
+            )
+            
+            for i, decoded in zip(short, whisper.decode(model, mel, options)):
+                silent = decoded.no_speech_prob > NO_SPEECH_THRESHOLD and decoded.avg_logprob < LOGPROB_THRESHOLD
+                if not silent and (
+                    decoded.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or decoded.avg_logprob < LOGPROB_THRESHOLD
+                ):
+                    continue
+                results[i] = {
+                    "text": "" if silent else decoded.text,
+                    "language": decoded.language or "en",
+                    "segments": [{
+                        "text": "" if silent else decoded.text,
+                        "avg_logprob": decoded.avg_logprob,
+                        "compression_ratio": decoded.compression_ratio,
+                        "no_speech_prob": decoded.no_speech_prob,
+                        "end": len(audios[i]) / whisper.audio.SAMPLE_RATE
+                    }]
+                }
+        
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self._transcribe_full(model, audios[i])
+        
+        return results, started, time.monotonic()
+    
+    async def _batch_loop(self):
+        """Collect waiting recordings into batches and run them on the inference thread"""
+        loop = asyncio.get_running_loop()
+        queue = self._batch_queue
+        
+        while True:
+            try:
+                batch = [await asyncio.wait_for(queue.get(), IDLE_CHECK_SECONDS)]
+            except asyncio.TimeoutError:
+                # No work arriving: return the memory of models nobody uses
+                await loop.run_in_executor(self._executor, self.registry.unload_idle)
+                continue
+            
+            # Requests that queued up while the model was busy go straight in;
+            # an idle model waits up to the batch window for company
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Skip callers that gave up while waiting
+            batch = [item for item in batch if not item[3].done()]
+            
+            # One forward pass per model size, in order of arrival
+            for model_size in dict.fromkeys(item[1] for item in batch):
+                await self._run_batch(model_size, [item for item in batch if item[1] == model_size])
+    
+    async def _run_batch(self, model_size: str, batch: List[Tuple]) -> None:
+        """Run one model size's share of a batch and resolve its callers' futures"""
+        self._running = len(batch)
+        try:
+            results, started, finished = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._transcribe_batch, model_size, [audio for audio, _, _, _ in batch]
+            )
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._running = 0
+        
+        weight = STATS_SMOOTHING if self._batches else 1.0
+        self._batches += 1
+        self._avg_batch_size += weight * (len(batch) - self._avg_batch_size)
+        self._avg_inference += weight * (finished - started - self._avg_inference)
+        
+        for (_, _, enqueued_at, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result((result, started - enqueued_at, finished - started))
+    
+    async def _transcribe_chunked(self, audio, model_size: str) -> Tuple[Dict, float, float]:
+        """Transcribe a long recording on the chunk worker pool, falling back to the inference thread"""
+        started = time.monotonic()
+        try:
+            result = await self._chunker.transcribe(audio, model_size)
+        except RuntimeError as e:
+            logger.warning(f"Chunked transcription failed, transcribing sequentially: {str(e)}")
+            return await self._submit(audio, model_size)
+        return result, 0.0, time.monotonic() - started
+    
+    async def _transcribe_cascade(self, audio, model_size: str) -> Tuple[Dict, float, float, str]:
+        """
+        Transcribe with the fast cascade model, re-running uncertain results with model_size
+        
+        Returns:
+            Tuple of (result, wait time, inference time, model size of the
+            result); times add up both passes when escalated
+        """
+        started = time.monotonic()
+        result, waited, inference = await self._submit(audio, self.cascade_model)
+        escalated = needs_escalation(result)
+        if escalated:
+            result, escalation_waited, escalation_inference = await self._submit(audio, model_size)
+            waited += escalation_waited
+            inference += escalation_inference
+        
+        self._cascaded += 1
+        if escalated:
+            self._escalated += 1
+            self._escalated_latency.append(time.monotonic() - started)
+        else:
+            self._accepted_latency.append(time.monotonic() - started)
+        return result, waited, inference, model_size if escalated else self.cascade_model
+    
+    async def _submit(self, audio, model_size: str) -> Tuple[Dict, float, float]:
+        """Queue decoded audio for the batch scheduler and wait for its result"""
+        if self._batcher is None or self._batcher.done():
+            self._batch_queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._batch_queue.put_nowait((audio, model_size, time.monotonic(), future))
+        return await future
+    
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog is expected to be drained"""
+        batches = math.ceil(self._pending / self.max_batch_size)
+        return max(1, math.ceil(self._avg_inference * batches))
+    
+    def queue_stats(self) -> Dict[str, any]:
+        """Queue depth, rejections, batch sizes and wait/inference times"""
+        return {
+            "model_status": self.status.value,
+            "running": self._running,
+            "queued": max(0, self._pending - self._running),
+            "queue_size": self.queue_size,
+            "max_batch_size": self.max_batch_size,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "batches": self._batches,
+            "avg_batch_size": round(self._avg_batch_size, 2),
+            "avg_wait_seconds": round(self._avg_wait, 3),
+            "max_wait_seconds": round(self._max_wait, 3),
+            "avg_inference_seconds": round(self._avg_inference, 3),
+            "cascade": self.cascade_stats()
+        }
+    
+    def cascade_stats(self) -> Optional[Dict[str, any]]:
+        """Escalation rate and latency percentiles of the model cascade, None when off"""
+        if self.cascade_model is None:
+            return None
+        return {
+            "fast_model": self.cascade_model,
+            "transcriptions": self._cascaded,
+            "escalations": self._escalated,
+            "escalation_rate": round(self._escalated / self._cascaded, 3) if self._cascaded else 0.0,
+            "accepted_latency_seconds": latency_percentiles(self._accepted_latency),
+            "escalated_latency_seconds": latency_percentiles(self._escalated_latency)
+        }
+    
+    def model_for_tier(self, tier: str) -> str:
+        """
+        Whisper model size for a subscription tier
+        
+        TIER_WHISPER_MODELS with WHISPER_TIER_MODELS (the free tier's
+        model for unknown tiers), otherwise WHISPER_MODEL_SIZE.
+        """
+        if not self.tier_models:
+            return self.model_size
+        return TIER_WHISPER_MODELS.get(tier, self.model_size)
+    
+    def shutdown(self) -> None:
+        """Stop chunk worker processes"""
+        if self._chunker is not None:
+            self._chunker.shutdown()
+    
+    def ensure_ready(self) -> None:
+        """
+        Check that the default model can take transcriptions, starting to load it if needed
+        
+        Raises:
+            TranscriptionWarming: If the model is still loading
+            RuntimeError: If the model failed to load
+        """
+        if self.status in (ModelStatus.NOT_LOADED, ModelStatus.WARMING):
+            self.start_loading()
+            raise TranscriptionWarming(WARMUP_RETRY_SECONDS)
+        if self.status == ModelStatus.UNAVAILABLE:
+            raise RuntimeError("Whisper model not available. Voice transcription is disabled.")
+    
+    def _admit(self) -> None:
+        """Reject immediately when the model is not ready, or a batch is running and the queue is full"""
+        self.ensure_ready()
+        
+        # One batch running plus queue_size waiting
+        if self._pending >= self.max_batch_size + self.queue_size:
+            self._rejected += 1
+            raise TranscriptionOverloaded(self._retry_after())
     
-    async def transcribe_audio(self, audio_file_path: str) -> Dict[str, any]:
+    async def transcribe_audio(
+        self,
+        audio_source: Union[str, BinaryIO],
+        model_size: Optional[str] = None
+    ) -> Dict[str, any]:
         """
-        Transcribe audio file to text
+        Transcribe an audio file to text
+        
+        The file is decoded in-process (see decode_audio), so uploads can be
+        passed as file objects without being written to disk first.
         
         Args:
-            audio_file_path: Path to the audio file
+            audio_source: Path to the audio file or a readable file object
+            model_size: Whisper model size (see model_for_tier), default
+                model_size
             
         Returns:
             Dict with transcript, confidence, duration, and language
+            
+        Raises:
+            TranscriptionWarming: If the model is still loading
+            TranscriptionOverloaded: If the transcription queue is full
+            AudioDecodeError: If the audio cannot be decoded
         """
-        if self.model is None:
-            raise RuntimeError("Whisper model not available. Voice transcription is disabled.")
+        # Hold a queue slot while decoding too, so a burst of uploads is
+        # turned away before it decodes
+        self._admit()
+        self._pending += 1
+        try:
+            try:
+                # Decode off the event loop
+                loop = asyncio.get_running_loop()
+                audio = await loop.run_in_executor(None, decode_audio, audio_source)
+            except AudioDecodeError:
+                raise
+            except Exception as e:
+                logger.error(f"Transcription failed: {str(e)}")
+                raise RuntimeError(f"Failed to transcribe audio: {str(e)}")
+            
+            return await self._transcribe_admitted(audio, model_size)
+        finally:
+            self._pending -= 1
+    
+    async def transcribe_samples(self, audio, model_size: Optional[str] = None) -> Dict[str, any]:
+        """
+        Transcribe decoded audio
+        
+        With WHISPER_TRIM_SILENCE, long non-speech stretches are cut before
+        inference and segment times are mapped back to the original
+        recording; audio without any speech skips inference. Speech longer
+        than WHISPER_CHUNK_MIN_SECONDS is transcribed in parallel chunks
+        with the requested model, other recordings go through the model
+        cascade when it is on.
+        
+        Args:
+            audio: 16 kHz mono float32 samples
+            model_size: Whisper model size, default model_size
+            
+        Returns:
+            Dict with transcript, confidence, duration, language and model_size
             
+        Raises:
+            TranscriptionWarming: If the model is still loading
+            TranscriptionOverloaded: If the transcription queue is full
+        """
+        self._admit()
+        self._pending += 1
         try:
-            logger.info(f"Transcribing audio file: {audio_file_path}")
-            
-            # Transcribe using Whisper
-            result = self.model.transcribe(
-                audio_file_path,
-                fp16=False,  # Use FP32 for better compatibility
-                language="en",  # Can be auto-detected by removing this
-                task="transcribe"
-            )
+            return await self._transcribe_admitted(audio, model_size)
+        finally:
+            self._pending -= 1
+    
+    async def _transcribe_admitted(self, audio, model_size: Optional[str]) -> Dict[str, any]:
+        """transcribe_samples for a request already holding a queue slot"""
+        model_size = model_size or self.model_size
+        
+        try:
+            original_seconds = len(audio) / STREAM_SAMPLE_RATE
+            speech_map = None
+            if self.trim_silence:
+                audio, speech_map = await asyncio.get_running_loop().run_in_executor(None, trim_silence, audio)
+                logger.debug(f"Trimmed {original_seconds:.1f}s of audio to {len(audio) / STREAM_SAMPLE_RATE:.1f}s")
+            
+            if len(audio) == 0:
+                # Nothing but silence
+                result, waited, inference = {
+                    "text": "",
+                    "segments": [{"no_speech_prob": 1.0, "start": 0.0, "end": original_seconds}]
+                }, 0.0, 0.0
+            else:
+                if self._chunker is not None and len(audio) > self.chunk_min_seconds * STREAM_SAMPLE_RATE:
+                    result, waited, inference = await self._transcribe_chunked(audio, model_size)
+                elif self.cascade_model is not None and model_size != self.cascade_model:
+                    result, waited, inference, model_size = await self._transcribe_cascade(audio, model_size)
+                else:
+                    # Wait for a batch slot
+                    result, waited, inference = await self._submit(audio, model_size)
+                if speech_map is not None:
+                    speech_map.restore_segments(result.get("segments", []))
+                
+                # The first measurement replaces the assumed defaults
+                weight = STATS_SMOOTHING if self._completed else 1.0
+                self._completed += 1
+                self._avg_wait += weight * (waited - self._avg_wait)
+                self._max_wait = max(self._max_wait, waited)
             
             transcript = result["text"].strip()
             language = result.get("language", "en")
@@ -91,13 +704,17 @@ class LocalWhisperService:
             # Get duration from segments or estimate
             duration = segments[-1]["end"] if segments else 0.0
             
-            logger.info(f"Transcription completed: {len(transcript)} characters, confidence: {confidence:.2f}")
+            logger.info(
+                f"Transcription completed ({model_size}): {len(transcript)} characters, confidence: {confidence:.2f} "
+                f"(waited {waited:.2f}s, inference {inference:.2f}s)"
+            )
             
             return {
                 "transcript": transcript,
                 "confidence": round(confidence, 3),
                 "duration": round(duration, 2),
-                "language": language
+                "language": language,
+                "model_size": model_size
             }
             
         except Exception as e:
@@ -110,24 +727,13 @@ class LocalWhisperService:
         
         Args:
             audio_bytes: Audio file bytes
-            filename: Original filename (for extension)
+            filename: Original filename (for logging)
             
         Returns:
             Dict with transcript, confidence, duration, and language
         """
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_file:
-            temp_file.write(audio_bytes)
-            temp_path = temp_file.name
-        
-        try:
-            # Transcribe
-            result = await self.transcribe_audio(temp_path)
-            return result
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        logger.info(f"Transcribing {filename} ({len(audio_bytes)} bytes)")
+        return await self.transcribe_audio(io.BytesIO(audio_bytes))
 
 
 # Singleton instance
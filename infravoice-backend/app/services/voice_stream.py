@@ -0,0 +1,248 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.constants import (
+    STREAM_SAMPLE_RATE,
+    STREAM_FRAME_MS,
+    STREAM_PREROLL_MS,
+    STREAM_SILENCE_MS,
+    STREAM_MIN_SPEECH_MS,
+    STREAM_MAX_SEGMENT_SECONDS,
+    STREAM_PARTIAL_INTERVAL_MS,
+)
+from app.services.speech_trim import MIN_SPEECH_ENERGY, SPEECH_TO_NOISE_RATIO
+from app.services.voice_service import LocalWhisperService, TranscriptionOverloaded
+
+logger = logging.getLogger(__name__)
+
+# Noise floor tracking: falls quickly to quieter frames, rises slowly with louder ones
+INITIAL_NOISE_ENERGY = 0.005
+NOISE_FALL = 0.2
+NOISE_RISE = 0.002
+
+
+class SpeechSegmenter:
+    """
+    Split a 16 kHz 16-bit mono PCM stream into speech segments
+
+    Voice activity is decided per STREAM_FRAME_MS frame by comparing its
+    energy with an adaptive noise floor. A segment starts at the first
+    voiced frame (plus STREAM_PREROLL_MS of lead-in) and ends after
+    STREAM_SILENCE_MS of silence or STREAM_MAX_SEGMENT_SECONDS of audio.
+    Segments with less than STREAM_MIN_SPEECH_MS of speech are dropped.
+    """
+
+    def __init__(self):
+        """Initialize segmenter state"""
+        self.frame_size = STREAM_SAMPLE_RATE * STREAM_FRAME_MS // 1000
+        self.samples = 0
+        self.next_index = 0
+        self._remainder = b""
+        self._noise = INITIAL_NOISE_ENERGY
+        self._preroll: deque = deque(maxlen=STREAM_PREROLL_MS // STREAM_FRAME_MS)
+        self._frames: List[np.ndarray] = []
+        self._start = 0
+        self._voiced = 0
+        self._silent = 0
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received"""
+        return self.samples / STREAM_SAMPLE_RATE
+
+    def feed(self, pcm: bytes) -> List[Dict]:
+        """
+        Add PCM bytes to the stream
+
+        Returns:
+            Segments finished by this audio: index, start, end (seconds) and
+            float32 audio
+        """
+        data = self._remainder + pcm
+        usable = len(data) - len(data) % (2 * self.frame_size)
+        self._remainder = data[usable:]
+        if not usable:
+            return []
+
+        frames = np.frombuffer(data[:usable], dtype="<i2").reshape(-1, self.frame_size)
+        frames = frames.astype(np.float32) / 32768.0
+        energies = np.sqrt(np.mean(np.square(frames), axis=1))
+
+        finished = []
+        for frame, energy in zip(frames, energies):
+            segment = self._push(frame, float(energy))
+            if segment is not None:
+                finished.append(segment)
+        return finished
+
+    def current(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Index and audio of the segment in progress, once it holds enough speech"""
+        if not self._frames or self._voiced * STREAM_FRAME_MS < STREAM_MIN_SPEECH_MS:
+            return None
+        return self.next_index, np.concatenate(self._frames)
+
+    def flush(self) -> List[Dict]:
+        """End the stream, closing the segment in progress"""
+        segment = self._close() if self._frames else None
+        return [segment] if segment is not None else []
+
+    def _push(self, frame: np.ndarray, energy: float) -> Optional[Dict]:
+        voiced = energy > max(MIN_SPEECH_ENERGY, self._noise * SPEECH_TO_NOISE_RATIO)
+        self._noise += (NOISE_FALL if energy < self._noise else NOISE_RISE) * (energy - self._noise)
+        self.samples += len(frame)
+
+        if not self._frames:
+            if not voiced:
+                self._preroll.append(frame)
+                return None
+            self._frames = list(self._preroll) + [frame]
+            self._start = self.samples - len(self._frames) * self.frame_size
+            self._preroll.clear()
+            self._voiced = 1
+            self._silent = 0
+            return None
+
+        self._frames.append(frame)
+        if voiced:
+            self._voiced += 1
+            self._silent = 0
+        else:
+            self._silent += 1
+
+        if (
+            self._silent * STREAM_FRAME_MS >= STREAM_SILENCE_MS
+            or len(self._frames) * self.frame_size >= STREAM_MAX_SEGMENT_SECONDS * STREAM_SAMPLE_RATE
+        ):
+            return self._close()
+        return None
+
+    def _close(self) -> Optional[Dict]:
+        frames, self._frames = self._frames, []
+        if self._voiced * STREAM_FRAME_MS < STREAM_MIN_SPEECH_MS:
+            return None
+
+        segment = {
+            "index": self.next_index,
+            "start": round(self._start / STREAM_SAMPLE_RATE, 2),
+            "end": round(self.samples / STREAM_SAMPLE_RATE, 2),
+            "audio": np.concatenate(frames)
+        }
+        self.next_index += 1
+        return segment
+
+
+class TranscriptionStream:
+    """
+    Incremental transcription of one live audio stream
+
+    Finished speech segments are transcribed in order while audio keeps
+    arriving; the segment in progress gets a partial transcript for every
+    STREAM_PARTIAL_INTERVAL_MS of new speech (one at a time, skipped when the
+    transcription queue is full). Messages are sent as dicts:
+    partial (segment, text), final (segment, start, end, text, confidence),
+    error (segment, detail, retry_after) and done (transcript, duration).
+    """
+
+    def __init__(
+        self,
+        service: LocalWhisperService,
+        send: Callable[[Dict], Awaitable[None]],
+        model_size: Optional[str] = None
+    ):
+        """Initialize stream and start the final transcript worker"""
+        self.segmenter = SpeechSegmenter()
+        self._service = service
+        self._model_size = model_size
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._finals: asyncio.Queue = asyncio.Queue()
+        self._texts: List[str] = []
+        self._next_final = 0
+        self._partial: Optional[asyncio.Task] = None
+        self._partial_mark: Tuple[int, int] = (-1, 0)
+        self._worker = asyncio.create_task(self._transcribe_finals())
+
+    async def feed(self, pcm: bytes) -> None:
+        """Add PCM audio, queueing finished segments and refreshing the partial transcript"""
+        for segment in self.segmenter.feed(pcm):
+            self._finals.put_nowait(segment)
+
+        current = self.segmenter.current()
+        if current is None or (self._partial is not None and not self._partial.done()):
+            return
+
+        index, audio = current
+        marked_index, marked_samples = self._partial_mark
+        new_samples = len(audio) - (marked_samples if marked_index == index else 0)
+        if new_samples * 1000 >= STREAM_PARTIAL_INTERVAL_MS * STREAM_SAMPLE_RATE:
+            self._partial_mark = (index, len(audio))
+            self._partial = asyncio.create_task(self._transcribe_partial(index, audio))
+
+    async def finish(self) -> Dict:
+        """Transcribe the remaining speech and send the full transcript"""
+        for segment in self.segmenter.flush():
+            self._finals.put_nowait(segment)
+        self._finals.put_nowait(None)
+        await self._worker
+
+        if self._partial is not None:
+            self._partial.cancel()
+
+        message = {
+            "type": "done",
+            "transcript": " ".join(self._texts),
+            "duration": round(self.segmenter.duration, 2)
+        }
+        await self._send(message)
+        return message
+
+    def close(self) -> None:
+        """Stop pending work after the client went away"""
+        self._worker.cancel()
+        if self._partial is not None:
+            self._partial.cancel()
+
+    async def _transcribe_partial(self, index: int, audio: np.ndarray) -> None:
+        try:
+            result = await self._service.transcribe_samples(audio, self._model_size)
+        except TranscriptionOverloaded:
+            return
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {str(e)}")
+            return
+
+        async with self._send_lock:
+            # A partial must never follow its segment's final transcript
+            if index >= self._next_final:
+                await self._send({"type": "partial", "segment": index, "text": result["transcript"]})
+
+    async def _transcribe_finals(self) -> None:
+        while True:
+            segment = await self._finals.get()
+            if segment is None:
+                return
+
+            message = {"type": "final", "segment": segment["index"], "start": segment["start"], "end": segment["end"]}
+            try:
+                result = await self._service.transcribe_samples(segment["audio"], self._model_size)
+                message.update(text=result["transcript"], confidence=result["confidence"])
+                if result["transcript"]:
+                    self._texts.append(result["transcript"])
+            except TranscriptionOverloaded as e:
+                message = {
+                    "type": "error",
+                    "segment": segment["index"],
+                    "detail": "Transcription service is busy",
+                    "retry_after": e.retry_after
+                }
+            except Exception as e:
+                logger.error(f"Segment transcription failed: {str(e)}")
+                message = {"type": "error", "segment": segment["index"], "detail": str(e)}
+
+            async with self._send_lock:
+                self._next_final = segment["index"] + 1
+                await self._send(message)
@@ -1,10 +1,27 @@
+import axios from 'axios';
 import api from './api';
 
+// Resumable uploads: bytes per chunk and retries of a failed chunk
+const UPLOAD_CHUNK_SIZE = 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+
 export interface VoiceTranscriptResponse {
   transcript: string;
   confidence: number;
   duration: number;
   language: string;
+  cached?: boolean;
+  model_size?: string | null;
+}
+
+export interface UploadStatus {
+  upload_id: string;
+  filename: string;
+  size: number;
+  offset: number;
+  complete: boolean;
+  expires_in: number;
+  transcription?: VoiceTranscriptResponse | null;
 }
 
 const voiceService = {
@@ -25,9 +42,52 @@ const voiceService = {
     return response.data;
   },
 
-  async getHistory(skip: number = 0, limit: number = 10) {
+  // Chunked upload that resumes from the server's offset after network
+  // errors, for large recordings on unreliable connections
+  async transcribeResumable(
+    file: File,
+    onProgress?: (sent: number, total: number) => void
+  ): Promise<VoiceTranscriptResponse> {
+    const { data: upload } = await api.post<UploadStatus>('/api/v1/voice/uploads', {
+      filename: file.name,
+      size: file.size,
+    });
+    const url = `/api/v1/voice/uploads/${upload.upload_id}`;
+
+    let offset = upload.offset;
+    let retries = 0;
+    while (true) {
+      try {
+        const { data } = await api.put<UploadStatus>(url, file.slice(offset, offset + UPLOAD_CHUNK_SIZE), {
+          headers: {
+            'Content-Type': 'application/octet-stream',
+            'Upload-Offset': String(offset),
+          },
+        });
+        retries = 0;
+        offset = data.offset;
+        onProgress?.(offset, file.size);
+        if (data.transcription) {
+          return data.transcription;
+        }
+      } catch (error) {
+        const status = axios.isAxiosError(error) ? error.response?.status : undefined;
+        // Client errors other than an offset conflict will not go away
+        if (retries >= UPLOAD_MAX_RETRIES || (status !== undefined && status < 500 && status !== 409)) {
+          throw error;
+        }
+        retries += 1;
+        await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** retries));
+        // Resume from what the server actually received
+        const { data } = await api.get<UploadStatus>(url);
+        offset = data.offset;
+      }
+    }
+  },
+
+  async getHistory(cursor?: string, limit: number = 10) {
     const response = await api.get('/api/v1/voice/history', {
-      params: { skip, limit },
+      params: { cursor, limit },
     });
     return response.data;
   },